@@ -0,0 +1,291 @@
+"""
+Read-only HTTP-API auf dem aktuellen Snapshot (nur Standardbibliothek + pandas).
+
+Der Scan-fertige Universe-Frame wird einmal geladen und im Speicher gehalten;
+alle Anfragen lesen dieselbe unveränderliche Version. Veröffentlicht
+update_data.py einen neuen Snapshot (Datei-Stand ändert sich), lädt der
+Server ihn beim nächsten Check nach und tauscht die Version atomar aus.
+
+    python api_server.py [--port 8502] [--host 127.0.0.1] [--data Data/Screener_Data.arrow]
+
+Endpunkte (JSON):
+  /health                  Version, Stichtag, Anzahl Aktien
+  /universe[?limit=&columns=Ticker,RS 1M]
+  /ticker/{sym}            alle Spalten einer Aktie (404, wenn unbekannt)
+  /scan?mode=&rank_by=&rs_min=&rs_gap=&strict_chain=&sort=&limit=&<Filter>
+                           wie ein Eintrag in scans.json (scan_engine.scan_spec);
+                           übrige Parameter sind Custom-Filter, z.B. min_eps_q=20
+
+Jede erfolgreiche Antwort trägt ein ETag aus der Snapshot-Version;
+If-None-Match mit gleichem Wert liefert 304 (Fehler bleiben 400/404).
+Ergebnisse werden je Version und URL gecacht.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from run_scans import CSV_FILE, SPY_FILE, load_universe, records
+from scan_engine import CUSTOM_KEYS_DEFAULTS, RESULT_COLS, SPEC_DEFAULTS, run_spec, scan_spec
+from snapshot import SNAPSHOT_FILE
+from universe import normalize_ticker
+
+PORT = 8502
+CHECK_INTERVAL = 5.0  # Sekunden zwischen zwei Prüfungen auf einen neuen Snapshot
+CACHE_SIZE = 256
+
+
+def file_version(path: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+class Snapshot:
+    """Eine geladene Version: Universe-Frame, Ticker-Index und Metadaten (nach dem Laden unverändert)."""
+
+    def __init__(self, version: str, df_univ, meta: dict):
+        self.version = version
+        self.etag = '"' + hashlib.sha1(version.encode()).hexdigest()[:16] + '"'
+        self.df = df_univ
+        self.meta = meta
+        self.pos = {t: i for i, t in enumerate(df_univ["Ticker"])}
+        self.columns = [c for c in df_univ.columns if not str(c).startswith("_")]
+
+
+class SnapshotStore:
+    """Hält die aktuelle Snapshot-Version und tauscht sie aus, sobald sich die Dateien ändern."""
+
+    def __init__(self, data_file: str | None = None, spy_file: str = SPY_FILE, check_interval: float = CHECK_INTERVAL):
+        self.data_file = data_file
+        self.spy_file = spy_file
+        self.check_interval = check_interval
+        self._current: Snapshot | None = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _path(self) -> str:
+        return self.data_file or (SNAPSHOT_FILE if os.path.exists(SNAPSHOT_FILE) else CSV_FILE)
+
+    def _version(self) -> str:
+        path = self._path()
+        return f"{path}|{file_version(path)}|{file_version(self.spy_file)}"
+
+    def get(self) -> Snapshot:
+        snap = self._current
+        if snap is not None and time.monotonic() - self._checked < self.check_interval:
+            return snap
+        # Nur ein Thread prüft/lädt; die anderen antworten solange mit der bisherigen Version
+        if snap is not None and not self._lock.acquire(blocking=False):
+            return snap
+        if snap is None:
+            self._lock.acquire()
+        try:
+            self._checked = time.monotonic()
+            version = self._version()
+            if self._current is None or self._current.version != version:
+                t = time.perf_counter()
+                df_univ, meta = load_universe(self._path(), self.spy_file)
+                self._current = Snapshot(version, df_univ, meta)
+                with self._cache_lock:
+                    self._cache.clear()
+                print(f"Snapshot geladen: {len(df_univ)} Aktien, Stand {meta.get('as_of', '?')} "
+                      f"({time.perf_counter() - t:.2f}s)")
+            return self._current
+        finally:
+            self._lock.release()
+
+    def cached(self, key: tuple, build) -> bytes:
+        with self._cache_lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return body
+        body = build()
+        with self._cache_lock:
+            self._cache[key] = body
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return body
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _as_bool(v: str) -> bool:
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _positive_int(name: str, v: str) -> int:
+    try:
+        n = int(v)
+    except ValueError:
+        n = 0
+    if n <= 0:
+        raise ValueError(f"{name} must be a positive integer, got {v!r}")
+    return n
+
+
+def scan_query(params: dict[str, str]) -> dict:
+    """Query-Parameter -> Scan-Spec; Typen wie SPEC_DEFAULTS / CUSTOM_KEYS_DEFAULTS."""
+    spec, filters = {}, {}
+    for k, v in params.items():
+        if k == "limit":
+            spec[k] = _positive_int(k, v)
+        elif k in ("rs_min", "rs_gap"):
+            spec[k] = int(v)
+        elif k == "strict_chain":
+            spec[k] = _as_bool(v)
+        elif k == "columns":
+            spec[k] = [c for c in v.split(",") if c]
+        elif k in SPEC_DEFAULTS or k == "name":
+            spec[k] = v
+        else:
+            key = k if k.startswith("cf_") else f"cf_{k}"
+            if key not in CUSTOM_KEYS_DEFAULTS:
+                raise ValueError(f"Unknown parameter {k!r}")
+            default = CUSTOM_KEYS_DEFAULTS[key]
+            filters[key] = _as_bool(v) if isinstance(default, bool) else float(v) if isinstance(default, float) else v
+    if filters:
+        spec["filters"] = filters
+    return scan_spec(spec)
+
+
+def _json(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def handle(store: SnapshotStore, path: str, params: dict[str, str]) -> tuple[Snapshot, bytes]:
+    """(Snapshot, JSON-Body) für eine Anfrage; ApiError für 400/404."""
+    snap = store.get()
+    key = (snap.version, path, tuple(sorted(params.items())))
+
+    if path == "/health":
+        return snap, _json({"version": snap.etag.strip('"'), "as_of": snap.meta.get("as_of"), "rows": len(snap.df)})
+
+    if path == "/universe":
+        # Parameter vor build() prüfen: Fehler sind 400, nicht 500
+        cols = [c for c in params.get("columns", "").split(",") if c] or RESULT_COLS
+        unknown = [c for c in cols if c not in snap.columns and c not in RESULT_COLS]
+        if unknown:
+            raise ApiError(400, f"Unknown columns: {', '.join(unknown)}")
+        try:
+            limit = _positive_int("limit", params["limit"]) if "limit" in params else None
+        except ValueError as e:
+            raise ApiError(400, str(e))
+
+        def build():
+            df = snap.df.reindex(columns=[c for c in cols if c in snap.df.columns])
+            if limit:
+                df = df.head(limit)
+            return _json({"as_of": snap.meta.get("as_of"), "rows": records(df)})
+        return snap, store.cached(key, build)
+
+    if path.startswith("/ticker/"):
+        sym = normalize_ticker(unquote(path[len("/ticker/"):]))
+        if sym not in snap.pos:
+            raise ApiError(404, f"Unknown ticker {sym!r}")
+        row = snap.df.iloc[[snap.pos[sym]]][snap.columns]
+        return snap, _json({"as_of": snap.meta.get("as_of"), "ticker": records(row)[0]})
+
+    if path == "/scan":
+        try:
+            spec = scan_query(params)
+        except ValueError as e:
+            raise ApiError(400, str(e))
+
+        def build():
+            try:
+                res = run_spec(snap.df, spec)
+            except ValueError as e:
+                raise ApiError(400, str(e))
+            return _json({"as_of": snap.meta.get("as_of"), "scan": spec["name"], "matches": len(res),
+                          "rows": records(res)})
+        return snap, store.cached(key, build)
+
+    raise ApiError(404, f"Unknown endpoint {path!r}")
+
+
+def make_handler(store: SnapshotStore):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: bytes = b"", etag: str | None = None):
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if status != 304:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query, keep_blank_values=False))
+            path = url.path.rstrip("/") or "/"
+            try:
+                # Erst routen und prüfen, damit unbekannte Ticker/Parameter auch mit ETag 404/400 bleiben;
+                # Ergebnisse sind je Version gecacht, ein 304 kostet danach nur den Cache-Zugriff
+                snap, body = handle(store, path, params)
+                if self.headers.get("If-None-Match") == snap.etag and path != "/health":
+                    self._send(304, etag=snap.etag)
+                    return
+                self._send(200, body, etag=snap.etag)
+            except ApiError as e:
+                self._send(e.status, _json({"error": str(e)}))
+            except Exception as e:
+                self._send(500, _json({"error": f"{type(e).__name__}: {e}"}))
+
+        do_HEAD = do_GET
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Standard 5: bei vielen gleichzeitigen Clients Verbindungs-Retries (~1s)
+
+
+def serve(host: str = "127.0.0.1", port: int = PORT, data_file: str | None = None,
+          check_interval: float = CHECK_INTERVAL) -> ApiServer:
+    store = SnapshotStore(data_file, check_interval=check_interval)
+    store.get()
+    return ApiServer((host, port), make_handler(store))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--data", help="Snapshot (.arrow) oder Screener-CSV (Standard: Snapshot, sonst CSV)")
+    parser.add_argument("--check-interval", type=float, default=CHECK_INTERVAL)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.data, args.check_interval)
+    print(f"API läuft auf http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
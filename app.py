@@ -1,11 +1,24 @@
+from contextlib import contextmanager
 from datetime import datetime, timezone
+import glob
 import os
 import re
+import time
 
-import numpy as np
 import pandas as pd
 import streamlit as st
 
+from archive import ARCHIVE_DIR, archive_dates, day_path, read_archived, read_static, static_path
+from groups import GROUP_COLS, group_rs
+from live import REFERENCE_FILE, LiveRanker, ReplayFeed, YahooQuotes, apply_live, read_reference_closes
+from render import TABLE_CSS, table_html
+from rs_history import RS_HISTORY_DIR, load_rs_history, ticker_history, trajectory
+from run_report import read_report
+from scan_engine import CUSTOM_KEYS_DEFAULTS, run_scan, scan_universe, top_k_positions
+from snapshot import SNAPSHOT_FILE, read_snapshot
+from symbol_index import SymbolIndex
+from universe import REL_TIMEFRAMES, benchmark_returns, build_universe, read_only, relative_returns
+
 # ============================================================
 # CONFIG
 # ============================================================
@@ -14,7 +27,9 @@ st.set_page_config(page_title="Relative Strength Stock Screener", layout="wide")
 BENCHMARK = "SPY"
 
 # NOTE: Your repo folder is "Data" (capital D). Linux is case-sensitive.
-DATA_FILE = "Data/Screener_Data.csv"
+# The typed snapshot (update_data.py) is preferred; the CSV export is the fallback.
+CSV_FILE = "Data/Screener_Data.csv"
+DATA_FILE = SNAPSHOT_FILE if os.path.exists(SNAPSHOT_FILE) else CSV_FILE
 SPY_FILE = "Data/SPY_Data.csv"
 
 
@@ -22,6 +37,19 @@ def _asof_ts():
     return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
 
+# Per-rerun stage timings, shown in the sidebar when "Show debug timings" is on
+_timings: dict[str, float] = {}
+
+
+@contextmanager
+def timed(name: str):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings[name] = _timings.get(name, 0.0) + time.perf_counter() - t
+
+
 # =========================
 # CSS (MATCH YOUR DASHBOARD)
 # =========================
@@ -70,213 +98,14 @@ th.rs-gap, td.rs-gap{
 }
 </style>
 """
-st.markdown(CSS, unsafe_allow_html=True)
+st.markdown(CSS + TABLE_CSS, unsafe_allow_html=True)
 
 
 # ============================================================
 # HELPERS
 # ============================================================
-def normalize_ticker(t: str) -> str:
-    t = (t or "").strip().upper()
-    t = t.replace(" ", "")
-    t = t.replace("/", "-")
-    return t
-
-
-def to_float_pct_series(s: pd.Series) -> pd.Series:
-    """
-    Converts percent-units to fractional returns.
-    Example: 12.3 -> 0.123, "12.3%" -> 0.123
-    """
-    if s is None:
-        return pd.Series(np.nan)
-
-    if getattr(s.dtype, "kind", "") in "if":
-        return pd.to_numeric(s, errors="coerce") / 100.0
-
-    ss = s.astype(str).str.strip()
-    ss = ss.str.replace("%", "", regex=False).str.replace(",", "", regex=False).str.strip()
-    ss = ss.str.replace(r"[^0-9\.\-\+]", "", regex=True)
-    return pd.to_numeric(ss, errors="coerce") / 100.0
-
-
-def find_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
-    cols = [str(c) for c in df.columns]
-    low = {c.lower().strip(): c for c in cols}
-
-    for cand in candidates:
-        cand_l = str(cand).lower().strip()
-        if cand_l in low:
-            return low[cand_l]
-
-    for c in cols:
-        cl = c.lower()
-        for cand in candidates:
-            if str(cand).lower() in cl:
-                return c
-    return None
-
-
-def rs_bg(v):
-    try:
-        v = float(v)
-    except:
-        return ""
-    if np.isnan(v):
-        return ""
-    x = (v - 1) / 98.0
-    if x < 0.5:
-        r = 255
-        g = int(80 + (x / 0.5) * (180 - 80))
-    else:
-        r = int(255 - ((x - 0.5) / 0.5) * (255 - 40))
-        g = 200
-    b = 60
-    return (
-        f"background-color: rgb({r},{g},{b}); color:#0B0B0B; font-weight:900; "
-        "border-radius:6px; padding:2px 6px; display:inline-block; min-width:32px; text-align:center;"
-    )
-
-
-def pct_style(v):
-    try:
-        v = float(v)
-    except:
-        return ""
-    if np.isnan(v):
-        return ""
-    if v > 0:
-        return "color:#7CFC9A; font-weight:800;"
-    if v < 0:
-        return "color:#FF6B6B; font-weight:800;"
-    return "opacity:0.9; font-weight:700;"
-
-
-def fmt_price(v):
-    try:
-        if v is None or (isinstance(v, float) and np.isnan(v)):
-            return ""
-        return f"${float(v):,.2f}"
-    except:
-        return ""
-
-
-def fmt_pct(v):
-    try:
-        if v is None or (isinstance(v, float) and np.isnan(v)):
-            return ""
-        return f"{float(v):.2%}"
-    except:
-        return ""
-
-
-def fmt_rs(v):
-    try:
-        if v is None or (isinstance(v, float) and np.isnan(v)):
-            return ""
-        return f"{float(v):.0f}"
-    except:
-        return ""
-
-
-def fmt_big_num(v):
-    try:
-        if v is None or (isinstance(v, float) and np.isnan(v)):
-            return ""
-        x = float(v)
-        ax = abs(x)
-        if ax >= 1e12:
-            return f"{x/1e12:.2f}T"
-        if ax >= 1e9:
-            return f"{x/1e9:.2f}B"
-        if ax >= 1e6:
-            return f"{x/1e6:.2f}M"
-        if ax >= 1e3:
-            return f"{x/1e3:.2f}K"
-        return f"{x:,.0f}"
-    except:
-        return ""
-
-
 def render_table_html(df: pd.DataFrame, columns: list[str], height_px: int = 900):
-    ths = []
-    for c in columns:
-        th_cls = "rs-gap" if c == "RS GAP" else ""
-        ths.append(f'<th class="{th_cls}">{c}</th>')
-    th = "".join(ths)
-
-    trs = []
-    for _, row in df.iterrows():
-        tds = []
-        for c in columns:
-            val = row.get(c, "")
-            td_class = ""
-
-            if c == "Ticker":
-                td_class = "ticker"
-            elif c == "Name":
-                td_class = "name"
-            elif c == "RS GAP":
-                td_class = "mono rs-gap"
-            elif c in ["Price", "Mkt Cap", "Volume", "Avg Vol 30D", "Float", "SMA200", "SMA50", "SMA20", "SMA10"]:
-                td_class = "mono"
-            elif c.startswith("% ") or c.startswith("RS ") or c in [
-                "ADR%", "ATR%", "% From 52W High", "% From ATH",
-                "Vol Chg 1D", "Vol Chg 1W", "Vol Chg 1M",
-                "EPS Qtr YoY", "EPS Ann YoY", "Rev Qtr YoY", "Rev Ann YoY",
-                "ROE TTM", "PreTax Mgn TTM"
-            ]:
-                td_class = "mono"
-            elif c in ["P>200", "P>50", "P>20", "P>10", "50>200"]:
-                td_class = "mono"
-
-            if isinstance(val, (bool, np.bool_)) and c in ["P>200", "P>50", "P>20", "P>10", "50>200"]:
-                cell_html = "✓" if bool(val) else ""
-            elif c == "Price":
-                cell_html = fmt_price(val)
-            elif c in ["SMA200", "SMA50", "SMA20", "SMA10"]:
-                cell_html = fmt_price(val)
-            elif c in ["Mkt Cap", "Volume", "Avg Vol 30D", "Float"]:
-                cell_html = fmt_big_num(val)
-            elif c.startswith("% ") or c in [
-                "ADR%", "ATR%", "% From 52W High", "% From ATH",
-                "Vol Chg 1D", "Vol Chg 1W", "Vol Chg 1M",
-                "EPS Qtr YoY", "EPS Ann YoY", "Rev Qtr YoY", "Rev Ann YoY",
-                "ROE TTM", "PreTax Mgn TTM"
-            ]:
-                txt = fmt_pct(val)
-                stl = pct_style(val)
-                cell_html = f'<span style="{stl}">{txt}</span>' if stl and txt != "" else txt
-            elif c.startswith("RS "):
-                txt = fmt_rs(val)
-                stl = rs_bg(val)
-                cell_html = f'<span style="{stl}">{txt}</span>' if stl and txt != "" else txt
-            elif c == "RS GAP":
-                try:
-                    if val is None or (isinstance(val, float) and np.isnan(val)):
-                        cell_html = ""
-                    else:
-                        cell_html = f"{float(val):+.0f}"
-                except:
-                    cell_html = ""
-            else:
-                cell_html = "" if (val is None or (isinstance(val, float) and np.isnan(val))) else str(val)
-
-            tds.append(f'<td class="{td_class}">{cell_html}</td>')
-
-        trs.append("<tr>" + "".join(tds) + "</tr>")
-
-    table = f"""
-    <div class="pl-table-wrap" style="max-height:{height_px}px; overflow:auto;">
-      <table class="pl-table">
-        <thead><tr>{th}</tr></thead>
-        <tbody>
-          {''.join(trs)}
-        </tbody>
-      </table>
-    </div>
-    """
-    st.markdown(table, unsafe_allow_html=True)
+    st.markdown(table_html(df, columns, height_px), unsafe_allow_html=True)
 
 
 # ============================================================
@@ -324,8 +153,9 @@ def _tl_sidebar_controls(df_cols: list[str]):
     if not enabled:
         return False, "", []
 
-    ticker_in = st.text_input("Ticker (ex: NVDA)", key="tl_ticker", placeholder="NVDA")
-    ticker = normalize_ticker(ticker_in)
+    # One ticker, or a comma-separated list for a batch table
+    ticker_in = st.text_input("Ticker(s) (ex: NVDA or NVDA, AMD, MSFT)", key="tl_ticker", placeholder="NVDA")
+    ticker = (ticker_in or "").strip()
 
     c1, c2, c3 = st.columns(3)
     with c1:
@@ -340,7 +170,7 @@ def _tl_sidebar_controls(df_cols: list[str]):
     # Group definitions using *your actual column names* (no guessing)
     groups = {
         "Core": ["Ticker", "Name", "Price", "Sector"],
-        "RS": ["RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y", "RS GAP"],
+        "RS": ["RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y", "RS Composite", "RS GAP"],
         "% Performance": ["% 1D", "% 1W", "% 1M", "% 3M", "% 6M", "% 1Y"],
         "Liquidity": ["Mkt Cap", "Float"],
         "Volume": ["Volume", "Avg Vol 30D", "Vol Chg 1D", "Vol Chg 1W", "Vol Chg 1M", "Rel Vol 1D", "Rel Vol 1W", "Rel Vol 1M"],
@@ -387,10 +217,98 @@ def _tl_sidebar_controls(df_cols: list[str]):
     return True, ticker, ordered
 
 
-def render_ticker_lookup_dashboard(df_master: pd.DataFrame):
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_symbol_index(version: str, _df: pd.DataFrame) -> SymbolIndex:
+    """Built once per snapshot (keyed on version) and shared by all sessions."""
+    return SymbolIndex(_df["Ticker"].tolist(), _df["Name"].tolist())
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_rs_history_cached(version: str):
+    """Daily RS ratings (dates, tickers, uint8 ranks) written by update_data.py; keyed on version."""
+    return load_rs_history(RS_HISTORY_DIR)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_group_rs(version: str, by: str, rs_col: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """Group RS table (groups.group_rs), computed once per snapshot, group column and RS column."""
+    return group_rs(_df, by, rs_col)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_live_ranker(version: str, exclude: tuple[str, ...]) -> LiveRanker:
+    """One live ranker per published snapshot, shared by all sessions (prices are global)."""
+    ref, as_of = read_reference_closes(REFERENCE_FILE)
+    return LiveRanker(ref, as_of, exclude=list(exclude))
+
+
+@st.cache_resource(show_spinner=False)
+def live_feed():
+    """Yahoo quotes; RS_LIVE_REPLAY=<ticks.csv> (Time, Ticker, Price) replays a recorded session instead."""
+    replay = os.environ.get("RS_LIVE_REPLAY")
+    return ReplayFeed.from_csv(replay, loop=True) if replay else YahooQuotes()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_live_universe(version: str, live_version: int, _df_univ: pd.DataFrame, _ranker: LiveRanker) -> pd.DataFrame:
+    """df_univ with the live prices/ranks applied, built once per ranker version for all sessions; read-only."""
+    return read_only(apply_live(_df_univ, _ranker.frame()))
+
+
+def render_live_status(ranker: LiveRanker, interval: int):
+    """Pulls new prices (at most once per interval for all sessions) and reruns the app when they changed."""
+    ranker.refresh(live_feed(), min_interval=interval * 0.9)
+    if ranker.updated_at:
+        ts = datetime.fromtimestamp(ranker.updated_at, timezone.utc).strftime("%H:%M:%S UTC")
+        st.caption(f"Live • {ts} • {ranker.last_changed:,} prices changed • "
+                   f"update + re-rank {ranker.last_seconds * 1000:.0f} ms")
+    if ranker.version != st.session_state.get("_live_seen"):
+        st.rerun(scope="app")
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_relative_returns(version: str, _df: pd.DataFrame, _bench: pd.DataFrame):
+    """(tickers x benchmarks x timeframes) rel_ret array, built once per snapshot; read-only."""
+    rel = relative_returns(_df, _bench)
+    rel.flags.writeable = False
+    return rel
+
+
+def rs_history_version() -> str:
+    parts = sorted(glob.glob(os.path.join(RS_HISTORY_DIR, "*.npz")))
+    return f"{len(parts)}|{file_version(parts[-1])}" if parts else ""
+
+
+def _fmt_signed(x: pd.Series) -> pd.Series:
+    return x.map(lambda v: "" if pd.isna(v) else f"{v:+.0f}")
+
+
+def render_rs_trajectory(ticker: str, rs_hist):
+    """Stored RS ratings of one ticker: change over 5/20 days, days in the top decile, 6M chart."""
+    if rs_hist is None:
+        return
+    hist = ticker_history(*rs_hist, ticker)
+    if hist is None or hist.empty:
+        return
+
+    traj = trajectory(hist)
+    traj["Chg 5D"] = _fmt_signed(traj["Chg 5D"])
+    traj["Chg 20D"] = _fmt_signed(traj["Chg 20D"])
+
+    st.markdown('<div class="small-muted">RS history</div>', unsafe_allow_html=True)
+    c1, c2 = st.columns([2, 3])
+    with c1:
+        render_table_html(traj, traj.columns.tolist(), height_px=240)
+    with c2:
+        st.line_chart(hist.iloc[-126:][["RS 1M", "RS 3M", "RS 1Y"]], height=240)
+
+
+def render_ticker_lookup_dashboard(df_master: pd.DataFrame, index: SymbolIndex, rs_hist=None):
     """
-    Uses df_master (your full df with RS/perf/fundamentals already computed).
+    Uses df_master (your full df with RS/perf/fundamentals already computed) and its SymbolIndex.
     Renders the dashboard above scanner results when enabled and a ticker is provided.
+    A comma-separated list renders all found tickers as one batch table.
+    rs_hist (load_rs_history_cached) adds the RS trajectory for a single ticker.
     """
     if df_master is None or df_master.empty:
         return
@@ -408,31 +326,38 @@ def render_ticker_lookup_dashboard(df_master: pd.DataFrame):
         st.caption("Type a ticker in the sidebar to view its dashboard.")
         return
 
-    # Find row
-    tnorm = normalize_ticker(ticker)
-    hit = df_master[df_master["Ticker"].astype(str).map(normalize_ticker) == tnorm]
+    # Find row(s)
+    positions, not_found = index.lookup_many(ticker)
+    batch = len(positions) + len(not_found) > 1
 
     st.markdown('<div class="section-title">Ticker Lookup</div>', unsafe_allow_html=True)
 
-    if hit.empty:
-        # show suggestions
-        starts = df_master[df_master["Ticker"].astype(str).map(normalize_ticker).str.startswith(tnorm, na=False)]
-        if not starts.empty:
+    if not positions and not batch:
+        # show suggestions (ticker prefix, company name, close typos)
+        starts = index.suggest(ticker)
+        if starts:
             st.warning(f"No exact match for {ticker}. Closest tickers:")
-            st.write(", ".join(starts["Ticker"].head(15).tolist()))
+            st.write(", ".join(df_master["Ticker"].iloc[starts].tolist()))
         else:
             st.warning(f"No match found for {ticker}.")
         return
 
-    row = hit.iloc[[0]].copy()  # keep as DF
+    if not_found:
+        st.warning("No match found for: " + ", ".join(not_found))
+    if not positions:
+        return
+
+    rows = df_master.iloc[positions]  # keep as DF
 
     # Always enforce valid columns
-    selected_cols = [c for c in (selected_cols or []) if c in row.columns]
+    selected_cols = [c for c in (selected_cols or []) if c in rows.columns]
     if len(selected_cols) == 0:
         selected_cols = ["Ticker"]
 
-    # Render as your same styled table (single row)
-    render_table_html(row[selected_cols], selected_cols, height_px=240)
+    # Render as your same styled table (single row, or one row per ticker)
+    render_table_html(rows[selected_cols], selected_cols, height_px=240 if len(rows) == 1 else 600)
+    if len(rows) == 1:
+        render_rs_trajectory(rows["Ticker"].iloc[0], rs_hist)
 
     st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
 
@@ -440,47 +365,6 @@ def render_ticker_lookup_dashboard(df_master: pd.DataFrame):
 # ============================================================
 # CUSTOM FILTER STATE HELPERS (RESET + PRESETS)
 # ============================================================
-CUSTOM_KEYS_DEFAULTS = {
-    "cf_min_mktcap": 0.0,
-    "cf_min_float": 0.0,
-
-    "cf_min_vol1d": 0.0,
-    "cf_min_avgvol30": 0.0,
-
-    "cf_min_volchg_1d": 0.0,
-    "cf_min_volchg_1w": 0.0,
-    "cf_min_volchg_1m": 0.0,
-
-    "cf_min_rvol_1d": 0.0,
-    "cf_min_rvol_1w": 0.0,
-    "cf_min_rvol_1m": 0.0,
-
-    "cf_min_eps_q": 0.0,
-    "cf_min_eps_a": 0.0,
-    "cf_min_rev_q": 0.0,
-    "cf_min_rev_a": 0.0,
-    "cf_min_roe": 0.0,
-    "cf_min_pretax": 0.0,
-
-    "cf_max_from_52w": 0.0,
-    "cf_max_from_ath": 0.0,
-
-    "cf_min_adr": 0.0,
-    "cf_min_atr": 0.0,
-
-    "cf_sector_choice": "All",
-
-    "cf_p_above_200": False,
-    "cf_p_above_50": False,
-    "cf_p_above_20": False,
-    "cf_p_above_10": False,
-
-    "cf_trend_template_1": False,
-
-    "cf_preset": "None",
-}
-
-
 def _init_custom_state():
     for k, v in CUSTOM_KEYS_DEFAULTS.items():
         if k not in st.session_state:
@@ -513,238 +397,134 @@ def _apply_preset_super_performers():
 # ============================================================
 # LOAD DATA
 # ============================================================
-@st.cache_data(show_spinner=False)
-def load_csv(path: str) -> pd.DataFrame:
-    return pd.read_csv(path)
-
-
-if not os.path.exists(DATA_FILE):
-    st.error(f"Could not find universe file at: {DATA_FILE}")
-    st.stop()
-
-if not os.path.exists(SPY_FILE):
-    st.error(f"Could not find SPY file at: {SPY_FILE}")
-    st.stop()
-
-df_raw = load_csv(DATA_FILE)
-spy_raw = load_csv(SPY_FILE)
-
-if df_raw.empty:
-    st.error(f"{DATA_FILE} loaded but is empty.")
-    st.stop()
-
-if spy_raw.empty:
-    st.error(f"{SPY_FILE} loaded but is empty.")
-    st.stop()
-
-# ------------------------------------------------------------
-# Map core columns (existing)
-# ------------------------------------------------------------
-c_symbol = find_col(df_raw, ["Symbol"])
-c_name = find_col(df_raw, ["Description", "Name"])
-c_price = find_col(df_raw, ["Price", "Last"])
-
-c_1d = find_col(df_raw, ["Price Change % 1 day", "1 day", "daily"])
-c_1w = find_col(df_raw, ["Performance % 1 week", "1 week", "weekly"])
-c_1m = find_col(df_raw, ["Performance % 1 month", "1 month", "monthly"])
-c_3m = find_col(df_raw, ["Performance % 3 months", "3 months", "quarter"])
-c_6m = find_col(df_raw, ["Performance % 6 months", "6 months", "half"])
-c_1y = find_col(df_raw, ["Performance % 1 year", "1 year", "annual"])
-
-if not c_symbol:
-    st.error("Universe CSV must include a Symbol column (or similar).")
-    st.stop()
-
-# ------------------------------------------------------------
-# Map Custom filter columns (TradingView export)
-# ------------------------------------------------------------
-c_mktcap = find_col(df_raw, ["Market capitalization"])
-c_vol1d = find_col(df_raw, ["Volume 1 day", "Volume"])
-c_volchg_1d = find_col(df_raw, ["Volume Change % 1 day"])
-c_volchg_1w = find_col(df_raw, ["Volume Change % 1 week"])
-c_volchg_1m = find_col(df_raw, ["Volume Change % 1 month"])
-c_avgvol30 = find_col(df_raw, ["Average Volume 30 days"])
-c_rvol1d = find_col(df_raw, ["Relative Volume 1 day"])
-c_rvol1w = find_col(df_raw, ["Relative Volume 1 week"])
-c_rvol1m = find_col(df_raw, ["Relative Volume 1 month"])
-c_float = find_col(df_raw, ["Free float"])
-
-c_eps_q = find_col(df_raw, ["Earnings per share diluted growth %, Quarterly YoY"])
-c_eps_a = find_col(df_raw, ["Earnings per share diluted growth %, Annual YoY"])
-c_rev_q = find_col(df_raw, ["Revenue growth %, Quarterly YoY"])
-c_rev_a = find_col(df_raw, ["Revenue growth %, Annual YoY"])
-c_roe = find_col(df_raw, ["Return on equity %, Trailing 12 months"])
-c_pretax = find_col(df_raw, ["Pretax margin %, Trailing 12 months"])
-
-c_high52 = find_col(df_raw, ["High 52 weeks"])
-c_ath = find_col(df_raw, ["High All Time"])
-
-c_adr = find_col(df_raw, ["Average Daily Range %"])
-c_atr = find_col(df_raw, ["Average True Range % (14) 1 day", "Average True Range %"])
-
-c_sma200 = find_col(df_raw, ["Simple Moving Average (200) 1 day"])
-c_sma50 = find_col(df_raw, ["Simple Moving Average (50) 1 day"])
-c_sma20 = find_col(df_raw, ["Simple Moving Average (20) 1 day"])
-c_sma10 = find_col(df_raw, ["Simple Moving Average (10) 1 day"])
-
-c_sector = find_col(df_raw, ["Sector"])
-
-# ------------------------------------------------------------
-# SPY column map
-# ------------------------------------------------------------
-spy_symbol = find_col(spy_raw, ["Symbol"]) or c_symbol
-spy_1w = find_col(spy_raw, [c_1w]) if c_1w else None
-spy_1m = find_col(spy_raw, [c_1m]) if c_1m else None
-spy_3m = find_col(spy_raw, [c_3m]) if c_3m else None
-spy_6m = find_col(spy_raw, [c_6m]) if c_6m else None
-spy_1y = find_col(spy_raw, [c_1y]) if c_1y else None
-
-# ============================================================
-# BUILD UNIVERSE FRAME
-# ============================================================
-df = pd.DataFrame()
-df["Ticker"] = df_raw[c_symbol].astype(str).map(normalize_ticker)
-df = df[df["Ticker"].str.len() > 0].drop_duplicates(subset=["Ticker"]).copy()
-df["Name"] = df_raw[c_name].astype(str) if c_name else df["Ticker"]
-df["Price"] = pd.to_numeric(df_raw[c_price], errors="coerce") if c_price else np.nan
-
-# Returns (fractional)
-df["r_1d"] = to_float_pct_series(df_raw[c_1d]) if c_1d else np.nan
-df["r_1w"] = to_float_pct_series(df_raw[c_1w]) if c_1w else np.nan
-df["r_1m"] = to_float_pct_series(df_raw[c_1m]) if c_1m else np.nan
-df["r_3m"] = to_float_pct_series(df_raw[c_3m]) if c_3m else np.nan
-df["r_6m"] = to_float_pct_series(df_raw[c_6m]) if c_6m else np.nan
-df["r_1y"] = to_float_pct_series(df_raw[c_1y]) if c_1y else np.nan
-
-# Custom raw numeric fields
-df["Mkt Cap"] = pd.to_numeric(df_raw[c_mktcap], errors="coerce") if c_mktcap else np.nan
-df["Volume"] = pd.to_numeric(df_raw[c_vol1d], errors="coerce") if c_vol1d else np.nan
-df["Avg Vol 30D"] = pd.to_numeric(df_raw[c_avgvol30], errors="coerce") if c_avgvol30 else np.nan
-df["Float"] = pd.to_numeric(df_raw[c_float], errors="coerce") if c_float else np.nan
-
-# Volume changes + growth/margins as FRACTIONS
-df["Vol Chg 1D"] = to_float_pct_series(df_raw[c_volchg_1d]) if c_volchg_1d else np.nan
-df["Vol Chg 1W"] = to_float_pct_series(df_raw[c_volchg_1w]) if c_volchg_1w else np.nan
-df["Vol Chg 1M"] = to_float_pct_series(df_raw[c_volchg_1m]) if c_volchg_1m else np.nan
-
-df["Rel Vol 1D"] = pd.to_numeric(df_raw[c_rvol1d], errors="coerce") if c_rvol1d else np.nan
-df["Rel Vol 1W"] = pd.to_numeric(df_raw[c_rvol1w], errors="coerce") if c_rvol1w else np.nan
-df["Rel Vol 1M"] = pd.to_numeric(df_raw[c_rvol1m], errors="coerce") if c_rvol1m else np.nan
-
-df["EPS Qtr YoY"] = to_float_pct_series(df_raw[c_eps_q]) if c_eps_q else np.nan
-df["EPS Ann YoY"] = to_float_pct_series(df_raw[c_eps_a]) if c_eps_a else np.nan
-df["Rev Qtr YoY"] = to_float_pct_series(df_raw[c_rev_q]) if c_rev_q else np.nan
-df["Rev Ann YoY"] = to_float_pct_series(df_raw[c_rev_a]) if c_rev_a else np.nan
-df["ROE TTM"] = to_float_pct_series(df_raw[c_roe]) if c_roe else np.nan
-df["PreTax Mgn TTM"] = to_float_pct_series(df_raw[c_pretax]) if c_pretax else np.nan
-
-df["_high52"] = pd.to_numeric(df_raw[c_high52], errors="coerce") if c_high52 else np.nan
-df["_ath"] = pd.to_numeric(df_raw[c_ath], errors="coerce") if c_ath else np.nan
-
-df["ADR%"] = to_float_pct_series(df_raw[c_adr]) if c_adr else np.nan
-df["ATR%"] = to_float_pct_series(df_raw[c_atr]) if c_atr else np.nan
-
-df["_sma200"] = pd.to_numeric(df_raw[c_sma200], errors="coerce") if c_sma200 else np.nan
-df["_sma50"] = pd.to_numeric(df_raw[c_sma50], errors="coerce") if c_sma50 else np.nan
-df["_sma20"] = pd.to_numeric(df_raw[c_sma20], errors="coerce") if c_sma20 else np.nan
-df["_sma10"] = pd.to_numeric(df_raw[c_sma10], errors="coerce") if c_sma10 else np.nan
-
-# Display MA values
-df["SMA200"] = df["_sma200"]
-df["SMA50"] = df["_sma50"]
-df["SMA20"] = df["_sma20"]
-df["SMA10"] = df["_sma10"]
-
-df["Sector"] = df_raw[c_sector].astype(str) if c_sector else ""
-
-# % from highs (fractional, usually negative)
-df["% From 52W High"] = np.where(
-    np.isfinite(df["_high52"]) & (df["_high52"] > 0) & np.isfinite(df["Price"]),
-    (df["Price"] / df["_high52"]) - 1.0,
-    np.nan,
-)
-df["% From ATH"] = np.where(
-    np.isfinite(df["_ath"]) & (df["_ath"] > 0) & np.isfinite(df["Price"]),
-    (df["Price"] / df["_ath"]) - 1.0,
-    np.nan,
-)
-
-# Price above MA booleans
-df["P>200"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma200"]), df["Price"] > df["_sma200"], False)
-df["P>50"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma50"]), df["Price"] > df["_sma50"], False)
-df["P>20"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma20"]), df["Price"] > df["_sma20"], False)
-df["P>10"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma10"]), df["Price"] > df["_sma10"], False)
-df["50>200"] = np.where(np.isfinite(df["_sma50"]) & np.isfinite(df["_sma200"]), df["_sma50"] > df["_sma200"], False)
+def file_version(path: str) -> str:
+    """Cheap content key for caches: changes whenever the updater publishes a new file."""
+    try:
+        stt = os.stat(path)
+    except OSError:
+        return ""
+    return f"{stt.st_mtime_ns}:{stt.st_size}"
 
-# ============================================================
-# SPY RETURNS
-# ============================================================
-spy_raw["__sym__"] = spy_raw[spy_symbol].astype(str).map(normalize_ticker)
-spy_row = spy_raw[spy_raw["__sym__"] == normalize_ticker(BENCHMARK)]
-if spy_row.empty:
-    st.error(f"No row found for {BENCHMARK} in {SPY_FILE}. Make sure Symbol=SPY exists.")
-    st.stop()
-spy_row = spy_row.iloc[0]
 
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_csv(path: str, version: str = "") -> pd.DataFrame:
+    """
+    Loads the screener CSV or the typed .arrow snapshot (no text parsing, memory-mapped).
+    Snapshot metadata (as-of date, schema version, benchmark returns) ends up in df.attrs["snapshot"].
+    `version` only keys the cache (see file_version). Shared and read-only, like load_universe.
+    """
+    if path.endswith(".arrow"):
+        df, meta = read_snapshot(path, memory_map=True)
+        df.attrs["snapshot"] = meta
+        return read_only(df)
+    return read_only(pd.read_csv(path))
+
+
+def load_benchmarks(snap_meta: dict, spy_file: str, version: str) -> pd.DataFrame:
+    """Benchmark rows: snapshot header (all benchmarks, else SPY only), otherwise SPY_Data.csv."""
+    if snap_meta.get("benchmarks"):
+        return pd.DataFrame(snap_meta["benchmarks"])
+    if snap_meta.get("benchmark"):
+        return pd.DataFrame([snap_meta["benchmark"]])
+    if os.path.exists(spy_file):
+        return load_csv(spy_file, version)
+    return pd.DataFrame()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_universe(data_file: str, spy_file: str, version: str):
+    """
+    Column mapping, numeric conversion, SPY-relative returns, RS ranks and RS GAP.
+    Runs once per published snapshot (keyed on `version`); every session gets the same
+    read-only objects (no per-session copy), so sessions keep only masks and positions.
+    Returns (df, df_univ, missing_cols, snap_meta, bench) with bench = benchmark returns
+    (universe.benchmark_returns); raises ValueError with a user-facing message.
+    """
+    df_raw = load_csv(data_file, version)
+    snap_meta = df_raw.attrs.get("snapshot", {})
 
-def spy_ret(col):
-    if not col or col not in spy_raw.columns:
-        return np.nan
-    return float(to_float_pct_series(pd.Series([spy_row[col]])).iloc[0])
+    if df_raw.empty:
+        raise ValueError(f"{data_file} loaded but is empty.")
 
+    spy_raw = load_benchmarks(snap_meta, spy_file, version)
+    if snap_meta.get("derived"):
+        # update_data.py already published the ready-to-screen frame (universe.py)
+        df = df_raw
+        missing_cols = snap_meta.get("missing", [])
+    else:
+        if not os.path.exists(spy_file) and not snap_meta.get("benchmark"):
+            raise ValueError(f"Could not find SPY file at: {spy_file}")
+        if spy_raw.empty:
+            raise ValueError(f"{spy_file} loaded but is empty.")
 
-b_1w = spy_ret(spy_1w)
-b_1m = spy_ret(spy_1m)
-b_3m = spy_ret(spy_3m)
-b_6m = spy_ret(spy_6m)
-b_1y = spy_ret(spy_1y)
+        df, missing_cols = build_universe(df_raw, spy_raw, BENCHMARK)
 
+    df_univ = scan_universe(df, BENCHMARK)
+    return read_only(df), read_only(df_univ), missing_cols, snap_meta, read_only(benchmark_returns(spy_raw))
 
-def rel_ret(r: pd.Series, b: float) -> pd.Series:
-    if not np.isfinite(b):
-        return pd.Series(np.nan, index=r.index)
-    return (1.0 + r) / (1.0 + b) - 1.0
 
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_archive_static(version: str) -> pd.DataFrame:
+    """Deduplicated Ticker/Name/Sector/Industry rows of the archive, shared by all archived days."""
+    return read_static(ARCHIVE_DIR)
 
-df["rr_1w"] = rel_ret(df["r_1w"], b_1w)
-df["rr_1m"] = rel_ret(df["r_1m"], b_1m)
-df["rr_3m"] = rel_ret(df["r_3m"], b_3m)
-df["rr_6m"] = rel_ret(df["r_6m"], b_6m)
-df["rr_1y"] = rel_ret(df["r_1y"], b_1y)
 
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_archived_universe(date: str, version: str):
+    """load_universe for an archived day (archive.py); same return value, shared and read-only."""
+    df, snap_meta = read_archived(date, ARCHIVE_DIR, load_archive_static(file_version(static_path(ARCHIVE_DIR))))
+    df_univ = scan_universe(df, BENCHMARK)
+    bench_raw = load_benchmarks(snap_meta, SPY_FILE, "")
+    return (read_only(df), read_only(df_univ), snap_meta.get("missing", []), snap_meta,
+            read_only(benchmark_returns(bench_raw)))
 
-def to_rs_1_99(s: pd.Series) -> pd.Series:
-    x = pd.to_numeric(s, errors="coerce")
-    return (x.rank(pct=True) * 99).round().clip(1, 99)
 
+# "As of": any archived daily snapshot instead of the latest one
+archived_dates = archive_dates(ARCHIVE_DIR)
+with st.sidebar:
+    as_of = st.selectbox("As of", ["Latest"] + archived_dates, index=0, key="as_of",
+                         help="Load the screener as it was published on an earlier day.") if archived_dates else "Latest"
+historical = as_of != "Latest"
 
-df["RS 1W"] = to_rs_1_99(df["rr_1w"])
-df["RS 1M"] = to_rs_1_99(df["rr_1m"])
-df["RS 3M"] = to_rs_1_99(df["rr_3m"])
-df["RS 6M"] = to_rs_1_99(df["rr_6m"])
-df["RS 1Y"] = to_rs_1_99(df["rr_1y"])
+if not historical and not os.path.exists(DATA_FILE):
+    st.error(f"Could not find universe file at: {DATA_FILE}")
+    st.stop()
 
-# Display % columns (absolute)
-df["% 1D"] = df["r_1d"]
-df["% 1W"] = df["r_1w"]
-df["% 1M"] = df["r_1m"]
-df["% 3M"] = df["r_3m"]
-df["% 6M"] = df["r_6m"]
-df["% 1Y"] = df["r_1y"]
+try:
+    with timed("load_universe"):
+        if historical:
+            data_version = f"archive:{as_of}|{file_version(day_path(as_of, ARCHIVE_DIR))}"
+            df, df_univ, missing_cols, snap_meta, bench = load_archived_universe(as_of, data_version)
+        else:
+            data_version = file_version(DATA_FILE) + "|" + file_version(SPY_FILE)
+            df, df_univ, missing_cols, snap_meta, bench = load_universe(DATA_FILE, SPY_FILE, data_version)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
 
 
 # ============================================================
 # UI
 # ============================================================
 st.title("Relative Strength Stock Screener")
-st.caption(f"As of: {_asof_ts()} • RS Benchmark: {BENCHMARK}")
+_data_asof = f" • Data: {snap_meta['as_of']}" if snap_meta.get("as_of") else ""
+if historical:
+    _data_asof += " (archived)"
+st.caption(f"As of: {_asof_ts()}{_data_asof} • RS Benchmark: {st.session_state.get('benchmark', BENCHMARK)}")
 
 with st.sidebar:
     st.subheader("Controls")
 
+    # Relative returns vs any benchmark in SPY_Data.csv; RS ranks are the same for all of them
+    bench_options = bench.index.tolist() or [BENCHMARK]
+    benchmark = st.selectbox("Benchmark", bench_options, index=0, key="benchmark",
+                             help="Relative return columns are measured against this ETF.")
+
+    # RS Composite only exists in snapshots written by update_data.py (not in TradingView CSVs)
+    has_composite = "RS Composite" in df_univ.columns and df_univ["RS Composite"].notna().any()
     primary_tf = st.selectbox(
         "Rank by",
-        ["RS 1M", "RS 3M", "RS 6M", "RS 1Y", "RS 1W"],
+        ["RS 1M", "RS 3M", "RS 6M", "RS 1Y", "RS 1W"] + (["RS Composite"] if has_composite else []),
         index=0,
         key="primary_tf",
     )
@@ -828,20 +608,8 @@ with st.sidebar:
         # --------------------------------------------------------
         # Missing column warnings (optional but helpful)
         # --------------------------------------------------------
-        missing = []
-        if c_mktcap is None: missing.append("Market Cap")
-        if c_float is None: missing.append("Float")
-        if c_avgvol30 is None: missing.append("Avg Vol 30D")
-        if c_rvol1d is None: missing.append("Rel Vol 1D")
-        if c_eps_q is None: missing.append("EPS Qtr YoY")
-        if c_rev_q is None: missing.append("Rev Qtr YoY")
-        if c_roe is None: missing.append("ROE TTM")
-        if c_pretax is None: missing.append("PreTax Margin TTM")
-        if c_sma200 is None: missing.append("SMA200")
-        if c_sma50 is None: missing.append("SMA50")
-        if c_sector is None: missing.append("Sector")
-        if missing:
-            st.info("Missing in CSV (filters may not work): " + ", ".join(missing))
+        if missing_cols:
+            st.info("Missing in CSV (filters may not work): " + ", ".join(missing_cols))
 
         with st.expander("Liquidity (Market Cap, Float)", expanded=False):
             min_mktcap = st.number_input(
@@ -1011,192 +779,76 @@ with st.sidebar:
             p_above_10 = st.checkbox("Price Above 10MA", key="cf_p_above_10")
             trend_template_1 = st.checkbox("Trend Template 1 (P>200 & P>50 & 50>200)", key="cf_trend_template_1")
 
-    max_results = st.slider("Max Results", 25, 2000, 200, 25, key="max_results")
+    page_size = st.selectbox("Rows per page", [25, 50, 100, 200, 500], index=3, key="page_size")
+    show_timings = st.checkbox("Show debug timings", key="debug_timings")
+
+    # Intraday: latest prices on top of the snapshot's reference closes (live.py); not for archived days
+    live_on = False
+    if os.path.exists(REFERENCE_FILE) and not historical:
+        live_on = st.toggle("Live prices (intraday)", key="live_mode")
+        if live_on:
+            live_interval = st.selectbox("Refresh every (s)", [15, 30, 60, 120, 300], index=2, key="live_interval")
+
+ranker = None
+if live_on:
+    with timed("live"):
+        ranker = load_live_ranker(file_version(REFERENCE_FILE) + "|" + data_version, tuple(bench.index))
+        ranker.refresh(live_feed(), min_interval=live_interval * 0.9)
+        st.session_state["_live_seen"] = ranker.version
+        df_univ = load_live_universe(data_version, ranker.version, df_univ, ranker)
+    st.fragment(run_every=live_interval)(render_live_status)(ranker, live_interval)
+live_version = ranker.version if ranker else None
 
 
 # ============================================================
 # SCAN LOGIC
 # ============================================================
-bench_t = normalize_ticker(BENCHMARK)
-df_univ = df[df["Ticker"] != bench_t].copy()
-
-# RS GAP helper (used only in accel/decel)
-df_univ["RS GAP"] = (
-    pd.to_numeric(df_univ["RS 1M"], errors="coerce")
-    - pd.to_numeric(df_univ["RS 1Y"], errors="coerce")
-)
-
-rs_cols_all = ["RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y"]
-
-if mode == "Primary timeframe only":
-    df_f = df_univ[df_univ[primary_tf].fillna(0) >= rs_min].copy()
-    tie = "RS 1Y" if "RS 1Y" in df_f.columns else primary_tf
-    df_f = df_f.sort_values([primary_tf, tie], ascending=[False, False])
-
-elif mode == "All timeframes >= threshold":
-    cond = True
-    for c in rs_cols_all:
-        cond = cond & (df_univ[c].fillna(0) >= rs_min)
-    df_f = df_univ[cond].copy()
-    tie = "RS 1Y" if "RS 1Y" in df_f.columns else primary_tf
-    df_f = df_f.sort_values([primary_tf, tie], ascending=[False, False])
-
-elif mode == "Accelerating":
-    cond = (df_univ[primary_tf].fillna(0) >= rs_min)
-    cond = cond & (df_univ["RS GAP"].fillna(-999) >= rs_gap)
-
-    if strict_chain:
-        cond = cond & (df_univ["RS 1Y"] <= df_univ["RS 6M"])
-        cond = cond & (df_univ["RS 6M"] <= df_univ["RS 3M"])
-        cond = cond & (df_univ["RS 3M"] <= df_univ["RS 1M"])
-
-    df_f = df_univ[cond].copy()
-
-    if sort_mode == "RS Gap (shift)":
-        df_f = df_f.sort_values(["RS GAP", "RS 1M"], ascending=[False, False])
-    else:
-        tie = "RS 1Y" if "RS 1Y" in df_f.columns else primary_tf
-        df_f = df_f.sort_values([primary_tf, tie], ascending=[False, False])
-
-elif mode == "Decelerating":
-    cond = (df_univ[primary_tf].fillna(0) >= rs_min)
-    cond = cond & ((-df_univ["RS GAP"]).fillna(-999) >= rs_gap)
-
-    if strict_chain:
-        cond = cond & (df_univ["RS 1M"] <= df_univ["RS 3M"])
-        cond = cond & (df_univ["RS 3M"] <= df_univ["RS 6M"])
-        cond = cond & (df_univ["RS 6M"] <= df_univ["RS 1Y"])
-
-    df_f = df_univ[cond].copy()
-
-    if sort_mode == "RS Gap (shift)":
-        df_f = df_f.sort_values(["RS GAP", "RS 1Y"], ascending=[True, False])
-    else:
-        tie = "RS 1Y" if "RS 1Y" in df_f.columns else primary_tf
-        df_f = df_f.sort_values([primary_tf, tie], ascending=[False, False])
-
-else:  # CUSTOM (RS-first, then layer filters)
-    _init_custom_state()
-
-    min_mktcap = float(st.session_state["cf_min_mktcap"])
-    min_float = float(st.session_state["cf_min_float"])
-
-    min_vol1d = float(st.session_state["cf_min_vol1d"])
-    min_avgvol30 = float(st.session_state["cf_min_avgvol30"])
-
-    min_volchg_1d = float(st.session_state["cf_min_volchg_1d"])
-    min_volchg_1w = float(st.session_state["cf_min_volchg_1w"])
-    min_volchg_1m = float(st.session_state["cf_min_volchg_1m"])
-
-    min_rvol_1d = float(st.session_state["cf_min_rvol_1d"])
-    min_rvol_1w = float(st.session_state["cf_min_rvol_1w"])
-    min_rvol_1m = float(st.session_state["cf_min_rvol_1m"])
-
-    min_eps_q = float(st.session_state["cf_min_eps_q"])
-    min_eps_a = float(st.session_state["cf_min_eps_a"])
-    min_rev_q = float(st.session_state["cf_min_rev_q"])
-    min_rev_a = float(st.session_state["cf_min_rev_a"])
-    min_roe = float(st.session_state["cf_min_roe"])
-    min_pretax = float(st.session_state["cf_min_pretax"])
-
-    max_from_52w = float(st.session_state["cf_max_from_52w"])
-    max_from_ath = float(st.session_state["cf_max_from_ath"])
-
-    min_adr = float(st.session_state["cf_min_adr"])
-    min_atr = float(st.session_state["cf_min_atr"])
-
-    sector_choice = str(st.session_state["cf_sector_choice"])
-
-    p_above_200 = bool(st.session_state["cf_p_above_200"])
-    p_above_50 = bool(st.session_state["cf_p_above_50"])
-    p_above_20 = bool(st.session_state["cf_p_above_20"])
-    p_above_10 = bool(st.session_state["cf_p_above_10"])
-    trend_template_1 = bool(st.session_state["cf_trend_template_1"])
-
-    cond = (df_univ[primary_tf].fillna(0) >= rs_min)
-
-    if min_mktcap > 0:
-        cond = cond & (df_univ["Mkt Cap"].fillna(-1) >= min_mktcap)
-    if min_float > 0:
-        cond = cond & (df_univ["Float"].fillna(-1) >= min_float)
-
-    if min_vol1d > 0:
-        cond = cond & (df_univ["Volume"].fillna(-1) >= min_vol1d)
-    if min_avgvol30 > 0:
-        cond = cond & (df_univ["Avg Vol 30D"].fillna(-1) >= min_avgvol30)
-
-    if min_volchg_1d > 0:
-        cond = cond & (df_univ["Vol Chg 1D"].fillna(-999) >= (min_volchg_1d / 100.0))
-    if min_volchg_1w > 0:
-        cond = cond & (df_univ["Vol Chg 1W"].fillna(-999) >= (min_volchg_1w / 100.0))
-    if min_volchg_1m > 0:
-        cond = cond & (df_univ["Vol Chg 1M"].fillna(-999) >= (min_volchg_1m / 100.0))
-
-    if min_rvol_1d > 0:
-        cond = cond & (df_univ["Rel Vol 1D"].fillna(-1) >= min_rvol_1d)
-    if min_rvol_1w > 0:
-        cond = cond & (df_univ["Rel Vol 1W"].fillna(-1) >= min_rvol_1w)
-    if min_rvol_1m > 0:
-        cond = cond & (df_univ["Rel Vol 1M"].fillna(-1) >= min_rvol_1m)
-
-    if min_rev_q > 0:
-        cond = cond & (df_univ["Rev Qtr YoY"].fillna(-999) >= (min_rev_q / 100.0))
-    if min_rev_a > 0:
-        cond = cond & (df_univ["Rev Ann YoY"].fillna(-999) >= (min_rev_a / 100.0))
-    if min_eps_q > 0:
-        cond = cond & (df_univ["EPS Qtr YoY"].fillna(-999) >= (min_eps_q / 100.0))
-    if min_eps_a > 0:
-        cond = cond & (df_univ["EPS Ann YoY"].fillna(-999) >= (min_eps_a / 100.0))
-
-    if min_roe > 0:
-        cond = cond & (df_univ["ROE TTM"].fillna(-999) >= (min_roe / 100.0))
-    if min_pretax > 0:
-        cond = cond & (df_univ["PreTax Mgn TTM"].fillna(-999) >= (min_pretax / 100.0))
-
-    if max_from_52w > 0:
-        cond = cond & (df_univ["% From 52W High"].fillna(-999) >= (-max_from_52w / 100.0))
-    if max_from_ath > 0:
-        cond = cond & (df_univ["% From ATH"].fillna(-999) >= (-max_from_ath / 100.0))
-
-    if min_adr > 0:
-        cond = cond & (df_univ["ADR%"].fillna(-999) >= (min_adr / 100.0))
-    if min_atr > 0:
-        cond = cond & (df_univ["ATR%"].fillna(-999) >= (min_atr / 100.0))
-
-    if sector_choice != "All":
-        cond = cond & (df_univ["Sector"].astype(str) == sector_choice)
-
-    if p_above_200:
-        cond = cond & (df_univ["P>200"] == True)
-    if p_above_50:
-        cond = cond & (df_univ["P>50"] == True)
-    if p_above_20:
-        cond = cond & (df_univ["P>20"] == True)
-    if p_above_10:
-        cond = cond & (df_univ["P>10"] == True)
-
-    if trend_template_1:
-        cond = cond & (df_univ["P>200"] == True)
-        cond = cond & (df_univ["P>50"] == True)
-        cond = cond & (df_univ["50>200"] == True)
-
-    df_f = df_univ[cond].copy()
-    tie = "RS 1Y" if "RS 1Y" in df_f.columns else primary_tf
-    df_f = df_f.sort_values([primary_tf, tie], ascending=[False, False])
-
-df_show = df_f.reset_index(drop=True)
+_init_custom_state()
+cf = {k: st.session_state[k] for k in CUSTOM_KEYS_DEFAULTS}
+scan_key = (data_version, live_version, mode, primary_tf, rs_min, rs_gap, strict_chain, sort_mode,
+            tuple(cf.values()) if mode == "Custom" else ())
+
+# Page changes (and other reruns with the same inputs) reuse the last scan
+memo = st.session_state.get("_scan_memo")
+scan_cached = memo is not None and memo["key"] == scan_key
+if not scan_cached:
+    with timed("scan"):
+        idx, sort_by, sort_asc = run_scan(df_univ, mode, primary_tf, rs_min, rs_gap, strict_chain, sort_mode, cf)
+    memo = {"key": scan_key, "idx": idx, "by": sort_by, "asc": sort_asc}
+    st.session_state["_scan_memo"] = memo
+    st.session_state["page"] = 1
+
+# Matches stay positions into the shared df_univ; only the visible page is materialized
+n_matches = len(memo["idx"])
 
 # ============================================================
 # TICKER LOOKUP DASHBOARD (NEW) - render BEFORE scanner results
 # ============================================================
-render_ticker_lookup_dashboard(df_univ)
+with timed("lookup"):
+    render_ticker_lookup_dashboard(
+        df_univ,
+        load_symbol_index(data_version, df_univ),
+        load_rs_history_cached(rs_history_version()),
+    )
+
+# ============================================================
+# GROUP STRENGTH (sector / GICS sub-industry RS)
+# ============================================================
+group_opts = [c for c in GROUP_COLS if c in df_univ.columns and (df_univ[c].astype(str).str.strip() != "").any()]
+if group_opts:
+    with st.expander("Group Strength", expanded=False):
+        group_by = st.radio("Group by", group_opts, horizontal=True, key="group_by")
+        with timed("groups"):
+            groups = load_group_rs(f"{data_version}|{live_version}", group_by, primary_tf, df_univ)
+        st.caption(f"{len(groups):,} groups • ranked by median {primary_tf} • top members by {primary_tf}")
+        render_table_html(groups, groups.columns.tolist(), height_px=420)
 
 # ============================================================
 # RESULTS HEADER
 # ============================================================
 st.markdown('<div class="section-title">Scanner Results</div>', unsafe_allow_html=True)
 st.markdown(
-    f'<div class="small-muted">Universe: <b>{len(df_univ):,}</b> • Matches: <b>{len(df_f):,}</b></div>',
+    f'<div class="small-muted">Universe: <b>{len(df_univ):,}</b> • Matches: <b>{n_matches:,}</b></div>',
     unsafe_allow_html=True
 )
 
@@ -1208,6 +860,14 @@ base_cols = [
     "RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y",
     "% 1D", "% 1W", "% 1M", "% 3M", "% 6M", "% 1Y",
 ]
+if primary_tf == "RS Composite":
+    base_cols.insert(base_cols.index("RS 1Y") + 1, "RS Composite")
+
+# Relative return of the primary timeframe vs the chosen benchmark (filled per page below)
+rel_tf = primary_tf.removeprefix("RS ")
+rel_col = f"% vs {benchmark} {rel_tf}" if rel_tf in REL_TIMEFRAMES and benchmark in bench.index else None
+if rel_col:
+    base_cols.append(rel_col)
 
 if mode in ["Accelerating", "Decelerating"]:
     show_cols = base_cols.copy()
@@ -1290,7 +950,7 @@ elif mode == "Custom":
     seen = set(show_cols)
     extras_clean = []
     for c in extras:
-        if c not in seen and c in df_show.columns:
+        if c not in seen and c in df_univ.columns:
             extras_clean.append(c)
             seen.add(c)
 
@@ -1300,17 +960,77 @@ elif mode == "Custom":
 else:
     show_cols = base_cols
 
-render_table_html(df_show[show_cols].head(max_results), show_cols, height_px=950)
+# ============================================================
+# PAGED RESULTS (only the visible page is ranked + rendered)
+# ============================================================
+n_pages = max(1, -(-n_matches // page_size))
+if st.session_state.get("page", 1) > n_pages:
+    st.session_state["page"] = n_pages
+
+if n_pages > 1:
+    pc1, pc2 = st.columns([1, 5])
+    with pc1:
+        page = int(st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key="page"))
+else:
+    page = 1
+
+start = (page - 1) * page_size
+with timed("top_k"):
+    page_pos = top_k_positions(df_univ, memo["idx"], memo["by"], memo["asc"], start + page_size)[start:]
+    df_page = df_univ.iloc[page_pos]
+if rel_col:
+    # Switching benchmark only re-indexes the precomputed array, nothing is rebuilt
+    if ranker is not None:
+        # Live: relative to the benchmark's live return, computed for the visible page only
+        rel_page = relative_returns(df_page, ranker.benchmark_returns().reindex([benchmark]))[:, 0]
+    else:
+        rel = load_relative_returns(data_version, df_univ, bench)
+        rel_page = rel[page_pos, bench.index.get_loc(benchmark)]
+    df_page = df_page.assign(**{rel_col: rel_page[:, REL_TIMEFRAMES.index(rel_tf)]})
+if n_pages > 1:
+    st.caption(f"Rows {start + 1:,}–{start + len(df_page):,} of {n_matches:,}")
+
+with timed("render"):
+    render_table_html(df_page[show_cols], show_cols, height_px=950)
 
 st.markdown('<div class="hr"></div>', unsafe_allow_html=True)
 st.markdown(
     """
 **How RS is Calculated:**  
 Each stock is compared to **SPY** over a timeframe.  
-Then all stocks in your screener universe are ranked against each other and assigned an **RS rating (1–99)**.
+Then all stocks in your screener universe are ranked against each other and assigned an **RS rating (1–99)**.  
+The ranking is the same for every benchmark; the **% vs** column shows the return relative to the selected one.
 """
 )
 
 # NOTE: Fixed your invalid "///" comment so the file runs.
 
-
+# ============================================================
+# DEBUG TIMINGS (this rerun + last update_data.py run)
+# ============================================================
+if show_timings:
+    with st.sidebar:
+        st.subheader("Debug timings")
+        if scan_cached:
+            _timings["scan"] = 0.0
+        timing_rows = [{"Stage": k + (" (memo)" if k == "scan" and scan_cached else ""), "ms": round(v * 1000, 1)}
+                       for k, v in _timings.items()]
+        st.dataframe(pd.DataFrame(timing_rows), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {sum(_timings.values()) * 1000:.0f} ms • cached loaders show cache-hit time")
+
+        report = read_report()
+        if report:
+            counts = report.get("counts", {})
+            st.markdown(f"**Last pipeline run** ({report.get('finished', '?')}, {report.get('total_seconds', 0):.0f}s)")
+            st.caption(
+                f"Tickers: {counts.get('requested', 0):,} requested • {counts.get('computed', 0):,} computed • "
+                f"{counts.get('failed', 0):,} failed • {counts.get('skipped', 0):,} skipped • "
+                f"{counts.get('chunk_errors', 0)}/{counts.get('chunks', 0)} chunk errors"
+            )
+            st.dataframe(pd.DataFrame({"Stage": list(report.get("stages", {})),
+                                       "s": list(report.get("stages", {}).values())}),
+                         hide_index=True, use_container_width=True)
+            for w in report.get("warnings", [])[:10]:
+                st.warning(w)
+        else:
+            st.caption("No pipeline report found (Data/run_report.json).")
@@ -0,0 +1,156 @@
+"""
+Zeitreihen-Archiv der täglichen Snapshots (Data/archive), für "As of" in der App.
+
+Bisher war die Git-Historie von Screener_Data.csv das einzige Archiv. Jetzt
+legt update_data.py nach dem Snapshot zusätzlich eine Tagesdatei ab:
+
+    Data/archive/static.arrow              Ticker, Name, Sector, Industry (nur neue Kombinationen)
+    Data/archive/YYYY/YYYY-MM-DD.arrow     Tageswerte + _sid (Zeile in static.arrow)
+
+Die Tagesdateien sind Arrow IPC mit zstd, typisiert wie der Snapshot (gleiche
+Spalten, gleiche Metadaten). Die Textfelder, die sich praktisch nie ändern,
+stehen nur einmal in static.arrow; ändert sich ein Name oder Sektor, kommt
+eine neue Zeile dazu, alte Tage zeigen weiter die damaligen Werte.
+Ein erneuter Lauf am selben Tag ersetzt die Tagesdatei.
+
+    python archive.py list
+    python archive.py add Data/Screener_Data.csv --date 2026-09-01 [--spy Data/SPY_Data.csv]
+
+"add" übernimmt alte Exporte (z.B. aus der Git-Historie: git show <commit>:Data/Screener_Data.csv).
+"""
+import argparse
+import glob
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from snapshot import META_KEY, SCHEMA_VERSION
+
+ARCHIVE_DIR = "Data/archive"
+STATIC_FILE = "static.arrow"
+KEY_COL = "Ticker"
+STATIC_COLS = ["Name", "Sector", "Industry"]
+SID_COL = "_sid"
+
+_OPTIONS = pa.ipc.IpcWriteOptions(compression="zstd")
+
+
+def static_path(root: str = ARCHIVE_DIR) -> str:
+    return os.path.join(root, STATIC_FILE)
+
+
+def day_path(date: str, root: str = ARCHIVE_DIR) -> str:
+    return os.path.join(root, date[:4], f"{date}.arrow")
+
+
+def _write(table: pa.Table, path: str, meta: dict | None = None):
+    """Atomar (tmp-Datei + os.replace), zstd-komprimiert, Metadaten wie im Snapshot."""
+    if meta is not None:
+        table = table.replace_schema_metadata({META_KEY: json.dumps(meta).encode()})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=_OPTIONS) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _read(path: str) -> tuple[pd.DataFrame, dict]:
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    meta = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+    return table.to_pandas(), meta
+
+
+def read_static(root: str = ARCHIVE_DIR) -> pd.DataFrame:
+    """Alle bisher gesehenen (Ticker, Name, Sector, Industry); Zeilennummer = _sid."""
+    if not os.path.exists(static_path(root)):
+        return pd.DataFrame({c: pd.Series(dtype=str) for c in [KEY_COL] + STATIC_COLS})
+    return _read(static_path(root))[0]
+
+
+def archive_dates(root: str = ARCHIVE_DIR) -> list[str]:
+    """Archivierte Tage (YYYY-MM-DD), neueste zuerst."""
+    paths = glob.glob(os.path.join(root, "[0-9][0-9][0-9][0-9]", "*.arrow"))
+    return sorted((os.path.basename(p)[:-len(".arrow")] for p in paths), reverse=True)
+
+
+def archive_snapshot(df: pd.DataFrame, meta: dict, root: str = ARCHIVE_DIR) -> str:
+    """
+    Legt den Snapshot-Frame (wie in write_snapshot) unter meta["as_of"] ab und gibt den Pfad zurück.
+    Statische Spalten wandern nach static.arrow, in der Tagesdatei bleibt nur _sid.
+    """
+    date = meta["as_of"]
+    static_cols = [c for c in STATIC_COLS if c in df.columns]
+    keys = df[[KEY_COL] + static_cols].astype(str).reindex(columns=[KEY_COL] + STATIC_COLS, fill_value="")
+
+    static = read_static(root)
+    sid = {k: i for i, k in enumerate(static.itertuples(index=False, name=None))}
+    rows = list(keys.itertuples(index=False, name=None))
+    new = list(dict.fromkeys(r for r in rows if r not in sid))
+    if new:
+        for r in new:
+            sid[r] = len(sid)
+        static = pd.concat([static, pd.DataFrame(new, columns=static.columns)], ignore_index=True)
+        _write(pa.Table.from_pandas(static, preserve_index=False), static_path(root))
+
+    day = df.drop(columns=[KEY_COL] + static_cols)
+    day.insert(0, SID_COL, pd.array([sid[r] for r in rows], dtype="uint32"))
+    header = dict(meta, schema_version=SCHEMA_VERSION, columns=df.columns.tolist(), rows=len(df))
+    path = day_path(date, root)
+    _write(pa.Table.from_pandas(day, preserve_index=False), path, header)
+    return path
+
+
+def read_archived(date: str, root: str = ARCHIVE_DIR, static: pd.DataFrame | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    (DataFrame, Metadaten) eines archivierten Tages, Spalten wie im Snapshot von damals.
+    static: bereits geladenes read_static() (spart das Lesen bei mehreren Tagen).
+    """
+    day, meta = _read(day_path(date, root))
+    static = read_static(root) if static is None else static
+    sids = day.pop(SID_COL).to_numpy()
+    for c in [KEY_COL] + STATIC_COLS:
+        day[c] = static[c].to_numpy()[sids]
+    cols = meta.get("columns") or [KEY_COL] + STATIC_COLS + [c for c in day.columns if c not in STATIC_COLS + [KEY_COL]]
+    return day[[c for c in cols if c in day.columns]], meta
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="archivierte Tage anzeigen")
+    add = sub.add_parser("add", help="alten Screener-Export (CSV oder Snapshot) ins Archiv übernehmen")
+    add.add_argument("file")
+    add.add_argument("--date", required=True, help="Stichtag YYYY-MM-DD")
+    add.add_argument("--spy", default="Data/SPY_Data.csv", help="Benchmark-Datei vom selben Tag")
+    parser.add_argument("--root", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        for d in archive_dates(args.root):
+            print(d, f"{os.path.getsize(day_path(d, args.root)) / 1024:.0f} KB")
+        return
+
+    from snapshot import read_snapshot
+    from universe import build_universe
+
+    meta = {}
+    if args.file.endswith(".arrow"):
+        df, meta = read_snapshot(args.file, memory_map=False)
+    else:
+        df = pd.read_csv(args.file)
+    if not meta.get("derived"):
+        spy = pd.read_csv(args.spy)
+        df, missing = build_universe(df, spy)
+        bench_rows = spy.to_dict(orient="records")
+        meta = {"benchmark": bench_rows[0], "benchmarks": bench_rows,
+                "derived": True, "missing": missing}
+    meta["as_of"] = pd.Timestamp(args.date).strftime("%Y-%m-%d")
+    path = archive_snapshot(df, meta, args.root)
+    print(f"ERFOLG: {len(df)} Aktien archiviert ({path}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Historischer Backtest der Scan-Modi auf dem gespeicherten Kursverlauf.
+
+Für jeden Handelstag im Verlauf (Data/History) werden die RS-Ränge so
+rekonstruiert, wie sie an diesem Tag ausgesehen hätten (rs_history.rank_history,
+gleiche Formel wie die App), die Scan-Bedingungen aus scan_engine.run_scan
+als (Tage x Ticker)-Masken ausgewertet und gegen die Vorwärtsrenditen über
+HORIZONS Handelstage gehalten. Gemessen wird das gleichgewichtete Portfolio
+der Treffer je Tag gegen SPY über denselben Zeitraum.
+
+Alles läuft als Array-Operation über die Datumsachse: Ränge und
+Vorwärtsrenditen werden einmal berechnet, jede Grid-Kombination kostet
+danach nur ein paar Masken-Operationen.
+
+    python backtest.py [--scans scans.json] [--out Data/backtest.csv] [--warmup 252]
+
+Ohne --scans wird GRID durchlaufen (Modus x rs_min x rs_gap x strict_chain).
+Custom-Filter (Fundamentaldaten, Volumen, ...) gibt es nicht historisch;
+Scans mit Filtern oder "RS Composite" werden übersprungen. Ein "limit" wirkt
+wie in run_scans.py: je Tag nur die ersten limit Treffer in der
+Sortierung von scan_engine.run_scan.
+
+Hinweise zur Auswertung: Die Haltefenster überlappen sich (tägliche
+Einstiege), die Tage sind also nicht unabhängig. Das Universum ist das heutige
+(Survivorship-Bias), Kosten und Slippage fehlen.
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from history_store import HISTORY_DIR, read_store, to_panel
+from rs_history import TIMEFRAMES, rank_history
+from scan_engine import CUSTOM_KEYS_DEFAULTS, scan_spec
+from symbol_list import UNIVERSE_CACHE, read_cached_universe
+
+BENCHMARK = "SPY"
+SPY_FILE = "Data/SPY_Data.csv"
+OUT_FILE = "Data/backtest.csv"
+HORIZONS = [5, 20, 60]
+WARMUP = 252  # erst ab vollem 1Y-Fenster auswerten, davor sind die langen RS-Ränge verkürzt
+# Vorwärtsrenditen: Lücken bis zu einer Woche überbrücken; danach gilt der Ticker als nicht gehandelt
+FFILL_LIMIT = 5
+
+GRID = {
+    "mode": ["Primary timeframe only", "All timeframes >= threshold", "Accelerating", "Decelerating"],
+    "rank_by": ["RS 1M"],
+    "rs_min": [60, 70, 80, 90],
+    "rs_gap": [10, 15, 20, 30],
+    "strict_chain": [True, False],
+}
+
+RS = {name: k for k, (name, _) in enumerate(TIMEFRAMES)}
+
+
+def load_closes(root: str = HISTORY_DIR, universe_file: str = UNIVERSE_CACHE, spy_file: str = SPY_FILE,
+                benchmark: str = BENCHMARK) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    (Schlusskurse Tage x Ticker des Universums, Schlusskurse des Benchmarks).
+    Universum: Data/universe.json, sonst alle gespeicherten Ticker ohne die Benchmarks aus SPY_Data.csv.
+    """
+    long = read_store(root)
+    if long.empty:
+        raise ValueError(f"Kein Kursverlauf in {root} (erst update_data.py laufen lassen)")
+    stored = [str(t) for t in long["Ticker"].cat.categories]
+    universe, _ = read_cached_universe(universe_file)
+    if universe is not None:
+        symbols = [t for t in universe["Symbol"] if t in set(stored)]
+    else:
+        exclude = set(pd.read_csv(spy_file)["Symbol"].astype(str)) if os.path.exists(spy_file) else set()
+        symbols = [t for t in stored if t not in exclude | {benchmark}]
+    if benchmark not in stored:
+        raise ValueError(f"Benchmark {benchmark} fehlt im Kursverlauf")
+
+    close = to_panel(long, symbols + [benchmark]).xs("Close", axis=1, level=1)
+    return close[[t for t in symbols if t in close.columns]], close[benchmark]
+
+
+def forward_returns(close: np.ndarray, h: int) -> np.ndarray:
+    """close[t + h] / close[t] - 1 je Tag (und Spalte); NaN, wo t + h hinter dem letzten Tag liegt."""
+    out = np.full(close.shape, np.nan)
+    if h < len(close):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:-h] = close[h:] / close[:-h] - 1
+    return out
+
+
+class Panels:
+    """Einmal berechnete Ränge und Vorwärtsrenditen; Grundlage für alle Scans eines Laufs."""
+
+    def __init__(self, close: pd.DataFrame, bench: pd.Series, horizons: list[int] = HORIZONS,
+                 warmup: int = WARMUP):
+        self.dates = close.index
+        self.tickers = close.columns.tolist()
+        self.ranks = rank_history(close)  # uint8 (Tage x Ticker x Zeiträume), 0 = kein Rating
+        self.rs = {c: self.ranks[:, :, k].astype(np.int16) for c, k in RS.items()}  # int16: RS GAP darf negativ sein
+        self.rated = {c: r > 0 for c, r in self.rs.items()}
+        c = close.ffill(limit=FFILL_LIMIT).to_numpy(dtype=float)
+        b = bench.reindex(close.index).ffill(limit=FFILL_LIMIT).to_numpy(dtype=float)
+        self.horizons = horizons
+        self.fwd = {h: forward_returns(c, h) for h in horizons}
+        self.bench_fwd = {h: forward_returns(b, h) for h in horizons}
+        self.live = np.arange(len(close)) >= warmup
+
+
+def scan_mask(p: Panels, spec: dict) -> np.ndarray:
+    """(Tage x Ticker)-Treffer eines Scans, dieselben Bedingungen wie scan_engine.run_scan."""
+    rs, rated = p.rs, p.rated
+    primary = rs[spec["rank_by"]]
+    mode, rs_min, rs_gap = spec["mode"], spec["rs_min"], spec["rs_gap"]
+
+    if mode == "All timeframes >= threshold":
+        cond = np.logical_and.reduce([r >= rs_min for r in rs.values()])
+    else:
+        cond = primary >= rs_min
+
+    if mode in ("Accelerating", "Decelerating"):
+        gap = rs["RS 1M"] - rs["RS 1Y"]
+        cond &= rated["RS 1M"] & rated["RS 1Y"]
+        cond &= (gap >= rs_gap) if mode == "Accelerating" else (-gap >= rs_gap)
+        if spec["strict_chain"]:
+            chain = ["RS 1Y", "RS 6M", "RS 3M", "RS 1M"]
+            if mode == "Decelerating":
+                chain = chain[::-1]
+            for lo, hi in zip(chain, chain[1:]):
+                cond &= rated[lo] & rated[hi] & (rs[lo] <= rs[hi])
+    cond &= p.live[:, None]
+    if spec.get("limit"):
+        cond = top_k_mask(cond, sort_key(p, spec), spec["limit"])
+    return cond
+
+
+def sort_key(p: Panels, spec: dict) -> np.ndarray:
+    """
+    (Tage x Ticker)-Sortierschlüssel wie scan_engine.run_scan, größer = weiter vorne:
+    erste Sortierspalte * 256 + zweite (Ränge 0..99, RS GAP -99..99).
+    """
+    rs = p.rs
+    if spec["mode"] == "Accelerating" and spec["sort"] == "RS Gap (shift)":
+        first, second = rs["RS 1M"] - rs["RS 1Y"], rs["RS 1M"]
+    elif spec["mode"] == "Decelerating" and spec["sort"] == "RS Gap (shift)":
+        first, second = rs["RS 1Y"] - rs["RS 1M"], rs["RS 1Y"]  # RS GAP aufsteigend
+    else:
+        first, second = rs[spec["rank_by"]], rs["RS 1Y"]
+    return first.astype(np.int32) * 256 + second
+
+
+def top_k_mask(mask: np.ndarray, key: np.ndarray, k: int) -> np.ndarray:
+    """Je Tag nur die k Treffer mit dem größten key; bei Gleichstand gewinnt die Universums-Reihenfolge."""
+    n = mask.shape[1]
+    if k >= n:
+        return mask
+    # Eindeutiger Schlüssel je Zeile (Spaltenposition als letzte Stufe), Nicht-Treffer ganz hinten
+    full = key.astype(np.int64) * n + (n - 1 - np.arange(n))
+    full = np.where(mask, full, np.iinfo(np.int64).min)
+    cutoff = np.partition(full, n - k, axis=1)[:, n - k]
+    return mask & (full >= cutoff[:, None])
+
+
+def evaluate(p: Panels, mask: np.ndarray) -> dict:
+    """Kennzahlen je Horizont für das gleichgewichtete Tagesportfolio der Treffer."""
+    out = {"Days": int((mask.any(axis=1)).sum()), "Avg Picks": round(float(mask.sum(axis=1)[p.live].mean()), 1)}
+    for h in p.horizons:
+        fwd, bfwd = p.fwd[h], p.bench_fwd[h]
+        sel = mask & np.isfinite(fwd) & np.isfinite(bfwd)[:, None]
+        n = sel.sum(axis=1)
+        days = n > 0
+        with np.errstate(invalid="ignore"):
+            day_ret = np.where(sel, fwd, 0.0).sum(axis=1) / n
+        excess = day_ret[days] - bfwd[days]
+        beat = (sel & (fwd > bfwd[:, None])).sum()
+        out[f"Ret {h}D"] = float(day_ret[days].mean()) if days.any() else np.nan
+        out[f"Excess {h}D"] = float(excess.mean()) if days.any() else np.nan
+        out[f"Win Days {h}D"] = float((excess > 0).mean()) if days.any() else np.nan
+        out[f"Hit {h}D"] = float(beat / n.sum()) if n.sum() else np.nan
+    return out
+
+
+def grid_specs(grid: dict = GRID) -> list[dict]:
+    """Alle Kombinationen; rs_gap/strict_chain nur bei Accelerating/Decelerating variiert."""
+    specs, seen = [], set()
+    for combo in itertools.product(*grid.values()):
+        spec = dict(zip(grid, combo))
+        if spec["mode"] not in ("Accelerating", "Decelerating"):
+            spec["rs_gap"], spec["strict_chain"] = 0, False
+        key = tuple(spec.values())
+        if key not in seen:
+            seen.add(key)
+            specs.append(spec)
+    return specs
+
+
+def backtestable(spec: dict) -> str | None:
+    """Grund, warum ein (validierter) Scan nicht historisch auswertbar ist, sonst None."""
+    if spec["mode"] == "Custom" or any(v != CUSTOM_KEYS_DEFAULTS[k] for k, v in spec["filters"].items()
+                                       if k != "cf_preset"):
+        return "Custom-Filter haben keine Historie"
+    if spec["rank_by"] not in RS:
+        return f"{spec['rank_by']} hat keine Historie"
+    return None
+
+
+def run(p: Panels, specs: list[dict]) -> pd.DataFrame:
+    rows = []
+    baseline = np.logical_or.reduce(list(p.rated.values())) & p.live[:, None]
+    rows.append({"Scan": "Universe (equal weight)", "Mode": "", "Rank by": "", **evaluate(p, baseline)})
+    for raw in specs:
+        spec = scan_spec(raw)
+        reason = backtestable(spec)
+        if reason:
+            print(f"Übersprungen: {spec['name']} ({reason})")
+            continue
+        accel = spec["mode"] in ("Accelerating", "Decelerating")
+        row = {"Scan": raw.get("name", ""), "Mode": spec["mode"], "Rank by": spec["rank_by"],
+               "RS Min": spec["rs_min"], "RS Gap": spec["rs_gap"] if accel else pd.NA,
+               "Strict": spec["strict_chain"] if accel else pd.NA,
+               "Limit": spec["limit"] or pd.NA}
+        rows.append({**row, **evaluate(p, scan_mask(p, spec))})
+    df = pd.DataFrame(rows)
+    spec_cols = ["Scan", "Mode", "Rank by", "RS Min", "RS Gap", "Strict", "Limit"]
+    df = df.reindex(columns=spec_cols + [c for c in df.columns if c not in spec_cols])
+    return df.astype({"RS Min": "Int64", "RS Gap": "Int64", "Strict": "boolean", "Limit": "Int64"})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scans", help="JSON-Datei wie für run_scans.py (Standard: GRID)")
+    parser.add_argument("--history", default=HISTORY_DIR)
+    parser.add_argument("--benchmark", default=BENCHMARK)
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="Tage ohne Auswertung am Anfang")
+    parser.add_argument("--out", default=OUT_FILE)
+    args = parser.parse_args()
+
+    if args.scans:
+        with open(args.scans, encoding="utf-8") as f:
+            raw = json.load(f)
+        specs = raw.get("scans", []) if isinstance(raw, dict) else raw
+    else:
+        specs = grid_specs()
+
+    t = time.perf_counter()
+    close, bench = load_closes(args.history, benchmark=args.benchmark)
+    p = Panels(close, bench, warmup=args.warmup)
+    print(f"Panel: {close.shape[0]} Tage x {close.shape[1]} Ticker, "
+          f"{int(p.live.sum())} auswertbare Tage ({time.perf_counter() - t:.2f}s)")
+
+    t = time.perf_counter()
+    res = run(p, specs)
+    print(f"{len(res) - 1} Scans in {time.perf_counter() - t:.2f}s")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    res.to_csv(args.out, index=False, float_format="%.4f")
+    key = f"Excess {HORIZONS[1]}D"
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(res.sort_values(key, ascending=False).head(15).to_string(index=False, float_format="%.4f"))
+    print(f"ERFOLG: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Benchmark der Pipeline- und Screener-Stufen auf synthetischen Daten
+(synthetic.py) in mehreren Universumsgrößen, komplett offline:
+Wikipedia wird durch eine lokale Ticker-Datei (update_data --universe)
+ersetzt, Yahoo durch synthetic.SyntheticProvider.
+
+Je Größe und Stufe: beste Laufzeit aus --repeat Durchläufen und der
+Speicher-Peak (tracemalloc, eigener Durchlauf, damit die Zeiten nicht
+verfälscht werden). Ergebnis als JSON, zwei Dateien lassen sich vergleichen:
+
+    python benchmark.py --sizes 500 2000 10000 --out bench.json
+    python benchmark.py --compare alt.json neu.json [--threshold 0.2]
+
+Stufen:
+  update_backfill / update_nightly   update_data() komplett (erster Lauf / ein neuer Tag)
+  history_nightly                    history_store.update_history (ein neuer Tag)
+  metrics                            metrics.compute_metrics
+  rs_backfill                        rs_history.rank_history über 2 Jahre
+  snapshot_write / load_snapshot     snapshot.py schreiben / lesen wie app.load_csv
+  load_csv                           pd.read_csv des CSV-Exports (Fallback der App)
+  universe                           universe.build_universe (CSV-Pfad) + scan_engine.scan_universe
+  scan:<Modus>                       scan_engine.run_scan je Scan-Modus
+  top_k                              scan_engine.top_k_sorted (eine Seite)
+  render_page / render_all           render.table_html (200 Zeilen / alle)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import update_data as pipeline
+from downloader import Downloader
+from history_store import update_history
+from metrics import compute_metrics
+from render import table_html
+from rs_history import rank_history
+from scan_engine import CUSTOM_KEYS_DEFAULTS, SPEC_DEFAULTS, run_scan, scan_universe, top_k_sorted
+from snapshot import read_snapshot, write_snapshot
+from synthetic import SyntheticFundamentals, SyntheticProvider, synthetic_history, synthetic_symbols, write_symbol_file
+from universe import build_universe
+
+SIZES = [500, 2000, 10000]
+REPEAT = 3
+PAGE_ROWS = 200
+THRESHOLD = 0.2
+# Unterschiede darunter sind Messrauschen (Stufen im Sub-Millisekundenbereich)
+MIN_DELTA_S = 0.005
+
+SCAN_MODES = ["Primary timeframe only", "All timeframes >= threshold", "Accelerating", "Decelerating", "Custom"]
+# Custom-Scan mit einigen aktiven Filtern, damit die Filter-Zweige mitlaufen
+CUSTOM_FILTERS = dict(CUSTOM_KEYS_DEFAULTS, cf_min_avgvol30=100_000.0, cf_min_adr=1.0,
+                      cf_max_from_52w=25.0, cf_trend_template_1=True)
+TABLE_COLS = [
+    "Ticker", "Name", "Price",
+    "RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y",
+    "% 1D", "% 1W", "% 1M", "% 3M", "% 6M", "% 1Y",
+]
+
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    """
+    Speicher-Peak (tracemalloc) im ersten Lauf, danach beste Zeit aus `repeat` Läufen.
+    setup läuft vor jedem Lauf und wird weder gemessen noch getraced.
+    """
+    if setup:
+        setup()
+    tracemalloc.start()
+    out = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t)
+    return {"seconds": round(min(times), 4), "peak_mb": round(peak / 2 ** 20, 1), "result": out}
+
+
+def bench_size(n: int, repeat: int) -> dict:
+    """Alle Stufen für n Ticker; arbeitet im aktuellen Ordner."""
+    symbols = synthetic_symbols(n)
+    # Alle Benchmarks wie im echten Lauf, sonst misst der Download nur Retry-Wartezeit
+    history = synthetic_history(symbols + list(pipeline.BENCHMARKS))
+    days = history["SPY"].index
+    provider = SyntheticProvider(history)
+    fundamentals = SyntheticFundamentals()
+    write_symbol_file(symbols, "universe.txt")
+    results = {}
+
+    def stage(name, fn, rep=repeat, setup=None):
+        r = measure(fn, rep, setup)
+        results[name] = {"seconds": r["seconds"], "peak_mb": r["peak_mb"]}
+        print(f"  {name:32s} {r['seconds']:9.4f}s {r['peak_mb']:9.1f} MB")
+        return r["result"]
+
+    def quiet(fn):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return fn()
+        return run
+
+    # --- Pipeline komplett: erster Lauf (leerer Ordner) und Folgelauf mit einem neuen Tag ---
+    def fresh(end):
+        def setup():
+            shutil.rmtree("Data", ignore_errors=True)
+            provider.end = end
+        return setup
+
+    def after_backfill():
+        fresh(days[-2])()
+        quiet(lambda: pipeline.update_data(provider=provider, universe_file="universe.txt",
+                                           fundamentals_provider=fundamentals))()
+        provider.end = days[-1]
+
+    update = quiet(lambda: pipeline.update_data(provider=provider, universe_file="universe.txt",
+                                                fundamentals_provider=fundamentals))
+    stage("update_backfill", update, rep=1, setup=fresh(days[-2]))
+    stage("update_nightly", update, rep=1, setup=after_backfill)
+
+    # --- Einzelstufen ---
+    def history_setup():
+        shutil.rmtree("Hist", ignore_errors=True)
+        provider.end = days[-2]
+        quiet(lambda: update_history(symbols + ["SPY"], "Hist", Downloader(provider)))()
+        provider.end = days[-1]
+
+    panel = stage("history_nightly", quiet(lambda: update_history(symbols + ["SPY"], "Hist", Downloader(provider))),
+                  rep=1, setup=history_setup)
+
+    metrics = stage("metrics", lambda: compute_metrics(panel, symbols))
+    close = panel.xs("Close", axis=1, level=1)[symbols]
+    stage("rs_backfill", lambda: rank_history(close), rep=1)
+
+    spy = pd.read_csv("Data/SPY_Data.csv")
+    univ, _ = build_universe(metrics, spy)
+    stage("snapshot_write", lambda: write_snapshot(univ, "bench.arrow"))
+    stage("load_snapshot", lambda: read_snapshot("bench.arrow", memory_map=True))
+    raw = stage("load_csv", lambda: pd.read_csv("Data/Screener_Data.csv"))
+    df_univ = stage("universe", lambda: scan_universe(build_universe(raw, spy)[0]))
+
+    # Standard-Sortierung der Sidebar (scan_engine.SORT_MODES; Accelerating/Decelerating: nach RS GAP)
+    sort_mode = SPEC_DEFAULTS["sort"]
+    for mode in SCAN_MODES:
+        stage(f"scan:{mode}", lambda m=mode: run_scan(df_univ, m, "RS 1M", 70, 15, True, sort_mode, CUSTOM_FILTERS))
+    df_f = df_univ.iloc[run_scan(df_univ, "Primary timeframe only", "RS 1M", 1, 0, False, sort_mode, CUSTOM_FILTERS)[0]]
+    page = stage("top_k", lambda: top_k_sorted(df_f, ["RS 1M", "RS 1Y"], [False, False], PAGE_ROWS))
+    stage("render_page", lambda: table_html(page, TABLE_COLS))
+    stage("render_all", lambda: table_html(df_f, TABLE_COLS), rep=1)
+    return results
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(sizes: list[int], repeat: int, out: str | None) -> dict:
+    report = {"meta": _meta(), "results": {}}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as d:
+        os.chdir(d)
+        try:
+            for n in sizes:
+                print(f"== {n} Ticker ==")
+                report["results"][str(n)] = bench_size(n, repeat)
+        finally:
+            os.chdir(cwd)
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Ergebnis gespeichert: {out}")
+    return report
+
+
+def compare(base_file: str, new_file: str, threshold: float = THRESHOLD) -> bool:
+    """Druckt alt/neu je Stufe; True, wenn eine Stufe mehr als threshold langsamer wurde."""
+    with open(base_file) as f:
+        base = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    print(f"alt: {base['meta'].get('commit', '?')}  neu: {new['meta'].get('commit', '?')}")
+    regressed = False
+    for size, stages in new["results"].items():
+        old = base["results"].get(size, {})
+        print(f"== {size} Ticker ==")
+        for name, r in stages.items():
+            if name not in old:
+                print(f"  {name:32s} {'':>10s} {r['seconds']:9.4f}s  (neu)")
+                continue
+            a, b = old[name]["seconds"], r["seconds"]
+            ratio = b / a if a > 0 else float("inf")
+            flag = ""
+            if ratio > 1 + threshold and b - a > MIN_DELTA_S:
+                flag, regressed = "  LANGSAMER", True
+            elif ratio < 1 - threshold and a - b > MIN_DELTA_S:
+                flag = "  schneller"
+            mem = f"{old[name]['peak_mb']:8.1f} -> {r['peak_mb']:8.1f} MB"
+            print(f"  {name:32s} {a:9.4f}s -> {b:9.4f}s  x{ratio:5.2f}  {mem}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--compare", nargs=2, metavar=("ALT", "NEU"))
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="erlaubte Verlangsamung (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, threshold=args.threshold) else 0)
+    run(args.sizes, args.repeat, args.out)
+
+
+if __name__ == "__main__":
+    main()
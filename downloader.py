@@ -0,0 +1,127 @@
+"""
+Kursdownload in Blöcken: Symbol-Liste in Chunks aufteilen, parallel mit
+begrenztem Worker-Pool laden, fehlgeschlagene Chunks mit Backoff wiederholen
+und danach nur die Ticker erneut anfragen, die leer zurückkamen.
+
+Die Datenquelle ist austauschbar (provider.fetch(symbols, start=None) ->
+{Ticker: OHLCV-DataFrame}). YahooProvider für den echten Lauf, FileProvider
+liest <TICKER>.csv aus einem lokalen Ordner und läuft komplett ohne Netzwerk.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+CHUNK_SIZE = 100
+MAX_WORKERS = 4
+RETRIES = 3
+BACKOFF = 2.0
+
+
+class YahooProvider:
+    def __init__(self, period: str = "2y"):
+        self.period = period
+
+    def fetch(self, symbols: list[str], start=None) -> dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        kw = {"start": start} if start is not None else {"period": self.period}
+        data = yf.download(symbols, interval="1d", group_by="ticker", threads=False, progress=False, **kw)
+        out = {}
+        if data is None or data.empty:
+            return out
+        have = set(data.columns.get_level_values(0))
+        for t in symbols:
+            if t not in have:
+                continue
+            df = data[t].reindex(columns=FIELDS).dropna(how="all")
+            if not df.empty:
+                out[t] = df
+        return out
+
+
+class FileProvider:
+    """Liest <root>/<TICKER>.csv (Date,Open,High,Low,Close,Volume)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def fetch(self, symbols: list[str], start=None) -> dict[str, pd.DataFrame]:
+        out = {}
+        for t in symbols:
+            path = os.path.join(self.root, f"{t}.csv")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, index_col="Date", parse_dates=["Date"]).reindex(columns=FIELDS)
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            df = df.dropna(how="all")
+            if not df.empty:
+                out[t] = df
+        return out
+
+
+def chunked(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), max(1, size))]
+
+
+class Downloader:
+    """
+    Aufrufbar wie provider.fetch(symbols, start=None). Merkt sich, welche
+    Ticker nach allen Versuchen fehlen (self.missing) und warum (self.errors),
+    sowie Dauer und Ergebnis jedes Chunk-Abrufs (self.chunks, für run_report).
+    """
+
+    def __init__(self, provider=None, chunk_size: int = CHUNK_SIZE, workers: int = MAX_WORKERS,
+                 retries: int = RETRIES, backoff: float = BACKOFF, sleep=time.sleep):
+        self.provider = provider or YahooProvider()
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.missing: list[str] = []
+        self.errors: dict[str, str] = {}
+        self.chunks: list[dict] = []
+
+    def _fetch_chunk(self, chunk: list[str], start) -> tuple[dict[str, pd.DataFrame], str | None, float]:
+        t = time.perf_counter()
+        try:
+            return self.provider.fetch(chunk, start=start), None, time.perf_counter() - t
+        except Exception as e:
+            return {}, f"{type(e).__name__}: {e}", time.perf_counter() - t
+
+    def __call__(self, symbols: list[str], start=None) -> dict[str, pd.DataFrame]:
+        got: dict[str, pd.DataFrame] = {}
+        pending = list(dict.fromkeys(symbols))
+        reasons: dict[str, str] = {}
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                wait = self.backoff * 2 ** (attempt - 1)
+                print(f"Versuch {attempt + 1}: {len(pending)} Aktien fehlen noch, warte {wait:.0f}s...")
+                self.sleep(wait)
+
+            chunks = chunked(pending, self.chunk_size)
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(chunks)))) as pool:
+                results = list(pool.map(lambda c: self._fetch_chunk(c, start), chunks))
+
+            for chunk, (res, err, secs) in zip(chunks, results):
+                self.chunks.append({"start": start, "attempt": attempt + 1, "size": len(chunk),
+                                    "received": len(res), "seconds": round(secs, 3), "error": err})
+                got.update(res)
+                for t in chunk:
+                    if t not in res:
+                        reasons[t] = err or "leer"
+
+            pending = [t for t in pending if t not in got]
+            if not pending:
+                break
+
+        for t in pending:
+            self.errors[t] = reasons.get(t, "leer")
+        self.missing = sorted((set(self.missing) - set(got)) | set(pending))
+        return got
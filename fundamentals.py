@@ -0,0 +1,214 @@
+"""
+Fundamentaldaten für Screener_Data.csv (Marktkapitalisierung, Free Float,
+EPS-/Umsatzwachstum, ROE, Vorsteuermarge) mit Plattencache pro Ticker.
+
+Fundamentaldaten ändern sich höchstens quartalsweise, der Abruf bei Yahoo
+kostet aber mehrere langsame Einzelanfragen pro Ticker. Deshalb lädt
+update_fundamentals() nur Ticker neu, deren Eintrag
+  - fehlt,
+  - älter als TTL_DAYS ist (ohne Daten: EMPTY_TTL_DAYS), oder
+  - vor dem letzten bekannten Earnings-Termin (+ EARNINGS_LAG_DAYS) geholt wurde,
+über einen begrenzten Worker-Pool und höchstens MAX_FETCH pro Lauf (älteste
+zuerst, der Rest folgt in den nächsten Nächten). Alle anderen Werte kommen
+aus Data/Fundamentals/fundamentals.json.
+
+Gespeichert werden nur Größen, die sich mit dem Kurs nicht ändern: statt der
+Marktkapitalisierung die Aktienanzahl, die Kapitalisierung rechnet
+apply_fundamentals() jeden Lauf mit dem aktuellen Schlusskurs. Fehlende Werte
+bleiben leer (NaN) und erfüllen damit keinen Mindestwert-Filter.
+
+Die Datenquelle ist austauschbar wie beim Kursdownload:
+provider.fetch(ticker) -> {"values": {Spalte: Wert}, "earnings": "YYYY-MM-DD" | None}.
+"""
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+FUNDAMENTALS_DIR = "Data/Fundamentals"
+CACHE_FILE = "fundamentals.json"
+
+TTL_DAYS = 30
+EMPTY_TTL_DAYS = 7      # Ticker ohne Fundamentaldaten (Neuzugänge, Fonds) nicht jede Nacht erneut fragen
+EARNINGS_LAG_DAYS = 2   # Yahoo aktualisiert die Zahlen erst ein bis zwei Tage nach dem Bericht
+MAX_WORKERS = 8
+MAX_FETCH = 1500
+
+# Spaltennamen wie in metrics.SCREENER_COLS; Prozentwerte in Prozent (12.5 = 12,5 %)
+MKT_CAP = "Market capitalization"
+SHARES = "Shares outstanding"  # nur im Cache; MKT_CAP = Kurs x SHARES
+FREE_FLOAT = "Free float"
+EPS_Q = "Earnings per share diluted growth %, Quarterly YoY"
+EPS_A = "Earnings per share diluted growth %, Annual YoY"
+REV_Q = "Revenue growth %, Quarterly YoY"
+REV_A = "Revenue growth %, Annual YoY"
+ROE = "Return on equity %, Trailing 12 months"
+PRETAX = "Pretax margin %, Trailing 12 months"
+FUNDAMENTAL_COLS = [MKT_CAP, FREE_FLOAT, EPS_Q, EPS_A, REV_Q, REV_A, ROE, PRETAX]
+CACHED_COLS = [SHARES, FREE_FLOAT, EPS_Q, EPS_A, REV_Q, REV_A, ROE, PRETAX]
+
+
+def _num(x) -> float | None:
+    try:
+        x = float(x)
+    except (TypeError, ValueError):
+        return None
+    return x if math.isfinite(x) else None
+
+
+def _pct(x) -> float | None:
+    x = _num(x)
+    return None if x is None else x * 100
+
+
+def _growth(stmt: pd.DataFrame, row: str, lag: int = 1) -> float | None:
+    """
+    Wachstum der neuesten Periode gegen die `lag` Perioden ältere in % (Spalten neueste zuerst);
+    lag=4 bei Quartalen = gegen dasselbe Quartal im Vorjahr.
+    """
+    if stmt is None or stmt.empty or row not in stmt.index or stmt.shape[1] <= lag:
+        return None
+    vals = [_num(v) for v in stmt.loc[row].iloc[[0, lag]]]
+    if None in vals or vals[1] == 0:
+        return None
+    return (vals[0] - vals[1]) / abs(vals[1]) * 100
+
+
+def _ttm_ratio(stmt: pd.DataFrame, num: str, den: str) -> float | None:
+    """Summe der letzten 4 Quartale num / den in %."""
+    if stmt is None or stmt.empty or num not in stmt.index or den not in stmt.index:
+        return None
+    a = [_num(v) for v in stmt.loc[num].iloc[:4]]
+    b = [_num(v) for v in stmt.loc[den].iloc[:4]]
+    if len(a) < 4 or None in a or None in b or sum(b) == 0:
+        return None
+    return sum(a) / sum(b) * 100
+
+
+class YahooFundamentals:
+    def fetch(self, ticker: str) -> dict:
+        import yfinance as yf
+
+        t = yf.Ticker(ticker)
+        info = t.info or {}
+        values = {
+            SHARES: _num(info.get("sharesOutstanding") or info.get("impliedSharesOutstanding")),
+            FREE_FLOAT: _num(info.get("floatShares")),
+            REV_Q: _pct(info.get("revenueGrowth")),  # Umsatz letztes Quartal gegen Vorjahresquartal
+            ROE: _pct(info.get("returnOnEquity")),
+        }
+        # EPS-Wachstum, Jahreswerte und TTM-Marge nur, wenn info überhaupt etwas hatte (spart zwei Anfragen).
+        # EPS Qtr aus den verwässerten EPS der Quartale, nicht info["earningsQuarterlyGrowth"]
+        # (das ist das Wachstum des Nettogewinns, bei Aktienrückkäufen/-ausgaben deutlich anders)
+        if any(v is not None for v in values.values()):
+            annual, quarterly = t.income_stmt, t.quarterly_income_stmt
+            values[EPS_Q] = _growth(quarterly, "Diluted EPS", lag=4)
+            values[EPS_A] = _growth(annual, "Diluted EPS")
+            values[REV_A] = _growth(annual, "Total Revenue")
+            values[PRETAX] = _ttm_ratio(quarterly, "Pretax Income", "Total Revenue")
+
+        ts = info.get("earningsTimestampStart") or info.get("earningsTimestamp")
+        earnings = pd.Timestamp(int(ts), unit="s").strftime("%Y-%m-%d") if _num(ts) else None
+        return {"values": {k: v for k, v in values.items() if v is not None}, "earnings": earnings}
+
+
+def cache_path(root: str = FUNDAMENTALS_DIR) -> str:
+    return os.path.join(root, CACHE_FILE)
+
+
+def read_cache(root: str = FUNDAMENTALS_DIR) -> dict[str, dict]:
+    """{Ticker: {"fetched", "earnings", "values"}}; leer, wenn noch nichts gespeichert ist."""
+    try:
+        with open(cache_path(root), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(cache: dict[str, dict], root: str = FUNDAMENTALS_DIR):
+    os.makedirs(root, exist_ok=True)
+    path = cache_path(root)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, path)
+
+
+def stale_reason(entry: dict | None, today: pd.Timestamp) -> str | None:
+    """Warum der Eintrag neu geladen werden muss, sonst None."""
+    if not entry or "fetched" not in entry:
+        return "neu"
+    values = entry.get("values") or {}
+    if MKT_CAP in values and SHARES not in values:
+        return "schema"  # Eintrag von vor der Umstellung auf Aktienanzahl
+    fetched = pd.Timestamp(entry["fetched"])
+    if entry.get("earnings"):
+        due = pd.Timestamp(entry["earnings"]) + pd.Timedelta(days=EARNINGS_LAG_DAYS)
+        if fetched < due <= today:
+            return "earnings"
+    ttl = TTL_DAYS if values else EMPTY_TTL_DAYS
+    if (today - fetched).days >= ttl:
+        return "ttl"
+    return None
+
+
+def update_fundamentals(symbols: list[str], root: str = FUNDAMENTALS_DIR, provider=None, today=None,
+                        max_fetch: int = MAX_FETCH, workers: int = MAX_WORKERS) -> tuple[pd.DataFrame, dict]:
+    """
+    Lädt veraltete Einträge neu und gibt (DataFrame[CACHED_COLS] mit Index Symbol, Statistik) zurück.
+    Fehlgeschlagene Abrufe behalten den alten Eintrag und werden im nächsten Lauf erneut versucht.
+    """
+    provider = provider or YahooFundamentals()
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    cache = read_cache(root)
+
+    stale = {t: stale_reason(cache.get(t), today) for t in dict.fromkeys(symbols)}
+    stale = {t: r for t, r in stale.items() if r}
+    # Nach Earnings zuerst, dann neue Ticker, dann die ältesten Einträge
+    order = {"earnings": 0, "neu": 1, "schema": 2, "ttl": 2}
+    todo = sorted(stale, key=lambda t: (order[stale[t]], cache.get(t, {}).get("fetched", "")))[:max_fetch]
+
+    errors: dict[str, str] = {}
+
+    def fetch(t):
+        try:
+            return t, provider.fetch(t), None
+        except Exception as e:
+            return t, None, f"{type(e).__name__}: {e}"
+
+    if todo:
+        print(f"Lade Fundamentaldaten für {len(todo)} von {len(stale)} veralteten Aktien...")
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+                for t, res, err in pool.map(fetch, todo):
+                    if err:
+                        errors[t] = err
+                        continue
+                    cache[t] = {"fetched": today.strftime("%Y-%m-%d"), "earnings": res.get("earnings"),
+                                "values": res.get("values", {})}
+        finally:
+            # Auch bei Abbruch: bereits geladene Einträge nicht verlieren
+            write_cache(cache, root)
+
+    rows = {t: cache[t].get("values", {}) for t in symbols if t in cache}
+    df = pd.DataFrame.from_dict(rows, orient="index", dtype=float).reindex(index=symbols, columns=CACHED_COLS)
+    df.index.name = "Symbol"
+    stats = {"stale": len(stale), "fetched": len(todo) - len(errors), "deferred": len(stale) - len(todo),
+             "errors": errors}
+    return df, stats
+
+
+def apply_fundamentals(df_out: pd.DataFrame, fund: pd.DataFrame) -> pd.DataFrame:
+    """
+    Trägt die Fundamentaldaten (update_fundamentals) in die Screener-Zeilen ein.
+    Marktkapitalisierung = aktueller Kurs x Aktienanzahl; fehlende Werte bleiben NaN.
+    """
+    df_out = df_out.copy()
+    vals = fund.reindex(df_out["Symbol"])
+    df_out[MKT_CAP] = df_out["Price"].to_numpy(dtype=float) * vals[SHARES].to_numpy(dtype=float)
+    for c in FUNDAMENTAL_COLS:
+        if c != MKT_CAP:
+            df_out[c] = vals[c].to_numpy(dtype=float)
+    return df_out
@@ -0,0 +1,41 @@
+"""
+Group-level relative strength (sector / GICS sub-industry) over the universe frame.
+
+One groupby per (group column, RS column); the app caches the result per
+snapshot, so switching pages or scans never recomputes it.
+"""
+import pandas as pd
+
+GROUP_COLS = ["Sector", "Industry"]
+TOP_MEMBERS = 3
+STRONG_RS = 80
+
+
+def group_rs(df: pd.DataFrame, by: str, rs_col: str, top: int = TOP_MEMBERS) -> pd.DataFrame:
+    """
+    One row per group, strongest (median RS) first: constituent count, median and
+    mean RS, share of members with RS >= STRONG_RS and the top members by RS.
+    Tickers without group metadata (empty string) are left out.
+    """
+    cols = [by, "Stocks", f"{rs_col} Median", f"{rs_col} Mean", f"% RS >= {STRONG_RS}", "Top Members"]
+    if by not in df.columns or rs_col not in df.columns:
+        return pd.DataFrame(columns=cols)
+
+    rs = pd.to_numeric(df[rs_col], errors="coerce")
+    g = pd.DataFrame({"group": df[by].astype(str), "Ticker": df["Ticker"], "rs": rs, "strong": rs >= STRONG_RS})
+    g = g[(g["group"].str.strip() != "") & g["rs"].notna()]
+    if g.empty:
+        return pd.DataFrame(columns=cols)
+
+    # Sorted by RS first, so the first `top` tickers of each group are its leaders
+    g = g.sort_values("rs", ascending=False, kind="stable")
+    out = g.groupby("group", sort=False).agg(
+        Stocks=("Ticker", "size"),
+        median=("rs", "median"),
+        mean=("rs", "mean"),
+        strong=("strong", "mean"),
+        top=("Ticker", lambda s: ", ".join(s.iloc[:top])),
+    )
+    out = out.sort_values(["median", "mean"], ascending=False).reset_index()
+    out.columns = cols
+    return out
@@ -0,0 +1,196 @@
+"""
+Persistenter Kursverlauf aller Ticker (Data/History/prices.arrow).
+
+update_data() liest zuerst den gespeicherten Verlauf und lädt nur die Tage
+nach dem letzten gespeicherten Datum nach. Ticker ohne Verlauf (neu im
+Universum oder Cache verloren) bekommen einmalig die vollen 2 Jahre.
+
+Gespeichert wird eine lange Tabelle (Ticker, Date, OHLCV) als eine
+komprimierte Arrow-Datei statt einer CSV pro Ticker: bei 6k-10k Tickern
+kostete das Lesen/Schreiben der Einzeldateien mehr als der ganze Rest des
+Laufs. Alte Einzel-CSVs (Data/History/<TICKER>.csv) werden beim ersten Lauf
+übernommen.
+"""
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.api.types import union_categoricals
+
+from downloader import Downloader
+
+HISTORY_DIR = "Data/History"
+STORE_FILE = "prices.arrow"
+HISTORY_YEARS = 2
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+COLUMNS = ["Ticker", "Date"] + FIELDS
+
+# Weicht der erneut geladene letzte Schlusskurs stärker ab, wurde die Historie
+# rückwirkend angepasst (Split/Dividende) -> Ticker komplett neu laden.
+ADJUST_TOLERANCE = 0.005
+
+
+def store_path(root: str = HISTORY_DIR) -> str:
+    return os.path.join(root, STORE_FILE)
+
+
+def _empty() -> pd.DataFrame:
+    df = pd.DataFrame({f: pd.Series(dtype=float) for f in FIELDS})
+    df.insert(0, "Date", pd.Series(dtype="datetime64[ns]"))
+    df.insert(0, "Ticker", pd.Categorical([]))
+    return df
+
+
+def _read_legacy_csvs(root: str) -> pd.DataFrame:
+    frames = {}
+    for path in glob.glob(os.path.join(root, "*.csv")):
+        try:
+            df = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+        except Exception:
+            continue
+        if not df.empty:
+            frames[os.path.splitext(os.path.basename(path))[0]] = df
+    return to_long(frames)
+
+
+def _drop_legacy_csvs(root: str):
+    """Nach dem ersten Schreiben des Stores sind die Einzel-CSVs vollständig übernommen."""
+    for path in glob.glob(os.path.join(root, "*.csv")):
+        os.remove(path)
+
+
+def read_store(root: str = HISTORY_DIR) -> pd.DataFrame:
+    """Lange Tabelle (Ticker als Categorical, Date, OHLCV); leer, wenn noch nichts gespeichert ist."""
+    path = store_path(root)
+    if not os.path.exists(path):
+        return _read_legacy_csvs(root)
+    try:
+        with pa.memory_map(path, "r") as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+    except Exception:
+        return _empty()
+    df["Ticker"] = df["Ticker"].astype("category")
+    df["Date"] = df["Date"].astype("datetime64[ns]")
+    return df
+
+
+def write_store(df: pd.DataFrame, root: str = HISTORY_DIR):
+    """Atomar (tmp-Datei + os.replace), zstd-komprimiert; Ticker als Dictionary-Spalte."""
+    os.makedirs(root, exist_ok=True)
+    table = pa.Table.from_pandas(df[COLUMNS], preserve_index=False)
+    path = store_path(root)
+    tmp = path + ".tmp"
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def to_long(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """{Ticker: OHLCV-DataFrame mit Datumsindex} -> lange Tabelle (ein Block statt pd.concat je Ticker)."""
+    frames = {str(t): df for t, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return _empty()
+    vals = [(df if list(df.columns) == FIELDS else df.reindex(columns=FIELDS)).to_numpy(dtype=float)
+            for df in frames.values()]
+    codes = np.repeat(np.arange(len(frames)), [len(v) for v in vals])
+    df = pd.DataFrame(np.concatenate(vals), columns=FIELDS)
+    df.insert(0, "Date", np.concatenate([df_.index.values.astype("datetime64[ns]") for df_ in frames.values()]))
+    df.insert(0, "Ticker", pd.Categorical.from_codes(codes, categories=list(frames)))
+    return df
+
+
+def _concat(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat mit gemeinsamen Ticker-Kategorien (sonst fällt die Spalte auf object zurück)."""
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return _empty()
+    cats = union_categoricals([p["Ticker"].cat.remove_unused_categories() for p in parts]).categories
+    parts = [p.assign(Ticker=p["Ticker"].cat.set_categories(cats)) for p in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def merge_history(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Neue Bars gewinnen bei gleichem (Ticker, Date) (letzter Bar kann sich noch ändern)."""
+    df = _concat([old, new])
+    df = df.drop_duplicates(subset=["Ticker", "Date"], keep="last")
+    return df.sort_values(["Ticker", "Date"], ignore_index=True)
+
+
+def _adjusted(last: pd.DataFrame, new: pd.DataFrame) -> set[str]:
+    """Ticker, deren erneut geladener letzter Schlusskurs vom gespeicherten abweicht."""
+    if last.empty or new.empty:
+        return set()
+    a = last.assign(Ticker=last["Ticker"].astype(str))
+    b = new[["Ticker", "Date", "Close"]].assign(Ticker=new["Ticker"].astype(str))
+    m = a.merge(b, on=["Ticker", "Date"], suffixes=("", "_new"))
+    ok = m["Close"].notna() & m["Close_new"].notna() & (m["Close"] != 0)
+    diff = (m["Close_new"] / m["Close"] - 1).abs() > ADJUST_TOLERANCE
+    return set(m.loc[ok & diff, "Ticker"])
+
+
+def to_panel(long: pd.DataFrame, symbols: list[str]) -> pd.DataFrame:
+    """Lange Tabelle -> Frame wie yf.download(..., group_by='ticker'): Spalten (Ticker, Feld)."""
+    have = set(long["Ticker"].unique())
+    tickers = [t for t in symbols if t in have]
+    col = pd.Categorical(long["Ticker"].astype(str), categories=tickers).codes
+    dates, row = np.unique(long["Date"].to_numpy(), return_inverse=True)
+    ok = col >= 0
+    arr = np.full((len(dates), len(tickers), len(FIELDS)), np.nan)
+    arr[row[ok], col[ok]] = long[FIELDS].to_numpy(dtype=float)[ok]
+    return pd.DataFrame(arr.reshape(len(dates), -1), index=pd.DatetimeIndex(dates, name="Date"),
+                        columns=pd.MultiIndex.from_product([tickers, FIELDS]))
+
+
+def update_history(symbols: list[str], root: str = HISTORY_DIR, download=None) -> pd.DataFrame:
+    """
+    Bringt den Verlauf aller symbols auf den neuesten Stand und gibt die letzten
+    2 Jahre im selben Format wie yf.download(..., group_by='ticker') zurück.
+    download: aufrufbar wie Downloader (symbols, start=None) -> {Ticker: DataFrame}.
+    """
+    download = download or Downloader()
+    store = read_store(root)
+    # Store ist nach (Ticker, Date) sortiert -> letzte Zeile je Ticker = letzter Bar
+    last = store.drop_duplicates(subset=["Ticker"], keep="last")[["Ticker", "Date", "Close"]]
+    last_date = dict(zip(last["Ticker"].astype(str), last["Date"]))
+
+    # Ticker nach Startdatum gruppieren -> ein Download pro Gruppe (meist genau eine)
+    groups: dict[pd.Timestamp, list[str]] = {}
+    full = []
+    for t in symbols:
+        if t not in last_date:
+            full.append(t)
+        else:
+            # Letzten Tag erneut laden: erkennt Anpassungen und ersetzt Intraday-Bars
+            groups.setdefault(pd.Timestamp(last_date[t]).normalize(), []).append(t)
+
+    fetched: dict[str, pd.DataFrame] = {}
+    for start, group in sorted(groups.items()):
+        print(f"Lade {len(group)} Aktien ab {start.date()} nach...")
+        fetched.update(download(group, start=start.strftime("%Y-%m-%d")))
+    new = to_long(fetched)
+    del fetched
+
+    adjusted = _adjusted(last, new)
+    if adjusted:
+        full += sorted(adjusted)
+        new = new[~new["Ticker"].isin(list(adjusted))]
+        store = store[~store["Ticker"].isin(list(adjusted))]
+
+    if full:
+        print(f"Lade vollen Verlauf für {len(full)} Aktien...")
+        new = _concat([new, to_long(download(full))])
+
+    cutoff = pd.Timestamp.today().normalize() - pd.DateOffset(years=HISTORY_YEARS)
+    if not new.empty:
+        store = merge_history(store, new)
+        store = store[store["Date"] >= cutoff].reset_index(drop=True)
+        write_store(store, root)
+        _drop_legacy_csvs(root)
+
+    store = store[store["Ticker"].isin(symbols) & (store["Date"] >= cutoff)]
+    if store.empty:
+        return pd.DataFrame()
+    return to_panel(store, symbols)
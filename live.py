@@ -0,0 +1,249 @@
+"""
+Intraday live mode: latest prices -> performance windows -> RS 1-99, without
+touching the price history.
+
+update_data.py writes the reference closes once per run (REFERENCE_FILE):
+for every ticker and window the close that a live price is divided by, both
+for the next session ("next") and for a price of the session already in the
+snapshot ("same"), plus the quarter boundaries of the RS Composite score
+(metrics.COMPOSITE_WEIGHTS). LiveRanker keeps those as arrays, recomputes returns only
+for tickers whose price changed and re-ranks the columns in one pass, the
+same way universe.to_rs_1_99 does (ranking raw returns equals ranking
+benchmark-relative returns). apply_live also moves the price-derived
+columns (% from highs, P>MA flags) to the live price; the highs and moving
+averages themselves stay at the snapshot's values, except that a live price
+above the old high is the new high.
+
+Price sources are interchangeable: fetch(symbols) -> ({Ticker: price}, session date).
+YahooQuotes pulls the current daily bar through downloader.Downloader,
+ReplayFeed plays back recorded ticks (Time, Ticker, Price) for testing.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from downloader import Downloader, YahooProvider
+from metrics import COMPOSITE_WEIGHTS, QUARTER, build_panel, compact_panel
+from snapshot import read_snapshot, write_snapshot
+from universe import price_levels
+
+REFERENCE_FILE = "Data/Reference_Closes.arrow"
+
+# Label -> trading days, as in metrics.PERF_WINDOWS (1D = price change vs previous close)
+WINDOWS = {"1D": 2, "1W": 5, "1M": 21, "3M": 63, "6M": 126, "1Y": 252}
+RS_WINDOWS = ["1W", "1M", "3M", "6M", "1Y"]
+# Label -> trading days of the RS Composite segment boundaries (metrics.compute_metrics)
+QUARTERS = {f"Q{i + 1}": QUARTER * (i + 1) for i in range(len(COMPOSITE_WEIGHTS))}
+
+
+def reference_closes(data: pd.DataFrame, symbols: list[str]) -> pd.DataFrame:
+    """
+    Reference closes per ticker from the (Ticker, Field) price panel.
+    "same <w>": close[-min(d, n)] (what metrics used for the last close),
+    "next <w>": close[-min(d - 1, n)] (the window base once a new session's bar is appended).
+    """
+    tickers, panel = build_panel(data, symbols)
+    if not tickers:
+        return pd.DataFrame(columns=["Ticker", "Close"])
+    p, n = compact_panel({"Close": panel["Close"]})
+    close = p["Close"]
+    cols = np.arange(close.shape[1])
+
+    def at(k):  # close.iloc[-k] per ticker, k >= 1
+        return close[close.shape[0] - np.maximum(k, 1), cols]
+
+    out = {"Ticker": tickers, "Close": close[-1]}
+    for w, d in {**WINDOWS, **QUARTERS}.items():
+        out[f"same {w}"] = at(np.minimum(d, n))
+        out[f"next {w}"] = at(np.minimum(d - 1, n))
+    return pd.DataFrame(out)[n > 0].reset_index(drop=True)
+
+
+def write_reference_closes(data: pd.DataFrame, symbols: list[str], as_of: str, path: str = REFERENCE_FILE):
+    write_snapshot(reference_closes(data, symbols), path, {"as_of": as_of})
+
+
+def read_reference_closes(path: str = REFERENCE_FILE) -> tuple[pd.DataFrame, str | None]:
+    df, meta = read_snapshot(path, memory_map=False)
+    return df, meta.get("as_of")
+
+
+class LiveRanker:
+    """
+    Live returns and RS ranks for the tickers in `ref` (reference_closes).
+    update() is incremental; frame() re-ranks only after a change. Thread-safe,
+    so one instance can be shared by all app sessions.
+    Once a new session starts, tickers without a quote for it keep their last close
+    as Price but have no returns or ranks (NaN) until their first quote arrives.
+    """
+
+    def __init__(self, ref: pd.DataFrame, as_of: str | None = None, exclude: list[str] | None = None):
+        self.tickers = pd.Index(ref["Ticker"].astype(str))
+        self.as_of = pd.Timestamp(as_of).normalize() if as_of else None
+        self._refs = {s: ref[[f"{s} {w}" for w in WINDOWS]].to_numpy(dtype=float) for s in ("same", "next")}
+        # Reference files written before the composite boundaries were added have no Q columns
+        self._quarters = None
+        if all(f"same {q}" in ref.columns for q in QUARTERS):
+            self._quarters = {s: ref[[f"{s} {q}" for q in QUARTERS]].to_numpy(dtype=float) for s in ("same", "next")}
+        # Benchmarks are priced and returned, but not ranked
+        self._ranked = ~self.tickers.isin(exclude or [])
+        self.price = ref["Close"].to_numpy(dtype=float).copy()
+        # Price belongs to the current session (the snapshot close does for "same")
+        self.quoted = np.ones(len(self.tickers), dtype=bool)
+        self.session = "same"
+        self.ret = self.price[:, None] / self._refs["same"] - 1
+        self.version = 0
+        self.updated_at: float | None = None
+        self.last_changed = 0
+        self.last_seconds = 0.0
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def _session_for(self, date) -> str:
+        if date is None or self.as_of is None:
+            return self.session
+        return "next" if pd.Timestamp(date).normalize() > self.as_of else "same"
+
+    def update(self, prices: dict[str, float], date=None) -> int:
+        """Applies new prices; returns the number of tickers whose price changed."""
+        t0 = time.perf_counter()
+        with self._lock:
+            session = self._session_for(date)
+            pos = self.tickers.get_indexer(list(prices))
+            p = np.fromiter(prices.values(), dtype=float, count=len(prices))
+            ok = (pos >= 0) & np.isfinite(p) & (p > 0)
+            pos, p = pos[ok], p[ok]
+            if session != self.session:
+                # New session: every window moves by one bar; closes of the old session don't count
+                self.session = session
+                self.quoted[:] = session == "same"
+                self.quoted[pos] = True
+                self.price[pos] = p
+                self.ret = self.price[:, None] / self._refs[session] - 1
+                self.ret[~self.quoted] = np.nan
+                changed = len(pos)
+            else:
+                diff = (p != self.price[pos]) | ~self.quoted[pos]
+                pos, p = pos[diff], p[diff]
+                self.quoted[pos] = True
+                self.price[pos] = p
+                self.ret[pos] = p[:, None] / self._refs[session][pos] - 1
+                changed = len(pos)
+            if changed:
+                self.version += 1
+                self._frame = None
+            self.updated_at = time.time()
+            self.last_changed = changed
+            self.last_seconds = time.perf_counter() - t0
+        return changed
+
+    def refresh(self, feed, min_interval: float = 0.0) -> int:
+        """Pulls prices from feed unless the last pull is younger than min_interval seconds."""
+        if self.updated_at is not None and time.time() - self.updated_at < min_interval:
+            return 0
+        prices, date = feed.fetch(self.tickers.tolist())
+        return self.update(prices, date)
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Ticker, Price, % <window> (fractions) and RS 1-99 like universe.build_universe, RS GAP included;
+        RS Composite when the reference closes have the quarter boundaries.
+        """
+        with self._lock:
+            if self._frame is not None:
+                return self._frame
+            t0 = time.perf_counter()
+            df = pd.DataFrame(self.ret, columns=[f"% {w}" for w in WINDOWS])
+            df.insert(0, "Price", self.price)
+            df.insert(0, "Ticker", self.tickers)
+            rs_cols = [f"% {w}" for w in RS_WINDOWS]
+            ranks = (df.loc[self._ranked, rs_cols].rank(pct=True) * 99).round().clip(1, 99)
+            for w, c in zip(RS_WINDOWS, rs_cols):
+                df[f"RS {w}"] = ranks[c]
+            df["RS GAP"] = df["RS 1M"] - df["RS 1Y"]
+            if self._quarters is not None:
+                # Same score as metrics.compute_metrics, with the live price as the latest edge
+                edges = np.column_stack([self.price, self._quarters[self.session]])
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    score = sum(w * (edges[:, i] / edges[:, i + 1] - 1) * 100 for i, w in enumerate(COMPOSITE_WEIGHTS))
+                score[~self.quoted] = np.nan
+                df["RS Composite"] = (pd.Series(score)[self._ranked].rank(pct=True) * 99).round().clip(1, 99)
+            self._frame = df
+            self.last_seconds += time.perf_counter() - t0
+            return df
+
+    def benchmark_returns(self) -> pd.DataFrame:
+        """Live returns of the unranked rows, shaped like universe.benchmark_returns."""
+        df = self.frame()
+        out = df.loc[~self._ranked, ["Ticker"] + [f"% {w}" for w in RS_WINDOWS]].set_index("Ticker")
+        out.columns = RS_WINDOWS
+        out.index.name = "Symbol"
+        return out
+
+
+class YahooQuotes:
+    """Current daily bar per ticker (Close = last price) through the chunked Downloader."""
+
+    def __init__(self, workers: int = 8):
+        self.download = Downloader(YahooProvider(period="1d"), workers=workers, retries=0)
+
+    def fetch(self, symbols: list[str]) -> tuple[dict[str, float], pd.Timestamp | None]:
+        got = self.download(symbols)
+        prices, date = {}, None
+        for t, df in got.items():
+            c = df["Close"].dropna()
+            if not c.empty:
+                prices[t] = float(c.iloc[-1])
+                date = max(date, c.index[-1]) if date is not None else c.index[-1]
+        return prices, date
+
+
+class ReplayFeed:
+    """Plays back recorded ticks (Time, Ticker, Price): each fetch returns the next time step."""
+
+    def __init__(self, ticks: pd.DataFrame, loop: bool = False):
+        ticks = ticks.assign(Time=pd.to_datetime(ticks["Time"])).sort_values("Time", kind="stable")
+        self.steps = [g for _, g in ticks.groupby("Time", sort=True)]
+        self.loop = loop
+        self.pos = 0
+
+    @classmethod
+    def from_csv(cls, path: str, loop: bool = False) -> "ReplayFeed":
+        return cls(pd.read_csv(path), loop)
+
+    def fetch(self, symbols: list[str] | None = None) -> tuple[dict[str, float], pd.Timestamp | None]:
+        if self.pos >= len(self.steps):
+            if not self.loop or not self.steps:
+                return {}, None
+            self.pos = 0
+        step = self.steps[self.pos]
+        self.pos += 1
+        return dict(zip(step["Ticker"].astype(str), step["Price"].astype(float))), step["Time"].iloc[0]
+
+
+def apply_live(df_univ: pd.DataFrame, live: pd.DataFrame) -> pd.DataFrame:
+    """
+    df_univ with Price, returns, RS ranks (RS Composite included) and RS GAP replaced
+    by the live values (LiveRanker.frame) for every ticker the live frame has, and
+    % from highs / P>MA flags recomputed from the live price; other rows unchanged.
+    Without a live RS Composite the column is cleared for those rows rather than left
+    at the snapshot's rank.
+    """
+    df = df_univ.copy()
+    pos = pd.Index(live["Ticker"]).get_indexer(df["Ticker"])
+    hit = pos >= 0
+    cols = ["Price", "RS GAP", "RS Composite"] + [f"RS {w}" for w in RS_WINDOWS] + [f"% {w}" for w in WINDOWS]
+    for c in cols:
+        if c in df.columns:
+            df.loc[hit, c] = live[c].to_numpy()[pos[hit]] if c in live.columns else np.nan
+    if {"_high52", "_ath", "_sma200", "_sma50", "_sma20", "_sma10"} <= set(df.columns):
+        for c in ("_high52", "_ath"):
+            df[c] = np.where(np.isfinite(df[c]), np.fmax(df[c], df["Price"]), df[c])
+        price_levels(df)
+    # Fractional returns behind the "% vs <benchmark>" column (universe.relative_returns)
+    for w in WINDOWS:
+        if f"r_{w.lower()}" in df.columns:
+            df[f"r_{w.lower()}"] = df[f"% {w}"]
+    return df
@@ -0,0 +1,205 @@
+"""
+Kennzahlen für Screener_Data.csv, berechnet auf dem ganzen Panel (Tage x Ticker)
+statt Ticker für Ticker.
+
+Jede Spalte entspricht exakt der alten Schleife in update_data.py:
+pro Ticker zählen nur Tage mit Schlusskurs (dropna(subset=['Close'])), und
+alle Fenster (.iloc[-n], rolling(n).mean().iloc[-1]) beziehen sich auf diese
+Tage. Dafür werden die gültigen Tage jeder Spalte ans Ende "geschoben";
+danach ist Zeile -k für jeden Ticker sein k-letzter Handelstag.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Diese Liste ist die "DNA" der Website. Jede Spalte muss genau hier sitzen.
+SCREENER_COLS = [
+    "Symbol", "Description", "Price", "Price - Currency", "Gap % 1 day", "Price Change % 1 day",
+    "Market capitalization", "Market capitalization - Currency", "Volume 1 day", "Volume Change % 1 day",
+    "Volume Change % 1 week", "Volume Change % 1 month", "Average Volume 30 days", "Relative Volume 1 day",
+    "Relative Volume 1 week", "Relative Volume 1 month", "Free float", "Performance % 1 week",
+    "Performance % 1 month", "Performance % 3 months", "Performance % 6 months", "Performance % 1 year",
+    "Earnings per share diluted growth %, Quarterly YoY", "Earnings per share diluted growth %, Annual YoY",
+    "Revenue growth %, Quarterly YoY", "Revenue growth %, Annual YoY", "Return on equity %, Trailing 12 months",
+    "Pretax margin %, Trailing 12 months", "High 52 weeks", "High 52 weeks - Currency", "High All Time",
+    "High All Time - Currency", "Average Daily Range %", "Average True Range % (14) 1 day",
+    "Simple Moving Average (200) 1 day", "Simple Moving Average (50) 1 day", "Simple Moving Average (20) 1 day",
+    "Simple Moving Average (10) 1 day", "Sector"
+]
+
+PERF_WINDOWS = {
+    "Price Change % 1 day": 2,
+    "Performance % 1 week": 5,
+    "Performance % 1 month": 21,
+    "Performance % 3 months": 63,
+    "Performance % 6 months": 126,
+    "Performance % 1 year": 252,
+}
+
+MIN_BARS = 5
+
+ATR_LEN = 14
+# Volumen-Fenster in Handelstagen: Woche / Monat wie bei den Performance-Spalten
+VOL_WINDOWS = {"1 day": 1, "1 week": 5, "1 month": 21}
+# Relative Volume 1 week/1 month: aktuelle Periode gegen den Schnitt der 10 Perioden davor
+RVOL_PERIODS = 10
+
+# Zusätzlich zu SCREENER_COLS (nicht im CSV-Export, nur im Snapshot)
+COMPOSITE_COL = "RS Composite Score"
+INDUSTRY_COL = "Industry"  # GICS Sub-Industry
+
+# Gewichtete Quartalssegmente (jüngstes zuerst), das letzte Quartal doppelt
+QUARTER = 63
+COMPOSITE_WEIGHTS = [0.4, 0.2, 0.2, 0.2]
+
+
+def build_panel(data: pd.DataFrame, symbols: list[str]) -> tuple[list[str], dict[str, np.ndarray]]:
+    """yf.download(..., group_by='ticker')-Frame -> (tickers, {Feld: Array Tage x Ticker})."""
+    if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+        return [], {}
+    have = set(data.columns.get_level_values(0))
+    tickers = [t for t in symbols if t in have]
+    cols = pd.MultiIndex.from_product([tickers, FIELDS])
+    arr = data.reindex(columns=cols).to_numpy(dtype=float).reshape(len(data), len(tickers), len(FIELDS))
+    return tickers, {f: arr[:, :, i] for i, f in enumerate(FIELDS)}
+
+
+def compact_panel(panel: dict[str, np.ndarray]) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Schiebt pro Ticker die Tage mit Schlusskurs ans Ende (stabile Reihenfolge), Rest = NaN."""
+    close = panel["Close"]
+    valid = ~np.isnan(close)
+    order = np.argsort(valid, axis=0, kind="stable")
+    n = valid.sum(axis=0)
+    pad = np.arange(close.shape[0])[:, None] < (close.shape[0] - n)[None, :]
+    out = {}
+    for f, a in panel.items():
+        a = np.take_along_axis(a, order, axis=0)
+        a[pad] = np.nan
+        out[f] = a
+    return out, n
+
+
+def _at(a: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """Wert an Position -k je Ticker (wie series.iloc[-k])."""
+    return a[a.shape[0] - k, np.arange(a.shape[1])]
+
+
+def _tail_mean(a: np.ndarray, w: int) -> np.ndarray:
+    """rolling(w).mean().iloc[-1]: NaN sobald ein Wert im Fenster fehlt."""
+    if a.shape[0] < w:
+        return np.full(a.shape[1], np.nan)
+    return a[-w:].mean(axis=0)
+
+
+def _window_sum(cs: np.ndarray, skip: int, w: int) -> np.ndarray:
+    """Summe der w Zeilen, die `skip` Zeilen vor dem Ende enden (cs = kumulierte Summe mit Nullzeile)."""
+    end = cs.shape[0] - 1 - skip
+    if end - w < 0:
+        return np.full(cs.shape[1], np.nan)
+    return cs[end] - cs[end - w]
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = ATR_LEN) -> np.ndarray:
+    """ATR (Wilder/RMA) am letzten Tag; True Range mit dem Vortags-Schluss, erster Tag = High - Low."""
+    prev = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        tr = np.nanmax(np.stack([high - low, np.abs(high - prev), np.abs(low - prev)]), axis=0)
+    # ewm läuft spaltenweise in C über das ganze Panel; führende NaN (Padding) werden übersprungen
+    rma = pd.DataFrame(tr).ewm(alpha=1 / length, adjust=False).mean()
+    return rma.to_numpy()[-1]
+
+
+def compute_metrics(data: pd.DataFrame, symbols: list[str], meta: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Alle Spalten von Screener_Data.csv (+ COMPOSITE_COL, INDUSTRY_COL) für alle
+    symbols mit mindestens MIN_BARS Tagen. meta: optional Name/Sector/Industry
+    je Ticker (Index = Symbol), z.B. aus der Wikipedia-Tabelle; sonst Ticker
+    als Name und leerer Sektor.
+    """
+    tickers, panel = build_panel(data, symbols)
+    if not tickers or panel["Close"].shape[0] == 0:
+        return pd.DataFrame(columns=SCREENER_COLS)
+
+    p, n = compact_panel(panel)
+    keep = n >= MIN_BARS
+    tickers = [t for t, k in zip(tickers, keep) if k]
+    p = {f: a[:, keep] for f, a in p.items()}
+    n = n[keep]
+
+    close, high, low, vol = p["Close"], p["High"], p["Low"], p["Volume"]
+    cur = close[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        perf = {c: (cur / _at(close, np.minimum(d, n)) - 1) * 100 for c, d in PERF_WINDOWS.items()}
+        gap = np.where(n > 1, (p["Open"][-1] / close[-2] - 1) * 100, 0)
+        avg30 = _tail_mean(vol, 30)
+        rvol = np.where(n > 30, vol[-1] / avg30, 1)
+        adr = _tail_mean((high / low - 1) * 100, 20)
+        sma = {w: np.where(n >= w, _tail_mean(close, w), cur) for w in (200, 50, 20, 10)}
+
+        atr_pct = _atr(high, low, close) / cur * 100
+
+        # Volumen: kumulierte Summe einmal, danach jedes Fenster in O(1)
+        cs = np.vstack([np.zeros((1, vol.shape[1])), np.nancumsum(vol, axis=0)])
+        vol_chg = {}
+        for label, w in VOL_WINDOWS.items():
+            chg = (_window_sum(cs, 0, w) / _window_sum(cs, w, w) - 1) * 100
+            vol_chg[label] = np.where(n >= 2 * w, chg, np.nan)
+        rvol_w = {}
+        for label, w in (("1 week", 5), ("1 month", 21)):
+            base = _window_sum(cs, w, RVOL_PERIODS * w) / RVOL_PERIODS
+            rvol_w[label] = np.where(n >= (RVOL_PERIODS + 1) * w, _window_sum(cs, 0, w) / base, 1)
+
+        # Segment i: Kurs vor i Quartalen -> vor i+1 Quartalen; kürzere Historie
+        # endet wie p(d) am ersten Kurs (fehlende Segmente = 0 %)
+        edges = [cur] + [_at(close, np.minimum(QUARTER * (i + 1), n)) for i in range(len(COMPOSITE_WEIGHTS))]
+        composite = sum(w * (edges[i] / edges[i + 1] - 1) * 100 for i, w in enumerate(COMPOSITE_WEIGHTS))
+
+    # nanmax über reine NaN-Spalten warnt nur und liefert NaN, wie pandas .max()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        high52 = np.nanmax(high[-252:], axis=0)
+        ath = np.nanmax(high, axis=0)
+
+    # Fundamentaldaten sind nicht aus OHLCV ableitbar und kommen aus fundamentals.py; ohne sie leer
+    none = np.full(len(tickers), np.nan)
+    info = (meta if meta is not None else pd.DataFrame()).reindex(index=tickers, columns=["Name", "Sector", "Industry"])
+    info = info.fillna("").astype(str)
+    names = np.where(info["Name"].to_numpy() != "", info["Name"].to_numpy(), np.asarray(tickers, dtype=object))
+    out = pd.DataFrame({
+        "Symbol": tickers, "Description": names, "Price": cur, "Price - Currency": "USD",
+        "Gap % 1 day": gap,
+        "Price Change % 1 day": perf["Price Change % 1 day"],
+        "Market capitalization": none, "Market capitalization - Currency": "USD",
+        "Volume 1 day": vol[-1], "Volume Change % 1 day": vol_chg["1 day"],
+        "Volume Change % 1 week": vol_chg["1 week"], "Volume Change % 1 month": vol_chg["1 month"],
+        "Average Volume 30 days": avg30,
+        "Relative Volume 1 day": rvol,
+        "Relative Volume 1 week": rvol_w["1 week"], "Relative Volume 1 month": rvol_w["1 month"],
+        "Free float": none,
+        "Performance % 1 week": perf["Performance % 1 week"],
+        "Performance % 1 month": perf["Performance % 1 month"],
+        "Performance % 3 months": perf["Performance % 3 months"],
+        "Performance % 6 months": perf["Performance % 6 months"],
+        "Performance % 1 year": perf["Performance % 1 year"],
+        "Earnings per share diluted growth %, Quarterly YoY": none, "Earnings per share diluted growth %, Annual YoY": none,
+        "Revenue growth %, Quarterly YoY": none, "Revenue growth %, Annual YoY": none,
+        "Return on equity %, Trailing 12 months": none, "Pretax margin %, Trailing 12 months": none,
+        "High 52 weeks": high52, "High 52 weeks - Currency": "USD",
+        "High All Time": ath, "High All Time - Currency": "USD",
+        "Average Daily Range %": adr,
+        "Average True Range % (14) 1 day": atr_pct,
+        "Simple Moving Average (200) 1 day": sma[200],
+        "Simple Moving Average (50) 1 day": sma[50],
+        "Simple Moving Average (20) 1 day": sma[20],
+        "Simple Moving Average (10) 1 day": sma[10],
+        "Sector": info["Sector"].to_numpy(),
+    })
+    out = out.reindex(columns=SCREENER_COLS)
+    out[COMPOSITE_COL] = composite
+    out[INDUSTRY_COL] = info["Industry"].to_numpy()
+    return out
@@ -0,0 +1,153 @@
+"""
+HTML table rendering for the scanner / ticker lookup tables.
+
+Each column is formatted once over its whole value array (no per-cell
+if/elif chain, no iterrows), and cell colors come from a fixed set of CSS
+classes instead of inline style strings:
+  - RS values -> one of 99 background classes (.rs-1 ... .rs-99)
+  - % values  -> .pos / .neg / .flat
+TABLE_CSS has to be on the page once (app.py injects it with the main CSS).
+"""
+import html
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLS = ["Price", "SMA200", "SMA50", "SMA20", "SMA10"]
+BIG_NUM_COLS = ["Mkt Cap", "Volume", "Avg Vol 30D", "Float"]
+PCT_COLS = [
+    "ADR%", "ATR%", "% From 52W High", "% From ATH",
+    "Vol Chg 1D", "Vol Chg 1W", "Vol Chg 1M",
+    "EPS Qtr YoY", "EPS Ann YoY", "Rev Qtr YoY", "Rev Ann YoY",
+    "ROE TTM", "PreTax Mgn TTM",
+]
+FLAG_COLS = ["P>200", "P>50", "P>20", "P>10", "50>200"]
+
+
+def _rs_rgb(v: float) -> tuple[int, int, int]:
+    x = (v - 1) / 98.0
+    if x < 0.5:
+        r = 255
+        g = int(80 + (x / 0.5) * (180 - 80))
+    else:
+        r = int(255 - ((x - 0.5) / 0.5) * (255 - 40))
+        g = 200
+    return r, g, 60
+
+
+def _build_css() -> str:
+    rules = [
+        ".pl-table .rs{color:#0B0B0B; font-weight:900; border-radius:6px; padding:2px 6px; "
+        "display:inline-block; min-width:32px; text-align:center;}",
+        ".pl-table .pos{color:#7CFC9A; font-weight:800;}",
+        ".pl-table .neg{color:#FF6B6B; font-weight:800;}",
+        ".pl-table .flat{opacity:0.9; font-weight:700;}",
+    ]
+    for v in range(1, 100):
+        r, g, b = _rs_rgb(v)
+        rules.append(f".rs-{v}{{background-color:rgb({r},{g},{b});}}")
+    return "<style>\n" + "\n".join(rules) + "\n</style>"
+
+
+TABLE_CSS = _build_css()
+
+
+def _td_class(c: str) -> str:
+    if c == "Ticker":
+        return "ticker"
+    if c == "Name":
+        return "name"
+    if c == "RS GAP":
+        return "mono rs-gap"
+    if c in PRICE_COLS or c in BIG_NUM_COLS or c in FLAG_COLS:
+        return "mono"
+    if c.startswith("% ") or c.startswith("RS ") or c in PCT_COLS:
+        return "mono"
+    return ""
+
+
+def _num(s: pd.Series) -> np.ndarray:
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+
+
+def _fmt(x: np.ndarray, fmt: str) -> np.ndarray:
+    """fmt applied to every finite value; NaN -> ''."""
+    out = np.full(len(x), "", dtype=object)
+    ok = ~np.isnan(x)
+    out[ok] = [fmt.format(v) for v in x[ok]]
+    return out
+
+
+def _fmt_big_num(x: np.ndarray) -> np.ndarray:
+    ax = np.abs(x)
+    div = np.select([ax >= 1e12, ax >= 1e9, ax >= 1e6, ax >= 1e3], [1e12, 1e9, 1e6, 1e3], 1.0)
+    suf = np.select([ax >= 1e12, ax >= 1e9, ax >= 1e6, ax >= 1e3], ["T", "B", "M", "K"], "")
+    out = np.full(len(x), "", dtype=object)
+    ok = ~np.isnan(x)
+    small = ok & (suf == "")
+    big = ok & ~small
+    out[small] = [f"{v:,.0f}" for v in x[small]]
+    out[big] = [f"{v:.2f}{s}" for v, s in zip(x[big] / div[big], suf[big])]
+    return out
+
+
+def _fmt_pct(x: np.ndarray) -> np.ndarray:
+    txt = _fmt(x, "{:.2%}")
+    cls = np.select([x > 0, x < 0], ["pos", "neg"], "flat")
+    ok = ~np.isnan(x)
+    out = txt.copy()
+    out[ok] = [f'<span class="{k}">{t}</span>' for k, t in zip(cls[ok], txt[ok])]
+    return out
+
+
+def _fmt_rs(x: np.ndarray) -> np.ndarray:
+    txt = _fmt(x, "{:.0f}")
+    ok = ~np.isnan(x)
+    bucket = np.clip(np.rint(np.where(ok, x, 1)), 1, 99).astype(int)
+    out = txt.copy()
+    out[ok] = [f'<span class="rs rs-{b}">{t}</span>' for b, t in zip(bucket[ok], txt[ok])]
+    return out
+
+
+def _fmt_text(s: pd.Series) -> np.ndarray:
+    vals = s.to_numpy(dtype=object)
+    return np.array(["" if (v is None or (isinstance(v, float) and np.isnan(v))) else html.escape(str(v))
+                     for v in vals], dtype=object)
+
+
+def format_column(s: pd.Series, c: str) -> np.ndarray:
+    """Cell HTML for a whole column."""
+    if c in FLAG_COLS and pd.api.types.is_bool_dtype(s):
+        return np.where(s.to_numpy(dtype=bool), "✓", "").astype(object)
+    if c in PRICE_COLS:
+        return _fmt(_num(s), "${:,.2f}")
+    if c in BIG_NUM_COLS:
+        return _fmt_big_num(_num(s))
+    if c.startswith("% ") or c in PCT_COLS:
+        return _fmt_pct(_num(s))
+    if c.startswith("RS "):
+        return _fmt_rs(_num(s))
+    return _fmt_text(s)
+
+
+def table_html(df: pd.DataFrame, columns: list[str], height_px: int = 900) -> str:
+    th = "".join(f'<th class="{"rs-gap" if c == "RS GAP" else ""}">{c}</th>' for c in columns)
+
+    cells = []
+    for c in columns:
+        vals = format_column(df[c], c) if c in df.columns else np.full(len(df), "", dtype=object)
+        open_td = f'<td class="{_td_class(c)}">'
+        cells.append([open_td + v + "</td>" for v in vals])
+
+    trs = ["<tr>" + "".join(r) + "</tr>" for r in zip(*cells)] if cells else []
+
+    return f"""
+    <div class="pl-table-wrap" style="max-height:{height_px}px; overflow:auto;">
+      <table class="pl-table">
+        <thead><tr>{th}</tr></thead>
+        <tbody>
+          {''.join(trs)}
+        </tbody>
+      </table>
+    </div>
+    """
@@ -0,0 +1,148 @@
+"""
+Tägliche RS-Ratings (1-99) je Ticker und Zeitraum, append-only gespeichert.
+
+Beim ersten Lauf werden alle Handelstage im geladenen 2-Jahres-Panel
+nachberechnet, danach kommt pro Lauf nur der neue Tag (bzw. die neuen Tage)
+dazu. Gerankt wird je Datum quer über alle Ticker (pandas rank(axis=1)),
+mit derselben Formel wie universe.to_rs_1_99. Die Division durch SPY ist
+dafür nicht nötig: (1+r)/(1+b)-1 ist bei festem b monoton in r, der Rang
+ist also identisch.
+
+Die Fenster zählen wie in metrics.compute_metrics die gültigen Bars jedes
+Tickers (compact_panel), nicht Kalenderzeilen des Panels: fehlt einem Ticker
+ein Tag, reicht sein 1M-Fenster einen Tag weiter zurück. Damit ist die Zeile
+des Snapshot-Tags identisch mit den RS-Spalten des Screeners.
+
+Ablage: Data/RS_History/YYYY-MM.npz (dates, tickers, ranks uint8
+[Tage x Ticker x Zeiträume], 0 = kein Rating). Monatsdateien, damit der
+tägliche Commit nur die aktuelle, kleine Datei ändert.
+"""
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from metrics import MIN_BARS, compact_panel
+
+RS_HISTORY_DIR = "Data/RS_History"
+
+# Gleiche Fenster wie metrics.PERF_WINDOWS (p(5), p(21), ...)
+TIMEFRAMES = [("RS 1W", 5), ("RS 1M", 21), ("RS 3M", 63), ("RS 6M", 126), ("RS 1Y", 252)]
+
+
+def rank_history(close: pd.DataFrame, start: int = 0) -> np.ndarray:
+    """
+    Close-Panel (Tage x Ticker) -> RS-Ränge uint8 (Tage x Ticker x len(TIMEFRAMES)).
+    start: erst ab dieser Zeile ranken (tägliches Anhängen braucht nur die letzte).
+    Je Tag wie metrics.compute_metrics an diesem Tag: letzter gültiger Kurs gegen
+    den min(d, Bars)-letzten gültigen Kurs; Ticker mit weniger als MIN_BARS Bars ohne Rating.
+    """
+    c = close.to_numpy(dtype=float)
+    T, N = c.shape
+    # Gültige Kurse ans Ende geschoben: der j-te Bar (ab 0) von Ticker i steht in Zeile T - n[i] + j
+    p, n = compact_panel({"Close": c})
+    packed = p["Close"]
+    bars = np.cumsum(~np.isnan(c), axis=0)[start:]  # gültige Bars bis einschließlich Tag t
+    base = (T - n)[None, :]
+    cols = np.arange(N)[None, :]
+    cur = packed[np.clip(base + bars - 1, 0, T - 1), cols]
+    unrated = bars < MIN_BARS
+
+    out = np.zeros((T - start, N, len(TIMEFRAMES)), dtype=np.uint8)
+    for k, (_, d) in enumerate(TIMEFRAMES):
+        # wie metrics._at(close, min(d, n)) auf den Bars bis Tag t
+        ref = packed[np.clip(base + bars - np.minimum(d, bars), 0, T - 1), cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = cur / ref - 1
+        r[unrated] = np.nan
+        rs = (pd.DataFrame(r).rank(axis=1, pct=True) * 99).round().clip(1, 99)
+        out[:, :, k] = rs.fillna(0).to_numpy(dtype=np.uint8)
+    return out
+
+
+def _partition(root: str, month: str) -> str:
+    return os.path.join(root, f"{month}.npz")
+
+
+def _read_part(path: str) -> tuple[np.ndarray, list[str], np.ndarray]:
+    with np.load(path, allow_pickle=False) as z:
+        return z["dates"], z["tickers"].tolist(), z["ranks"]
+
+
+def _align(tickers: list[str], ranks: np.ndarray, all_tickers: list[str]) -> np.ndarray:
+    pos = {t: i for i, t in enumerate(all_tickers)}
+    out = np.zeros((ranks.shape[0], len(all_tickers), ranks.shape[2]), dtype=np.uint8)
+    out[:, [pos[t] for t in tickers], :] = ranks
+    return out
+
+
+def load_rs_history(root: str = RS_HISTORY_DIR) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """Alle Monatsdateien -> (dates datetime64[D], tickers, ranks uint8 [Tage x Ticker x Zeiträume])."""
+    parts = [_read_part(p) for p in sorted(glob.glob(os.path.join(root, "*.npz")))]
+    if not parts:
+        return np.array([], dtype="datetime64[D]"), [], np.zeros((0, 0, len(TIMEFRAMES)), dtype=np.uint8)
+    all_tickers = list(dict.fromkeys(t for _, tk, _ in parts for t in tk))
+    dates = np.concatenate([d for d, _, _ in parts])
+    ranks = np.concatenate([_align(tk, r, all_tickers) for _, tk, r in parts])
+    return dates, all_tickers, ranks
+
+
+def update_rs_history(close: pd.DataFrame, root: str = RS_HISTORY_DIR) -> int:
+    """
+    Hängt die Tage aus close an, die nach dem letzten gespeicherten Datum liegen
+    (beim ersten Lauf: alle). Gibt die Anzahl neuer Tage zurück.
+    """
+    stored_dates, _, _ = load_rs_history(root)
+    dates = close.index.values.astype("datetime64[D]")
+    new = dates > stored_dates.max() if len(stored_dates) else np.ones(len(dates), dtype=bool)
+    if not new.any():
+        return 0
+
+    # neue Tage liegen am Ende des Panels
+    first_new = int(np.argmax(new))
+    ranks = rank_history(close, first_new)
+    dates = dates[first_new:]
+    tickers = [str(t) for t in close.columns]
+
+    os.makedirs(root, exist_ok=True)
+    months = dates.astype("datetime64[M]").astype(str)
+    for month in np.unique(months):
+        sel = months == month
+        m_dates, m_tickers, m_ranks = dates[sel], tickers, ranks[sel]
+        path = _partition(root, month)
+        if os.path.exists(path):
+            o_dates, o_tickers, o_ranks = _read_part(path)
+            m_tickers = list(dict.fromkeys(o_tickers + tickers))
+            m_ranks = np.concatenate([_align(o_tickers, o_ranks, m_tickers), _align(tickers, m_ranks, m_tickers)])
+            m_dates = np.concatenate([o_dates, m_dates])
+        np.savez_compressed(path, dates=m_dates, tickers=np.array(m_tickers), ranks=m_ranks)
+    return int(new.sum())
+
+
+def ticker_history(dates: np.ndarray, tickers: list[str], ranks: np.ndarray, ticker: str) -> pd.DataFrame | None:
+    """Ratings eines Tickers als DataFrame (Datum x Zeitraum), NaN = kein Rating."""
+    if ticker not in tickers or not len(dates):
+        return None
+    h = ranks[:, tickers.index(ticker), :].astype(float)
+    h[h == 0] = np.nan
+    return pd.DataFrame(h, index=pd.DatetimeIndex(dates), columns=[name for name, _ in TIMEFRAMES])
+
+
+def trajectory(hist: pd.DataFrame, top: int = 90, window: int = 63) -> pd.DataFrame:
+    """
+    Kennzahlen je Zeitraum aus ticker_history(): aktuelles Rating, Änderung über
+    5/20 Tage und Tage im obersten Dezil in den letzten `window` Handelstagen.
+    """
+    h = hist.to_numpy()
+
+    def chg(n):
+        return h[-1] - h[-1 - n] if len(h) > n else np.full(h.shape[1], np.nan)
+
+    return pd.DataFrame({
+        "Timeframe": hist.columns,
+        "RS Now": h[-1],
+        "Chg 5D": chg(5),
+        "Chg 20D": chg(20),
+        f"Days >= {top} ({window}D)": (h[-window:] >= top).sum(axis=0),
+    })
@@ -0,0 +1,77 @@
+"""
+Laufbericht für update_data(): Zeit pro Stufe, Download-Chunks, fehlgeschlagene
+und übersprungene Ticker jeweils mit Grund, Warnungen. Wird als JSON neben
+die Daten geschrieben (Data/run_report.json); die App zeigt ihn im
+Debug-Bereich der Sidebar an.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_FILE = "Data/run_report.json"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class RunReport:
+    def __init__(self):
+        self.started = _now()
+        self._t0 = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.chunks: list[dict] = []
+        self.failed: dict[str, str] = {}
+        self.skipped: dict[str, str] = {}
+        self.warnings: list[str] = []
+        self.counts: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Misst die Zeit des Blocks; gleiche Namen werden aufaddiert."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - t, 3)
+
+    def warn(self, msg: str):
+        print(f"WARNUNG: {msg}")
+        self.warnings.append(msg)
+
+    def fail(self, ticker: str, reason: str):
+        self.failed[ticker] = reason
+
+    def skip(self, ticker: str, reason: str):
+        self.skipped[ticker] = reason
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "finished": _now(),
+            "total_seconds": round(time.perf_counter() - self._t0, 3),
+            "stages": self.stages,
+            "counts": dict(self.counts, failed=len(self.failed), skipped=len(self.skipped),
+                           chunks=len(self.chunks), chunk_errors=sum(1 for c in self.chunks if c["error"])),
+            "failed": dict(sorted(self.failed.items())),
+            "skipped": dict(sorted(self.skipped.items())),
+            "warnings": self.warnings,
+            "chunks": self.chunks,
+        }
+
+    def write(self, path: str = REPORT_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def read_report(path: str = REPORT_FILE) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,120 @@
+"""
+Gespeicherte Scans ohne Streamlit: lädt den Snapshot einmal und wertet alle
+Scans einer JSON-Datei dagegen aus (scan_engine.run_spec).
+
+    python run_scans.py scans.json [--out Data/Scans] [--data Data/Screener_Data.arrow]
+
+Scan-Datei: Liste von Specs oder {"scans": [...]}, Beispiel in
+scans.example.json. Felder wie in der Sidebar der App (scan_engine.SPEC_DEFAULTS):
+  name, mode, rank_by, rs_min, rs_gap, strict_chain, sort, limit, columns,
+  filters (Custom-Filter, z.B. {"min_eps_q": 20, "p_above_200": true})
+
+Ausgabe: <out>/<name>.csv je Scan und <out>/scans.json mit allen Treffern,
+Stichtag und Laufzeit je Scan. Exit-Code 1, wenn ein Scan ungültig ist.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from scan_engine import run_spec, scan_spec, scan_universe
+from snapshot import SNAPSHOT_FILE, read_snapshot
+from universe import build_universe
+
+CSV_FILE = "Data/Screener_Data.csv"
+SPY_FILE = "Data/SPY_Data.csv"
+OUT_DIR = "Data/Scans"
+
+
+def load_specs(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    specs = raw.get("scans", []) if isinstance(raw, dict) else raw
+    if not isinstance(specs, list):
+        raise ValueError(f"{path}: erwartet eine Liste von Scans oder {{\"scans\": [...]}}")
+    return specs
+
+
+def load_universe(data_file: str | None = None, spy_file: str = SPY_FILE) -> tuple[pd.DataFrame, dict]:
+    """Scan-Universum wie in der App: fertiger Snapshot, sonst CSV-Export + build_universe."""
+    data_file = data_file or (SNAPSHOT_FILE if os.path.exists(SNAPSHOT_FILE) else CSV_FILE)
+    meta = {}
+    if data_file.endswith(".arrow"):
+        df, meta = read_snapshot(data_file)
+    else:
+        df = pd.read_csv(data_file)
+    if not meta.get("derived"):
+        spy = pd.DataFrame([meta["benchmark"]]) if meta.get("benchmark") else pd.read_csv(spy_file)
+        df, _ = build_universe(df, spy)
+    return scan_universe(df), meta
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "scan"
+
+
+def records(df: pd.DataFrame) -> list[dict]:
+    """JSON-taugliche Zeilen (NaN -> null, numpy-Typen -> Python)."""
+    df = df.astype(object).where(df.notna(), None)
+    return [{k: (v.item() if isinstance(v, np.generic) else v) for k, v in r.items()}
+            for r in df.to_dict(orient="records")]
+
+
+def run(specs: list[dict], df_univ: pd.DataFrame, meta: dict, out_dir: str) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    result = {"as_of": meta.get("as_of"), "universe": len(df_univ), "scans": []}
+    used = set()
+    for spec in specs:
+        spec = scan_spec(spec)
+        slug = _slug(spec["name"])
+        while slug in used:
+            slug += "_"
+        used.add(slug)
+
+        t = time.perf_counter()
+        res = run_spec(df_univ, spec)
+        secs = time.perf_counter() - t
+
+        res.to_csv(os.path.join(out_dir, f"{slug}.csv"), index=False, float_format="%.4f")
+        result["scans"].append({"name": spec["name"], "file": f"{slug}.csv", "matches": len(res),
+                                "seconds": round(secs, 4), "rows": records(res)})
+        print(f"{spec['name']:40s} {len(res):6d} Treffer {secs * 1000:8.1f} ms")
+
+    with open(os.path.join(out_dir, "scans.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=1, ensure_ascii=False)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("scans", help="JSON-Datei mit den Scans")
+    parser.add_argument("--out", default=OUT_DIR)
+    parser.add_argument("--data", help="Snapshot (.arrow) oder Screener-CSV (Standard: Snapshot, sonst CSV)")
+    parser.add_argument("--spy", default=SPY_FILE)
+    args = parser.parse_args()
+
+    try:
+        specs = [scan_spec(s) for s in load_specs(args.scans)]
+    except (OSError, ValueError) as e:
+        print(f"FEHLER: {e}")
+        sys.exit(1)
+
+    t = time.perf_counter()
+    df_univ, meta = load_universe(args.data, args.spy)
+    print(f"Universum: {len(df_univ)} Aktien ({time.perf_counter() - t:.2f}s), {len(specs)} Scans")
+    t = time.perf_counter()
+    try:
+        run(specs, df_univ, meta, args.out)
+    except ValueError as e:
+        print(f"FEHLER: {e}")
+        sys.exit(1)
+    print(f"ERFOLG: {len(specs)} Scans in {time.perf_counter() - t:.2f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
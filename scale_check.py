@@ -0,0 +1,139 @@
+"""
+Skalierungstest: kompletter Lauf auf einem synthetischen Universum
+(Standard 10.000 Ticker) gegen ein festes Zeit- und Speicherbudget.
+
+Läuft komplett offline (synthetic.SyntheticProvider statt Yahoo, Ticker-Liste
+als lokale Datei wie update_data.py --universe) in einem temporären Ordner:
+  1. backfill   erster Lauf, volle 2 Jahre für alle Ticker (nur gemessen)
+  2. nightly    Folgelauf mit einem neuen Handelstag (Budget)
+  3. app_load   Snapshot laden wie die App
+  4. universe   build_universe aus dem CSV-Export (inkl. to_rs_1_99)
+  5. rank       to_rs_1_99 über alle Ticker, alle Zeiträume
+  6. render     table_html: eine Seite (200 Zeilen) und das ganze Universum
+
+Exit-Code 1, wenn eine Stufe oder der Speicher-Peak (max. RSS des Prozesses)
+über dem Budget liegt.
+
+    python scale_check.py [--tickers 10000] [--dir ORDNER]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from render import table_html
+from snapshot import SNAPSHOT_FILE, read_snapshot
+from synthetic import SyntheticFundamentals, SyntheticProvider, synthetic_history, synthetic_symbols, write_symbol_file
+from universe import build_universe, to_rs_1_99
+import update_data as pipeline
+
+# Budget für 10.000 Ticker in Sekunden, rund 4x Reserve über den Messwerten auf
+# einem CPU-Kern (nightly 14s, render_all 0.4s, Peak 1.5 GB inkl. Testdaten)
+BUDGET_S = {
+    "nightly": 60.0,
+    "app_load": 1.0,
+    "universe": 2.0,
+    "rank": 0.5,
+    "render_page": 0.25,
+    "render_all": 3.0,
+}
+BUDGET_PEAK_MB = 2560
+
+PAGE_ROWS = 200
+TABLE_COLS = [
+    "Ticker", "Name", "Price",
+    "RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y",
+    "% 1D", "% 1W", "% 1M", "% 3M", "% 6M", "% 1Y",
+]
+
+
+def peak_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+class Timer:
+    def __init__(self):
+        self.results: dict[str, float] = {}
+
+    def __call__(self, name: str, fn, *args, **kw):
+        t = time.perf_counter()
+        out = fn(*args, **kw)
+        self.results[name] = time.perf_counter() - t
+        print(f"[{name}] {self.results[name]:.2f}s, Peak {peak_mb():.0f} MB")
+        return out
+
+
+def run(n_tickers: int, workdir: str) -> tuple[dict[str, float], float]:
+    symbols = synthetic_symbols(n_tickers)
+    # Alle Benchmarks wie im echten Lauf, sonst misst der Download nur Retry-Wartezeit
+    history = synthetic_history(symbols + list(pipeline.BENCHMARKS))
+    days = history["SPY"].index
+    provider = SyntheticProvider(history, end=days[-2])
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return _run_stages(symbols, provider, days)
+    finally:
+        os.chdir(cwd)
+
+
+def _run_stages(symbols: list[str], provider: SyntheticProvider, days: pd.DatetimeIndex) -> tuple[dict[str, float], float]:
+    write_symbol_file(symbols, "universe.txt")
+    timer = Timer()
+
+    fundamentals = SyntheticFundamentals()
+    timer("backfill", pipeline.update_data, provider=provider, universe_file="universe.txt",
+          fundamentals_provider=fundamentals)
+    provider.end = days[-1]
+    timer("nightly", pipeline.update_data, provider=provider, universe_file="universe.txt",
+          fundamentals_provider=fundamentals)
+
+    df, _ = timer("app_load", read_snapshot, SNAPSHOT_FILE)
+    raw, spy = pd.read_csv("Data/Screener_Data.csv"), pd.read_csv("Data/SPY_Data.csv")
+    timer("universe", build_universe, raw, spy)
+
+    perf = [c for c in df.columns if c.startswith("% ")]
+    timer("rank", lambda: [to_rs_1_99(df[c]) for c in perf])
+
+    top = df.sort_values("RS 1M", ascending=False)
+    timer("render_page", table_html, top.head(PAGE_ROWS), TABLE_COLS)
+    timer("render_all", table_html, top, TABLE_COLS)
+    return timer.results, peak_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=10_000)
+    parser.add_argument("--dir", help="Arbeitsordner (Standard: temporär)")
+    args = parser.parse_args()
+
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        results, peak = run(args.tickers, os.path.abspath(args.dir))
+    else:
+        with tempfile.TemporaryDirectory() as d:
+            results, peak = run(args.tickers, d)
+
+    # Budget gilt für 10k Ticker; größere Läufe bekommen anteilig mehr, kleinere nicht weniger
+    scale = max(args.tickers / 10_000, 1.0)
+    over = [f"{k}: {v:.2f}s > {BUDGET_S[k] * scale:.2f}s" for k, v in results.items()
+            if k in BUDGET_S and v > BUDGET_S[k] * scale]
+    if peak > BUDGET_PEAK_MB * scale:
+        over.append(f"Peak {peak:.0f} MB > {BUDGET_PEAK_MB * scale:.0f} MB")
+
+    print("\n".join(f"{k:12s} {v:8.2f}s" for k, v in results.items()))
+    print(f"{'peak':12s} {peak:8.0f} MB")
+    if over:
+        print("ÜBER BUDGET:\n  " + "\n  ".join(over))
+        sys.exit(1)
+    print("Budget eingehalten.")
+
+
+if __name__ == "__main__":
+    main()
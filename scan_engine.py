@@ -0,0 +1,325 @@
+"""
+Scanner logic shared by app.py, benchmark.py and run_scans.py (no Streamlit here):
+the scan universe, the filter mask for each scan mode, top-k selection for
+the results table and declarative scan specs for headless runs.
+"""
+import numpy as np
+import pandas as pd
+
+from universe import normalize_ticker
+
+RS_COLS_ALL = ["RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y"]
+SCAN_MODES = ["Primary timeframe only", "All timeframes >= threshold", "Accelerating", "Decelerating", "Custom"]
+SORT_MODES = ["RS Gap (shift)", "Primary timeframe"]
+RANK_BY = ["RS 1M", "RS 3M", "RS 6M", "RS 1Y", "RS 1W", "RS Composite"]
+
+# Custom-mode filter values (also the Streamlit session keys in app.py); 0 / False / "All" = off
+CUSTOM_KEYS_DEFAULTS = {
+    "cf_min_mktcap": 0.0,
+    "cf_min_float": 0.0,
+
+    "cf_min_vol1d": 0.0,
+    "cf_min_avgvol30": 0.0,
+
+    "cf_min_volchg_1d": 0.0,
+    "cf_min_volchg_1w": 0.0,
+    "cf_min_volchg_1m": 0.0,
+
+    "cf_min_rvol_1d": 0.0,
+    "cf_min_rvol_1w": 0.0,
+    "cf_min_rvol_1m": 0.0,
+
+    "cf_min_eps_q": 0.0,
+    "cf_min_eps_a": 0.0,
+    "cf_min_rev_q": 0.0,
+    "cf_min_rev_a": 0.0,
+    "cf_min_roe": 0.0,
+    "cf_min_pretax": 0.0,
+
+    "cf_max_from_52w": 0.0,
+    "cf_max_from_ath": 0.0,
+
+    "cf_min_adr": 0.0,
+    "cf_min_atr": 0.0,
+
+    "cf_sector_choice": "All",
+
+    "cf_p_above_200": False,
+    "cf_p_above_50": False,
+    "cf_p_above_20": False,
+    "cf_p_above_10": False,
+
+    "cf_trend_template_1": False,
+
+    "cf_preset": "None",
+}
+
+
+def run_scan(df_univ: pd.DataFrame, mode: str, primary_tf: str, rs_min: int, rs_gap: int,
+             strict_chain: bool, sort_mode: str, cf: dict) -> tuple[np.ndarray, list[str], list[bool]]:
+    """
+    Returns (positions of matching rows in df_univ, sort columns, ascending flags).
+    cf holds the Custom filter values (CUSTOM_KEYS_DEFAULTS keys).
+    """
+    tie = "RS 1Y" if "RS 1Y" in df_univ.columns else primary_tf
+
+    if mode == "Primary timeframe only":
+        cond = (df_univ[primary_tf].fillna(0) >= rs_min)
+        by, asc = [primary_tf, tie], [False, False]
+
+    elif mode == "All timeframes >= threshold":
+        cond = True
+        for c in RS_COLS_ALL:
+            cond = cond & (df_univ[c].fillna(0) >= rs_min)
+        by, asc = [primary_tf, tie], [False, False]
+
+    elif mode == "Accelerating":
+        cond = (df_univ[primary_tf].fillna(0) >= rs_min)
+        cond = cond & (df_univ["RS GAP"].fillna(-999) >= rs_gap)
+
+        if strict_chain:
+            cond = cond & (df_univ["RS 1Y"] <= df_univ["RS 6M"])
+            cond = cond & (df_univ["RS 6M"] <= df_univ["RS 3M"])
+            cond = cond & (df_univ["RS 3M"] <= df_univ["RS 1M"])
+
+        if sort_mode == "RS Gap (shift)":
+            by, asc = ["RS GAP", "RS 1M"], [False, False]
+        else:
+            by, asc = [primary_tf, tie], [False, False]
+
+    elif mode == "Decelerating":
+        cond = (df_univ[primary_tf].fillna(0) >= rs_min)
+        cond = cond & ((-df_univ["RS GAP"]).fillna(-999) >= rs_gap)
+
+        if strict_chain:
+            cond = cond & (df_univ["RS 1M"] <= df_univ["RS 3M"])
+            cond = cond & (df_univ["RS 3M"] <= df_univ["RS 6M"])
+            cond = cond & (df_univ["RS 6M"] <= df_univ["RS 1Y"])
+
+        if sort_mode == "RS Gap (shift)":
+            by, asc = ["RS GAP", "RS 1Y"], [True, False]
+        else:
+            by, asc = [primary_tf, tie], [False, False]
+
+    else:  # CUSTOM (RS-first, then layer filters)
+        min_mktcap = float(cf["cf_min_mktcap"])
+        min_float = float(cf["cf_min_float"])
+
+        min_vol1d = float(cf["cf_min_vol1d"])
+        min_avgvol30 = float(cf["cf_min_avgvol30"])
+
+        min_volchg_1d = float(cf["cf_min_volchg_1d"])
+        min_volchg_1w = float(cf["cf_min_volchg_1w"])
+        min_volchg_1m = float(cf["cf_min_volchg_1m"])
+
+        min_rvol_1d = float(cf["cf_min_rvol_1d"])
+        min_rvol_1w = float(cf["cf_min_rvol_1w"])
+        min_rvol_1m = float(cf["cf_min_rvol_1m"])
+
+        min_eps_q = float(cf["cf_min_eps_q"])
+        min_eps_a = float(cf["cf_min_eps_a"])
+        min_rev_q = float(cf["cf_min_rev_q"])
+        min_rev_a = float(cf["cf_min_rev_a"])
+        min_roe = float(cf["cf_min_roe"])
+        min_pretax = float(cf["cf_min_pretax"])
+
+        max_from_52w = float(cf["cf_max_from_52w"])
+        max_from_ath = float(cf["cf_max_from_ath"])
+
+        min_adr = float(cf["cf_min_adr"])
+        min_atr = float(cf["cf_min_atr"])
+
+        sector_choice = str(cf["cf_sector_choice"])
+
+        p_above_200 = bool(cf["cf_p_above_200"])
+        p_above_50 = bool(cf["cf_p_above_50"])
+        p_above_20 = bool(cf["cf_p_above_20"])
+        p_above_10 = bool(cf["cf_p_above_10"])
+        trend_template_1 = bool(cf["cf_trend_template_1"])
+
+        cond = (df_univ[primary_tf].fillna(0) >= rs_min)
+
+        if min_mktcap > 0:
+            cond = cond & (df_univ["Mkt Cap"].fillna(-1) >= min_mktcap)
+        if min_float > 0:
+            cond = cond & (df_univ["Float"].fillna(-1) >= min_float)
+
+        if min_vol1d > 0:
+            cond = cond & (df_univ["Volume"].fillna(-1) >= min_vol1d)
+        if min_avgvol30 > 0:
+            cond = cond & (df_univ["Avg Vol 30D"].fillna(-1) >= min_avgvol30)
+
+        if min_volchg_1d > 0:
+            cond = cond & (df_univ["Vol Chg 1D"].fillna(-999) >= (min_volchg_1d / 100.0))
+        if min_volchg_1w > 0:
+            cond = cond & (df_univ["Vol Chg 1W"].fillna(-999) >= (min_volchg_1w / 100.0))
+        if min_volchg_1m > 0:
+            cond = cond & (df_univ["Vol Chg 1M"].fillna(-999) >= (min_volchg_1m / 100.0))
+
+        if min_rvol_1d > 0:
+            cond = cond & (df_univ["Rel Vol 1D"].fillna(-1) >= min_rvol_1d)
+        if min_rvol_1w > 0:
+            cond = cond & (df_univ["Rel Vol 1W"].fillna(-1) >= min_rvol_1w)
+        if min_rvol_1m > 0:
+            cond = cond & (df_univ["Rel Vol 1M"].fillna(-1) >= min_rvol_1m)
+
+        if min_rev_q > 0:
+            cond = cond & (df_univ["Rev Qtr YoY"].fillna(-999) >= (min_rev_q / 100.0))
+        if min_rev_a > 0:
+            cond = cond & (df_univ["Rev Ann YoY"].fillna(-999) >= (min_rev_a / 100.0))
+        if min_eps_q > 0:
+            cond = cond & (df_univ["EPS Qtr YoY"].fillna(-999) >= (min_eps_q / 100.0))
+        if min_eps_a > 0:
+            cond = cond & (df_univ["EPS Ann YoY"].fillna(-999) >= (min_eps_a / 100.0))
+
+        if min_roe > 0:
+            cond = cond & (df_univ["ROE TTM"].fillna(-999) >= (min_roe / 100.0))
+        if min_pretax > 0:
+            cond = cond & (df_univ["PreTax Mgn TTM"].fillna(-999) >= (min_pretax / 100.0))
+
+        if max_from_52w > 0:
+            cond = cond & (df_univ["% From 52W High"].fillna(-999) >= (-max_from_52w / 100.0))
+        if max_from_ath > 0:
+            cond = cond & (df_univ["% From ATH"].fillna(-999) >= (-max_from_ath / 100.0))
+
+        if min_adr > 0:
+            cond = cond & (df_univ["ADR%"].fillna(-999) >= (min_adr / 100.0))
+        if min_atr > 0:
+            cond = cond & (df_univ["ATR%"].fillna(-999) >= (min_atr / 100.0))
+
+        if sector_choice != "All":
+            cond = cond & (df_univ["Sector"].astype(str) == sector_choice)
+
+        if p_above_200:
+            cond = cond & (df_univ["P>200"] == True)
+        if p_above_50:
+            cond = cond & (df_univ["P>50"] == True)
+        if p_above_20:
+            cond = cond & (df_univ["P>20"] == True)
+        if p_above_10:
+            cond = cond & (df_univ["P>10"] == True)
+
+        if trend_template_1:
+            cond = cond & (df_univ["P>200"] == True)
+            cond = cond & (df_univ["P>50"] == True)
+            cond = cond & (df_univ["50>200"] == True)
+
+        by, asc = [primary_tf, tie], [False, False]
+
+    return np.flatnonzero(np.asarray(cond, dtype=bool)), by, asc
+
+
+def scan_universe(df: pd.DataFrame, benchmark: str = "SPY") -> pd.DataFrame:
+    """Universe without the benchmark row, plus the RS GAP helper column."""
+    df_univ = df[df["Ticker"] != normalize_ticker(benchmark)].copy()
+
+    # RS GAP helper (used only in accel/decel)
+    df_univ["RS GAP"] = (
+        pd.to_numeric(df_univ["RS 1M"], errors="coerce")
+        - pd.to_numeric(df_univ["RS 1Y"], errors="coerce")
+    )
+    return df_univ
+
+
+def top_k_positions(df: pd.DataFrame, pos: np.ndarray | None, by: list[str], ascending: list[bool],
+                    k: int) -> np.ndarray:
+    """
+    Positions (into df) of the first k rows of df.iloc[pos].sort_values(by, ascending),
+    pos = None for all rows. Reads only the sort columns and never materializes the
+    selection: partial selection (np.partition) on the first sort key, then a full
+    sort of only the candidates (ties at the cut-off included, so the order is identical).
+    """
+    pos = np.arange(len(df)) if pos is None else np.asarray(pos)
+    n = len(pos)
+    if k <= 0:
+        return pos[:0]
+    k = min(k, n)
+    if k < n:
+        key = pd.to_numeric(df[by[0]], errors="coerce").to_numpy(dtype=float)[pos]
+        key = key if not ascending[0] else -key
+        key = np.where(np.isnan(key), -np.inf, key)  # NaN sorts last
+        cutoff = np.partition(key, n - k)[n - k]
+        pos = pos[key >= cutoff]
+    sub = df[list(dict.fromkeys(by))].iloc[pos].reset_index(drop=True)
+    order = sub.sort_values(by, ascending=ascending).index.to_numpy()[:k]
+    return pos[order]
+
+
+def top_k_sorted(df: pd.DataFrame, by: list[str], ascending: list[bool], k: int) -> pd.DataFrame:
+    """First k rows of df.sort_values(by, ascending) without sorting all of df (top_k_positions)."""
+    return df.iloc[top_k_positions(df, None, by, ascending, k)]
+
+
+# ============================================================
+# Declarative scan specs (run_scans.py)
+# ============================================================
+# Same defaults as the app's sidebar
+SPEC_DEFAULTS = {
+    "mode": "Primary timeframe only",
+    "rank_by": "RS 1M",
+    "rs_min": 70,
+    "rs_gap": 15,
+    "strict_chain": True,
+    "sort": "RS Gap (shift)",
+    "filters": {},
+    "limit": None,
+    "columns": None,
+}
+RESULT_COLS = [
+    "Ticker", "Name", "Sector", "Price",
+    "RS 1W", "RS 1M", "RS 3M", "RS 6M", "RS 1Y",
+    "% 1D", "% 1W", "% 1M", "% 3M", "% 6M", "% 1Y",
+]
+
+
+def scan_spec(spec: dict) -> dict:
+    """
+    Validated spec with defaults filled in. Filter keys are the Custom filter
+    keys with or without the "cf_" prefix ("min_eps_q": 20, "sector_choice": "Energy");
+    filters imply mode "Custom" unless a mode is given.
+    Raises ValueError for unknown keys or values.
+    """
+    unknown = set(spec) - set(SPEC_DEFAULTS) - {"name"}
+    if unknown:
+        raise ValueError(f"Unknown scan spec keys: {', '.join(sorted(unknown))}")
+    out = dict(SPEC_DEFAULTS, **spec)
+    if "mode" not in spec and out["filters"]:
+        out["mode"] = "Custom"
+    if out["mode"] not in SCAN_MODES:
+        raise ValueError(f"Unknown scan mode {out['mode']!r} (one of: {', '.join(SCAN_MODES)})")
+    if out["rank_by"] not in RANK_BY:
+        raise ValueError(f"Unknown rank_by {out['rank_by']!r} (one of: {', '.join(RANK_BY)})")
+    if out["sort"] not in SORT_MODES:
+        raise ValueError(f"Unknown sort {out['sort']!r} (one of: {', '.join(SORT_MODES)})")
+    limit = out["limit"]
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, (int, np.integer)) or limit <= 0):
+        raise ValueError(f"Invalid limit {limit!r} (a positive integer, or null for all matches)")
+
+    cf = dict(CUSTOM_KEYS_DEFAULTS)
+    for k, v in (out["filters"] or {}).items():
+        key = k if k.startswith("cf_") else f"cf_{k}"
+        if key not in cf:
+            raise ValueError(f"Unknown filter {k!r}")
+        cf[key] = v
+    out["filters"] = cf
+    out["name"] = str(spec.get("name") or out["mode"])
+    return out
+
+
+def run_spec(df_univ: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    """
+    Ranked matches of one scan (scan_spec or a raw spec dict), best first, with a Rank column.
+    Raises ValueError if rank_by has no values in df_univ (RS Composite in TradingView exports).
+    """
+    spec = scan_spec(spec)
+    if spec["rank_by"] not in df_univ.columns or df_univ[spec["rank_by"]].isna().all():
+        raise ValueError(f"{spec['rank_by']} is not available in this snapshot")
+    idx, by, asc = run_scan(df_univ, spec["mode"], spec["rank_by"], spec["rs_min"], spec["rs_gap"],
+                            spec["strict_chain"], spec["sort"], spec["filters"])
+    df_f = df_univ.iloc[idx]
+    limit = len(df_f) if spec["limit"] is None else spec["limit"]
+    res = top_k_sorted(df_f, by, asc, limit).head(limit)
+    cols = spec["columns"] or RESULT_COLS + [c for c in [spec["rank_by"], "RS GAP"] if c not in RESULT_COLS]
+    res = res.reindex(columns=[c for c in cols if c in df_univ.columns])
+    res.insert(0, "Rank", np.arange(1, len(res) + 1))
+    return res.reset_index(drop=True)
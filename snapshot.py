@@ -0,0 +1,65 @@
+"""
+Typisierter Spalten-Snapshot der Screener-Daten (Arrow IPC, unkomprimiert).
+
+Ersetzt das Text-CSV als primäres Format: keine Textumwandlung beim Laden,
+volle float64-Präzision, und die Datei kann per Memory-Map gelesen werden.
+Die konstanten "- Currency"-Spalten entfallen; Währung, Stichtag,
+Schema-Version und Benchmark-Renditen stehen im Metadaten-Header.
+
+Ab Schema 2 enthält der Snapshot den fertigen Universe-Frame aus
+universe.build_universe() (Header "derived": true), die App filtert nur noch.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+
+SNAPSHOT_FILE = "Data/Screener_Data.arrow"
+SCHEMA_VERSION = 2
+META_KEY = b"rs_scanner"
+
+
+def write_snapshot(df: pd.DataFrame, path: str = SNAPSHOT_FILE, meta: dict | None = None):
+    """Schreibt df + Metadaten atomar (tmp-Datei + os.replace)."""
+    df = df[[c for c in df.columns if not str(c).endswith(" - Currency")]].copy()
+    for c in df.columns:
+        if pd.api.types.is_bool_dtype(df[c]):
+            continue
+        if pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = df[c].astype("float64")
+        else:
+            df[c] = df[c].astype(str)
+
+    header = {
+        "schema_version": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "currency": "USD",
+        "rows": len(df),
+    }
+    header.update(meta or {})
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({META_KEY: json.dumps(header).encode()})
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_meta(path: str = SNAPSHOT_FILE) -> dict:
+    with pa.memory_map(path, "r") as source:
+        schema = pa.ipc.open_file(source).schema
+    return json.loads((schema.metadata or {}).get(META_KEY, b"{}"))
+
+
+def read_snapshot(path: str = SNAPSHOT_FILE, memory_map: bool = True) -> tuple[pd.DataFrame, dict]:
+    """Lädt (DataFrame, Metadaten) ohne Parsing."""
+    source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+    with source:
+        table = pa.ipc.open_file(source).read_all()
+    meta = json.loads((table.schema.metadata or {}).get(META_KEY, b"{}"))
+    return table.to_pandas(), meta
@@ -0,0 +1,80 @@
+"""
+Prebuilt lookup structures for the Ticker Lookup dashboard.
+
+Built once per snapshot instead of normalizing the whole Ticker column on
+every rerun:
+  - hash map normalized ticker -> row position (exact match, O(1))
+  - sorted ticker array (prefix suggestions via binary search, O(log n))
+  - sorted name-word array (prefix match on company names, O(log n))
+  - difflib fallback for typos (only when the prefix searches find nothing)
+"""
+import bisect
+import difflib
+import re
+
+from universe import normalize_ticker
+
+_SPLIT = re.compile(r"[,;\s]+")
+
+
+class SymbolIndex:
+    def __init__(self, tickers: list[str], names: list[str] | None = None):
+        self.tickers = [normalize_ticker(str(t)) for t in tickers]
+        names = names if names is not None else self.tickers
+
+        self.by_ticker: dict[str, int] = {}
+        for i, t in enumerate(self.tickers):
+            self.by_ticker.setdefault(t, i)
+
+        pairs = sorted((t, i) for t, i in self.by_ticker.items() if t)
+        self._t_keys = [t for t, _ in pairs]
+        self._t_pos = [i for _, i in pairs]
+
+        words = set()
+        for i, n in enumerate(names):
+            for w in re.findall(r"[a-z0-9]+", str(n).lower()):
+                words.add((w, i))
+        words = sorted(words)
+        self._w_keys = [w for w, _ in words]
+        self._w_pos = [i for _, i in words]
+
+    def lookup(self, ticker: str) -> int | None:
+        return self.by_ticker.get(normalize_ticker(ticker))
+
+    def _prefix(self, keys: list[str], pos: list[int], prefix: str, limit: int) -> list[int]:
+        out = []
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(out) < limit:
+            out.append(pos[i])
+            i += 1
+        return out
+
+    def suggest(self, query: str, limit: int = 15) -> list[int]:
+        """Row positions: ticker prefix matches first, then company-name word prefixes, then close typos."""
+        q = (query or "").strip()
+        if not q:
+            return []
+        out = self._prefix(self._t_keys, self._t_pos, normalize_ticker(q), limit)
+        for w in re.findall(r"[a-z0-9]+", q.lower())[:1]:
+            for i in self._prefix(self._w_keys, self._w_pos, w, limit * 4):
+                if i not in out and len(out) < limit:
+                    out.append(i)
+        if not out:
+            close = difflib.get_close_matches(normalize_ticker(q), self._t_keys, n=limit, cutoff=0.6)
+            out = [self.by_ticker[t] for t in close]
+        return out
+
+    def lookup_many(self, text: str) -> tuple[list[int], list[str]]:
+        """Comma/space separated tickers -> (row positions in input order, unknown tickers)."""
+        found, missing, seen = [], [], set()
+        for tok in _SPLIT.split(text or ""):
+            t = normalize_ticker(tok)
+            if not t or t in seen:
+                continue
+            seen.add(t)
+            i = self.by_ticker.get(t)
+            if i is None:
+                missing.append(t)
+            else:
+                found.append(i)
+        return found, missing
@@ -0,0 +1,155 @@
+"""
+Ticker-Universum aus einer lokalen Datei statt der Wikipedia-Listen.
+
+Unterstützte Formate (automatisch erkannt):
+  - nasdaqtrader.com Symbol Directory (nasdaqlisted.txt / otherlisted.txt,
+    "|"-getrennt, Fußzeile "File Creation Time")
+  - CSV mit Spalte Symbol/Ticker (optional Name/Description/Security (Name),
+    Sector/GICS Sector, Industry/GICS Sub-Industry)
+  - reine Liste: ein Ticker pro Zeile oder durch Komma/Leerzeichen getrennt,
+    "#" leitet Kommentare ein
+
+Testemissionen, ETFs und Nicht-Stammaktien (Warrants, Rights, Units,
+Vorzugsaktien) werden bei nasdaqtrader-Dateien herausgefiltert; Ticker
+werden wie in get_tickers() auf die Yahoo-Schreibweise gebracht (BRK.B -> BRK-B).
+
+Außerdem der lokale Cache der Wikipedia-Liste (Data/universe.json, mit Namen,
+Sektoren und Abrufdatum): cached_universe() fragt die Quelle nur nach Ablauf
+von UNIVERSE_TTL_DAYS neu ab, protokolliert Zu- und Abgänge und verwirft eine
+neue Liste, die mehr als MAX_SHRINK kleiner ist als die letzte gute.
+"""
+import io
+import json
+import os
+import re
+
+import pandas as pd
+
+UNIVERSE_CACHE = "Data/universe.json"
+UNIVERSE_TTL_DAYS = 7
+MAX_SHRINK = 0.10
+UNIVERSE_COLS = ["Symbol", "Name", "Sector", "Industry"]
+
+_VALID = re.compile(r"^[A-Z0-9][A-Z0-9\-]*$")
+_NOT_COMMON = re.compile(r"\b(?:warrants?|rights?|units?|preferred|notes?|debentures?|depositary shares)\b", re.I)
+
+
+def _clean(symbols: pd.Series) -> pd.Series:
+    return symbols.astype(str).str.strip().str.upper().str.replace(".", "-", regex=False)
+
+
+def _finish(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.assign(Symbol=_clean(df["Symbol"]))
+    df = df[df["Symbol"].str.match(_VALID)]
+    return df.drop_duplicates(subset=["Symbol"]).sort_values("Symbol", ignore_index=True)
+
+
+def _read_nasdaqtrader(text: str, etfs: bool) -> pd.DataFrame:
+    lines = [ln for ln in text.splitlines() if ln and not ln.startswith("File Creation Time")]
+    df = pd.read_csv(io.StringIO("\n".join(lines)), sep="|", dtype=str, keep_default_na=False)
+    sym = "Symbol" if "Symbol" in df.columns else "ACT Symbol"
+    keep = pd.Series(True, index=df.index)
+    if "Test Issue" in df.columns:
+        keep &= df["Test Issue"] != "Y"
+    if "ETF" in df.columns and not etfs:
+        keep &= df["ETF"] != "Y"
+    if "Security Name" in df.columns:
+        keep &= ~df["Security Name"].str.contains(_NOT_COMMON)
+    out = pd.DataFrame({"Symbol": df[sym], "Name": df.get("Security Name", df[sym])})[keep]
+    return out
+
+
+def _read_csv(text: str) -> pd.DataFrame:
+    df = pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False)
+    cols = {c.lower().strip(): c for c in df.columns}
+    sym = cols.get("symbol") or cols.get("ticker")
+    name = cols.get("name") or cols.get("description") or cols.get("security name") or cols.get("security")
+    out = pd.DataFrame({"Symbol": df[sym], "Name": df[name] if name else df[sym]})
+    for col, cands in (("Sector", ["sector", "gics sector"]), ("Industry", ["industry", "gics sub-industry"])):
+        c = next((cols[k] for k in cands if k in cols), None)
+        if c:
+            out[col] = df[c]
+    return out
+
+
+def _read_plain(text: str) -> pd.DataFrame:
+    tokens = []
+    for ln in text.splitlines():
+        tokens += re.split(r"[,;\s]+", ln.split("#", 1)[0].strip())
+    tokens = [t for t in tokens if t and t.lower() not in ("symbol", "ticker")]
+    return pd.DataFrame({"Symbol": tokens, "Name": tokens})
+
+
+def read_symbol_file(path: str, etfs: bool = False) -> pd.DataFrame:
+    """DataFrame[Symbol, Name] (+ Sector/Industry, falls die CSV sie hat), sortiert und ohne Duplikate."""
+    with open(path, encoding="utf-8-sig") as f:
+        text = f.read()
+    head = text.split("\n", 1)[0]
+    if "|" in head:
+        df = _read_nasdaqtrader(text, etfs)
+    elif "," in head and re.search(r"\b(symbol|ticker)\b", head, re.I):
+        df = _read_csv(text)
+    else:
+        df = _read_plain(text)
+    return _finish(df)
+
+
+def read_cached_universe(path: str = UNIVERSE_CACHE) -> tuple[pd.DataFrame | None, str | None]:
+    """(DataFrame[UNIVERSE_COLS], Abrufdatum YYYY-MM-DD) oder (None, None)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        df = pd.DataFrame(raw["symbols"]).reindex(columns=UNIVERSE_COLS).fillna("")
+        return (df, raw["fetched"]) if not df.empty else (None, None)
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def write_cached_universe(df: pd.DataFrame, fetched: str, path: str = UNIVERSE_CACHE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    records = df.reindex(columns=UNIVERSE_COLS).fillna("").astype(str).to_dict(orient="records")
+    tmp = path + ".tmp"
+    # Ein Ticker pro Zeile, damit Zu- und Abgänge im Git-Diff lesbar sind
+    rows = ",\n".join(json.dumps(r, ensure_ascii=False) for r in records)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f'{{"fetched": "{fetched}", "count": {len(records)}, "symbols": [\n{rows}\n]}}\n')
+    os.replace(tmp, path)
+
+
+def cached_universe(fetch, path: str = UNIVERSE_CACHE, ttl_days: int = UNIVERSE_TTL_DAYS,
+                    max_shrink: float = MAX_SHRINK, force: bool = False, today=None, log=print) -> pd.DataFrame:
+    """
+    Ticker-Universum aus dem Cache; fetch() (-> DataFrame[UNIVERSE_COLS], wirft bei Fehlern)
+    nur, wenn der Cache fehlt, älter als ttl_days ist oder force gesetzt ist.
+    Schlägt fetch fehl oder schrumpft die Liste um mehr als max_shrink, bleibt die letzte
+    gute Liste (log bekommt die Warnung). Ohne Cache wird ein Fehler weitergereicht.
+    """
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    old, fetched = read_cached_universe(path)
+    if old is not None and not force and (today - pd.Timestamp(fetched)).days < ttl_days:
+        return old
+
+    try:
+        new = fetch()
+        if new is None or new.empty:
+            raise ValueError("leere Ticker-Liste")
+    except Exception as e:
+        if old is None:
+            raise
+        log(f"Ticker-Liste nicht aktualisiert, nutze Stand vom {fetched}: {type(e).__name__}: {e}")
+        return old
+
+    if old is not None:
+        added = sorted(set(new["Symbol"]) - set(old["Symbol"]))
+        removed = sorted(set(old["Symbol"]) - set(new["Symbol"]))
+        if len(new) < len(old) * (1 - max_shrink):
+            log(f"Neue Ticker-Liste verworfen: {len(new)} statt {len(old)} Aktien "
+                f"(mehr als {max_shrink:.0%} weniger), nutze Stand vom {fetched}")
+            return old
+        if added:
+            print(f"Universum: {len(added)} neu: {', '.join(added)}")
+        if removed:
+            print(f"Universum: {len(removed)} entfernt: {', '.join(removed)}")
+
+    write_cached_universe(new, today.strftime("%Y-%m-%d"), path)
+    return new.reindex(columns=UNIVERSE_COLS).fillna("")
@@ -0,0 +1,135 @@
+"""
+Synthetische Kursdaten für Skalierungs- und Benchmark-Läufe (komplett offline).
+
+Deterministisch über den Seed: gleiche Parameter -> gleiche Daten. Deshalb
+liegt kein 10k-Datensatz im Repo, scale_check.py erzeugt ihn bei Bedarf.
+Die Kurse sind Random Walks mit Drift/Volatilität pro Ticker; ein Teil der
+Ticker hat nur kurze Historie (Neuzugänge) oder einzelne fehlende Tage.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+TRADING_DAYS = 504  # 2 Jahre
+SHORT_HISTORY_SHARE = 0.03
+GAP_SHARE = 0.002
+
+
+def synthetic_symbols(n: int) -> list[str]:
+    """n eindeutige Fantasie-Ticker (AAAA, AAAB, ...), kollidieren nicht mit SPY."""
+    out = []
+    for i in range(n):
+        s = ""
+        for _ in range(4):
+            i, r = divmod(i, 26)
+            s = chr(65 + r) + s
+        out.append(s)
+    return out
+
+
+def synthetic_history(symbols: list[str], days: int = TRADING_DAYS, end=None, seed: int = 0) -> dict[str, pd.DataFrame]:
+    """{Ticker: OHLCV-DataFrame} wie Downloader/FileProvider sie liefern."""
+    rng = np.random.default_rng(seed)
+    n = len(symbols)
+    end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+    dates = pd.bdate_range(end=end, periods=days, name="Date")
+
+    drift = rng.normal(0.0004, 0.0008, n)
+    vol = rng.uniform(0.01, 0.04, n)
+    ret = rng.normal(drift, vol, (days, n))
+    close = rng.uniform(5, 300, n) * np.exp(np.cumsum(ret, axis=0))
+    open_ = close * np.exp(rng.normal(0, vol / 3, (days, n)))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 1, (days, n)) * vol)
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 1, (days, n)) * vol)
+    volume = np.round(rng.lognormal(13, 1, n) * rng.lognormal(0, 0.4, (days, n)))
+
+    start = np.where(rng.random(n) < SHORT_HISTORY_SHARE, rng.integers(days // 2, days - 10, n), 0)
+    gaps = rng.random((days, n)) < GAP_SHARE
+
+    out = {}
+    for j, t in enumerate(symbols):
+        df = pd.DataFrame({"Open": open_[:, j], "High": high[:, j], "Low": low[:, j],
+                           "Close": close[:, j], "Volume": volume[:, j]}, index=dates)
+        df.loc[gaps[:, j]] = np.nan
+        out[t] = df.iloc[start[j]:].dropna(how="all")
+    return out
+
+
+def synthetic_panel(symbols: list[str], **kw) -> pd.DataFrame:
+    """Gleiche Daten als (Ticker, Feld)-Panel wie history_store.update_history()."""
+    return pd.concat(synthetic_history(symbols, **kw), axis=1).sort_index()
+
+
+class SyntheticProvider:
+    """Provider für Downloader (fetch wie YahooProvider); `end` simuliert den Stichtag des Laufs."""
+
+    def __init__(self, history: dict[str, pd.DataFrame], end=None):
+        self.history = history
+        self.end = end
+
+    def fetch(self, symbols: list[str], start=None) -> dict[str, pd.DataFrame]:
+        out = {}
+        for t in symbols:
+            df = self.history.get(t)
+            if df is None:
+                continue
+            if self.end is not None:
+                df = df[df.index <= pd.Timestamp(self.end)]
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if not df.empty:
+                out[t] = df
+        return out
+
+
+class SyntheticFundamentals:
+    """Provider für fundamentals.update_fundamentals (fetch wie YahooFundamentals), deterministisch je Ticker."""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def fetch(self, ticker: str) -> dict:
+        rng = np.random.default_rng([self.seed] + [ord(c) for c in ticker])
+        shares = rng.lognormal(18, 1.2)
+        values = {
+            "Shares outstanding": shares,
+            "Free float": shares * rng.uniform(0.5, 1.0),
+            "Earnings per share diluted growth %, Quarterly YoY": rng.normal(10, 40),
+            "Earnings per share diluted growth %, Annual YoY": rng.normal(10, 30),
+            "Revenue growth %, Quarterly YoY": rng.normal(8, 15),
+            "Revenue growth %, Annual YoY": rng.normal(8, 12),
+            "Return on equity %, Trailing 12 months": rng.normal(12, 15),
+            "Pretax margin %, Trailing 12 months": rng.normal(10, 12),
+        }
+        earnings = pd.Timestamp.today().normalize() - pd.Timedelta(days=int(rng.integers(0, 91)))
+        return {"values": values, "earnings": earnings.strftime("%Y-%m-%d")}
+
+
+def synthetic_ticks(ref: pd.DataFrame, steps: int = 30, start=None, freq: str = "1min", seed: int = 0) -> pd.DataFrame:
+    """Intraday-Ticks (Time, Ticker, Price) ab dem letzten Schlusskurs in ref, für live.ReplayFeed."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start or pd.Timestamp.today().normalize() + pd.Timedelta(hours=14, minutes=30))
+    times = pd.date_range(start, periods=steps, freq=freq)
+    close = ref["Close"].to_numpy(dtype=float)
+    price = close * np.exp(np.cumsum(rng.normal(0, 0.002, (steps, len(close))), axis=0))
+    return pd.DataFrame({
+        "Time": np.repeat(times, len(close)),
+        "Ticker": np.tile(ref["Ticker"].astype(str).to_numpy(), steps),
+        "Price": price.ravel(),
+    })
+
+
+def write_history_files(history: dict[str, pd.DataFrame], root: str):
+    """<root>/<TICKER>.csv für FileProvider."""
+    os.makedirs(root, exist_ok=True)
+    for t, df in history.items():
+        df.to_csv(os.path.join(root, f"{t}.csv"), float_format="%.4f")
+
+
+def write_symbol_file(symbols: list[str], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write("\n".join(symbols) + "\n")
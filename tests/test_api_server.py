@@ -0,0 +1,60 @@
+import contextlib
+import io
+import json
+import os
+
+import pytest
+
+import update_data as pipeline
+from api_server import ApiError, SnapshotStore, handle
+from synthetic import SyntheticProvider, synthetic_history, synthetic_symbols, write_symbol_file
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    d = tmp_path_factory.mktemp("api")
+    symbols = synthetic_symbols(60)
+    write_symbol_file(symbols, str(d / "universe.txt"))
+    cwd = os.getcwd()
+    os.chdir(d)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline.update_data(provider=SyntheticProvider(synthetic_history(symbols + list(pipeline.BENCHMARKS))),
+                                 universe_file="universe.txt", fundamentals=False)
+    finally:
+        os.chdir(cwd)
+    s = SnapshotStore(str(d / "Data/Screener_Data.arrow"), spy_file=str(d / "Data/SPY_Data.csv"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        s.get()
+    return s
+
+
+def _status(store, path, params):
+    with pytest.raises(ApiError) as e:
+        handle(store, path, params)
+    return e.value.status
+
+
+@pytest.mark.parametrize("limit", ["x", "0", "-1", "1.5"])
+def test_universe_bad_limit(store, limit):
+    assert _status(store, "/universe", {"limit": limit}) == 400
+
+
+def test_universe_unknown_column(store):
+    assert _status(store, "/universe", {"columns": "Ticker,Nope"}) == 400
+
+
+def test_universe_limit(store):
+    _, body = handle(store, "/universe", {"limit": "3", "columns": "Ticker,RS 1M"})
+    rows = json.loads(body)["rows"]
+    assert len(rows) == 3 and set(rows[0]) == {"Ticker", "RS 1M"}
+
+
+@pytest.mark.parametrize("limit", ["x", "0", "-1"])
+def test_scan_bad_limit(store, limit):
+    assert _status(store, "/scan", {"limit": limit, "rs_min": "1"}) == 400
+
+
+def test_scan_limit(store):
+    _, body = handle(store, "/scan", {"limit": "5", "rs_min": "1"})
+    assert json.loads(body)["matches"] == 5
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from live import LiveRanker, RS_WINDOWS, reference_closes
+from synthetic import synthetic_panel, synthetic_symbols
+from universe import to_rs_1_99
+
+
+def test_next_session_partial_quotes():
+    symbols = synthetic_symbols(200)
+    panel = synthetic_panel(symbols)
+    ref = reference_closes(panel, symbols)
+    as_of = panel.index[-1]
+    ranker = LiveRanker(ref, as_of.strftime("%Y-%m-%d"))
+
+    quoted = ref["Ticker"].iloc[::2].tolist()
+    rng = np.random.default_rng(1)
+    prices = dict(zip(quoted, ref.set_index("Ticker")["Close"][quoted] * rng.uniform(0.9, 1.1, len(quoted))))
+    ranker.update(prices, as_of + pd.Timedelta(days=1))
+
+    df = ranker.frame().set_index("Ticker")
+    rest = df.index.difference(quoted)
+    assert df.loc[rest, [f"RS {w}" for w in RS_WINDOWS] + ["RS Composite", "% 1M"]].isna().all().all()
+    np.testing.assert_array_equal(df.loc[rest, "Price"], ref.set_index("Ticker")["Close"][rest])
+
+    # Quoted tickers are ranked among themselves against the "next" reference closes
+    next_1m = ref.set_index("Ticker")["next 1M"][quoted]
+    expected = to_rs_1_99(pd.Series(prices) / next_1m - 1)
+    np.testing.assert_array_equal(df.loc[quoted, "RS 1M"], expected[quoted])
+    assert df.loc[quoted, "RS Composite"].notna().all()
+
+    # First quote of the session counts even at the old close
+    ranker.update(dict(zip(rest, ref.set_index("Ticker")["Close"][rest])), as_of + pd.Timedelta(days=1))
+    assert ranker.frame()["RS 1M"].notna().all()
@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import numpy as np
+
+import update_data as pipeline
+from rs_history import RS_HISTORY_DIR, TIMEFRAMES, load_rs_history, rank_history
+from run_scans import load_universe
+from synthetic import SyntheticProvider, synthetic_history, synthetic_panel, synthetic_symbols, write_symbol_file
+
+
+def test_last_row_matches_snapshot_with_gaps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    symbols = synthetic_symbols(400)
+    history = synthetic_history(symbols + list(pipeline.BENCHMARKS))
+    days = max(len(df) for df in history.values())
+    assert any(len(df) < days for df in history.values())  # Lücken / kurze Historie im Testdatensatz
+    write_symbol_file(symbols, "universe.txt")
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.update_data(provider=SyntheticProvider(history), universe_file="universe.txt", fundamentals=False)
+
+    _, tickers, ranks = load_rs_history(RS_HISTORY_DIR)
+    df, _ = load_universe("Data/Screener_Data.arrow", "Data/SPY_Data.csv")
+    pos = [tickers.index(t) for t in df["Ticker"]]
+    for k, (col, _) in enumerate(TIMEFRAMES):
+        stored = ranks[-1, pos, k].astype(float)
+        stored[stored == 0] = np.nan
+        np.testing.assert_array_equal(stored, df[col].to_numpy(dtype=float), err_msg=col)
+
+
+def test_start_matches_full_backfill():
+    close = synthetic_panel(synthetic_symbols(200)).xs("Close", axis=1, level=1)
+    full = rank_history(close)
+    np.testing.assert_array_equal(rank_history(close, 300), full[300:])
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scan_engine import scan_spec, top_k_positions, top_k_sorted
+
+
+def _frame():
+    return pd.DataFrame({"RS 1M": [50.0, 90.0, np.nan, 70.0, 90.0], "RS 1Y": [1.0, 2.0, 3.0, 4.0, 5.0]})
+
+
+def test_top_k_zero():
+    df = _frame()
+    assert len(top_k_positions(df, None, ["RS 1M", "RS 1Y"], [False, False], 0)) == 0
+    assert len(top_k_positions(df, np.array([1, 3]), ["RS 1M"], [False], 0)) == 0
+    assert top_k_sorted(df, ["RS 1M"], [False], 0).empty
+
+
+def test_top_k_larger_than_rows():
+    df = _frame()
+    expected = df.sort_values(["RS 1M", "RS 1Y"], ascending=[False, False]).index.to_numpy()
+    np.testing.assert_array_equal(top_k_positions(df, None, ["RS 1M", "RS 1Y"], [False, False], 10), expected)
+    np.testing.assert_array_equal(top_k_positions(df, np.array([0, 3]), ["RS 1M"], [False], 3), [3, 0])
+
+
+def test_scan_spec_limit():
+    assert scan_spec({})["limit"] is None
+    assert scan_spec({"limit": 5})["limit"] == 5
+    for bad in (0, -1, 2.5, "10", True):
+        with pytest.raises(ValueError, match="limit"):
+            scan_spec({"limit": bad})
@@ -0,0 +1,331 @@
+"""
+Universe frame construction shared by the pipeline (update_data.py) and the app.
+
+build_universe() turns the raw screener export (CSV or snapshot) plus the
+benchmark row into the ready-to-screen frame: fractional returns, relative
+returns vs the benchmark, RS 1-99 ranks, distance from highs and the
+price-above-MA flags. It is a pure function of the daily data, so the updater
+runs it once and publishes the result; the app only filters and renders.
+"""
+import numpy as np
+import pandas as pd
+
+
+def normalize_ticker(t: str) -> str:
+    t = (t or "").strip().upper()
+    t = t.replace(" ", "")
+    t = t.replace("/", "-")
+    return t
+
+
+def to_float_pct_series(s: pd.Series) -> pd.Series:
+    """
+    Converts percent-units to fractional returns.
+    Example: 12.3 -> 0.123, "12.3%" -> 0.123
+    """
+    if s is None:
+        return pd.Series(np.nan)
+
+    if getattr(s.dtype, "kind", "") in "if":
+        return pd.to_numeric(s, errors="coerce") / 100.0
+
+    ss = s.astype(str).str.strip()
+    ss = ss.str.replace("%", "", regex=False).str.replace(",", "", regex=False).str.strip()
+    ss = ss.str.replace(r"[^0-9\.\-\+]", "", regex=True)
+    return pd.to_numeric(ss, errors="coerce") / 100.0
+
+
+def find_col(df: pd.DataFrame, candidates: list[str]) -> str | None:
+    cols = [str(c) for c in df.columns]
+    low = {c.lower().strip(): c for c in cols}
+
+    for cand in candidates:
+        cand_l = str(cand).lower().strip()
+        if cand_l in low:
+            return low[cand_l]
+
+    for c in cols:
+        cl = c.lower()
+        for cand in candidates:
+            if str(cand).lower() in cl:
+                return c
+    return None
+
+
+def rel_ret(r: pd.Series, b: float) -> pd.Series:
+    if not np.isfinite(b):
+        return pd.Series(np.nan, index=r.index)
+    return (1.0 + r) / (1.0 + b) - 1.0
+
+
+def to_rs_1_99(s: pd.Series) -> pd.Series:
+    x = pd.to_numeric(s, errors="coerce")
+    return (x.rank(pct=True) * 99).round().clip(1, 99)
+
+
+def price_levels(df: pd.DataFrame) -> pd.DataFrame:
+    """% from highs and price-above-MA flags from Price and _high52/_ath/_sma*; in place (live.apply_live reuses it)."""
+    # % from highs (fractional, usually negative)
+    df["% From 52W High"] = np.where(
+        np.isfinite(df["_high52"]) & (df["_high52"] > 0) & np.isfinite(df["Price"]),
+        (df["Price"] / df["_high52"]) - 1.0,
+        np.nan,
+    )
+    df["% From ATH"] = np.where(
+        np.isfinite(df["_ath"]) & (df["_ath"] > 0) & np.isfinite(df["Price"]),
+        (df["Price"] / df["_ath"]) - 1.0,
+        np.nan,
+    )
+
+    # Price above MA booleans
+    df["P>200"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma200"]), df["Price"] > df["_sma200"], False)
+    df["P>50"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma50"]), df["Price"] > df["_sma50"], False)
+    df["P>20"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma20"]), df["Price"] > df["_sma20"], False)
+    df["P>10"] = np.where(np.isfinite(df["Price"]) & np.isfinite(df["_sma10"]), df["Price"] > df["_sma10"], False)
+    df["50>200"] = np.where(np.isfinite(df["_sma50"]) & np.isfinite(df["_sma200"]), df["_sma50"] > df["_sma200"], False)
+    return df
+
+
+# Return timeframes of the relative-return array (last axis of relative_returns)
+REL_TIMEFRAMES = ["1W", "1M", "3M", "6M", "1Y"]
+_BENCH_COLS = {
+    "1W": ["Performance % 1 week", "1 week", "weekly"],
+    "1M": ["Performance % 1 month", "1 month", "monthly"],
+    "3M": ["Performance % 3 months", "3 months", "quarter"],
+    "6M": ["Performance % 6 months", "6 months", "half"],
+    "1Y": ["Performance % 1 year", "1 year", "annual"],
+}
+
+
+def benchmark_returns(bench_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Benchmark rows (SPY_Data.csv / snapshot header) -> fractional returns,
+    indexed by normalized symbol, one column per REL_TIMEFRAMES entry.
+    """
+    c_symbol = find_col(bench_raw, ["Symbol"])
+    if c_symbol is None or bench_raw.empty:
+        return pd.DataFrame(columns=REL_TIMEFRAMES, dtype=float)
+    out = pd.DataFrame(index=bench_raw[c_symbol].astype(str).map(normalize_ticker).rename("Symbol"))
+    for tf, cands in _BENCH_COLS.items():
+        c = find_col(bench_raw, cands)
+        out[tf] = to_float_pct_series(bench_raw[c]).to_numpy() if c else np.nan
+    return out[~out.index.duplicated()]
+
+
+def relative_returns(df: pd.DataFrame, bench: pd.DataFrame) -> np.ndarray:
+    """
+    (tickers x benchmarks x timeframes) array of rel_ret for every benchmark in
+    `bench` (benchmark_returns), rows in df order. Switching benchmark is an index
+    into axis 1. RS ranks do not depend on it: the benchmark return is the same
+    for every ticker, so rel_ret keeps the order of the raw returns.
+    """
+    r = df[[f"r_{tf.lower()}" for tf in REL_TIMEFRAMES]].to_numpy(dtype=float)
+    b = bench[REL_TIMEFRAMES].to_numpy(dtype=float)
+    return (1.0 + r[:, None, :]) / (1.0 + b[None, :, :]) - 1.0
+
+
+def read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Marks the numpy buffers behind df's columns read-only (in place) and returns df.
+    For frames shared by all app sessions: an in-place write raises instead of
+    changing the data under every other session; derived frames are still writable.
+    """
+    for c in df.columns:
+        a = df[c].to_numpy(copy=False)
+        while isinstance(a.base, np.ndarray):
+            a = a.base
+        if isinstance(a, np.ndarray) and a.flags.writeable:
+            a.flags.writeable = False
+    return df
+
+
+def build_universe(df_raw: pd.DataFrame, spy_raw: pd.DataFrame, benchmark: str = "SPY") -> tuple[pd.DataFrame, list[str]]:
+    """
+    Returns (df, missing) where missing lists the Custom-filter inputs the export does not have.
+    Raises ValueError if the Symbol column or the benchmark row is missing.
+    """
+    # ------------------------------------------------------------
+    # Map core columns (existing)
+    # ------------------------------------------------------------
+    c_symbol = find_col(df_raw, ["Symbol"])
+    c_name = find_col(df_raw, ["Description", "Name"])
+    c_price = find_col(df_raw, ["Price", "Last"])
+
+    c_1d = find_col(df_raw, ["Price Change % 1 day", "1 day", "daily"])
+    c_1w = find_col(df_raw, ["Performance % 1 week", "1 week", "weekly"])
+    c_1m = find_col(df_raw, ["Performance % 1 month", "1 month", "monthly"])
+    c_3m = find_col(df_raw, ["Performance % 3 months", "3 months", "quarter"])
+    c_6m = find_col(df_raw, ["Performance % 6 months", "6 months", "half"])
+    c_1y = find_col(df_raw, ["Performance % 1 year", "1 year", "annual"])
+
+    if not c_symbol:
+        raise ValueError("Universe CSV must include a Symbol column (or similar).")
+
+    # ------------------------------------------------------------
+    # Map Custom filter columns (TradingView export)
+    # ------------------------------------------------------------
+    c_mktcap = find_col(df_raw, ["Market capitalization"])
+    c_vol1d = find_col(df_raw, ["Volume 1 day", "Volume"])
+    c_volchg_1d = find_col(df_raw, ["Volume Change % 1 day"])
+    c_volchg_1w = find_col(df_raw, ["Volume Change % 1 week"])
+    c_volchg_1m = find_col(df_raw, ["Volume Change % 1 month"])
+    c_avgvol30 = find_col(df_raw, ["Average Volume 30 days"])
+    c_rvol1d = find_col(df_raw, ["Relative Volume 1 day"])
+    c_rvol1w = find_col(df_raw, ["Relative Volume 1 week"])
+    c_rvol1m = find_col(df_raw, ["Relative Volume 1 month"])
+    c_float = find_col(df_raw, ["Free float"])
+
+    c_eps_q = find_col(df_raw, ["Earnings per share diluted growth %, Quarterly YoY"])
+    c_eps_a = find_col(df_raw, ["Earnings per share diluted growth %, Annual YoY"])
+    c_rev_q = find_col(df_raw, ["Revenue growth %, Quarterly YoY"])
+    c_rev_a = find_col(df_raw, ["Revenue growth %, Annual YoY"])
+    c_roe = find_col(df_raw, ["Return on equity %, Trailing 12 months"])
+    c_pretax = find_col(df_raw, ["Pretax margin %, Trailing 12 months"])
+
+    c_high52 = find_col(df_raw, ["High 52 weeks"])
+    c_ath = find_col(df_raw, ["High All Time"])
+
+    c_adr = find_col(df_raw, ["Average Daily Range %"])
+    c_atr = find_col(df_raw, ["Average True Range % (14) 1 day", "Average True Range %"])
+
+    c_sma200 = find_col(df_raw, ["Simple Moving Average (200) 1 day"])
+    c_sma50 = find_col(df_raw, ["Simple Moving Average (50) 1 day"])
+    c_sma20 = find_col(df_raw, ["Simple Moving Average (20) 1 day"])
+    c_sma10 = find_col(df_raw, ["Simple Moving Average (10) 1 day"])
+
+    c_sector = find_col(df_raw, ["Sector"])
+    c_industry = find_col(df_raw, ["Industry", "Sub-Industry"])
+
+    # Weighted quarterly score from update_data (metrics.COMPOSITE_COL); not in TradingView exports
+    c_composite = find_col(df_raw, ["RS Composite Score"])
+
+    # ------------------------------------------------------------
+    # Benchmark column map
+    # ------------------------------------------------------------
+    spy_raw = spy_raw.copy()
+    spy_symbol = find_col(spy_raw, ["Symbol"]) or c_symbol
+    spy_1w = find_col(spy_raw, [c_1w]) if c_1w else None
+    spy_1m = find_col(spy_raw, [c_1m]) if c_1m else None
+    spy_3m = find_col(spy_raw, [c_3m]) if c_3m else None
+    spy_6m = find_col(spy_raw, [c_6m]) if c_6m else None
+    spy_1y = find_col(spy_raw, [c_1y]) if c_1y else None
+
+    # ============================================================
+    # BUILD UNIVERSE FRAME
+    # ============================================================
+    df = pd.DataFrame()
+    df["Ticker"] = df_raw[c_symbol].astype(str).map(normalize_ticker)
+    df = df[df["Ticker"].str.len() > 0].drop_duplicates(subset=["Ticker"]).copy()
+    df["Name"] = df_raw[c_name].astype(str) if c_name else df["Ticker"]
+    df["Price"] = pd.to_numeric(df_raw[c_price], errors="coerce") if c_price else np.nan
+
+    # Returns (fractional)
+    df["r_1d"] = to_float_pct_series(df_raw[c_1d]) if c_1d else np.nan
+    df["r_1w"] = to_float_pct_series(df_raw[c_1w]) if c_1w else np.nan
+    df["r_1m"] = to_float_pct_series(df_raw[c_1m]) if c_1m else np.nan
+    df["r_3m"] = to_float_pct_series(df_raw[c_3m]) if c_3m else np.nan
+    df["r_6m"] = to_float_pct_series(df_raw[c_6m]) if c_6m else np.nan
+    df["r_1y"] = to_float_pct_series(df_raw[c_1y]) if c_1y else np.nan
+
+    # Custom raw numeric fields
+    df["Mkt Cap"] = pd.to_numeric(df_raw[c_mktcap], errors="coerce") if c_mktcap else np.nan
+    df["Volume"] = pd.to_numeric(df_raw[c_vol1d], errors="coerce") if c_vol1d else np.nan
+    df["Avg Vol 30D"] = pd.to_numeric(df_raw[c_avgvol30], errors="coerce") if c_avgvol30 else np.nan
+    df["Float"] = pd.to_numeric(df_raw[c_float], errors="coerce") if c_float else np.nan
+
+    # Volume changes + growth/margins as FRACTIONS
+    df["Vol Chg 1D"] = to_float_pct_series(df_raw[c_volchg_1d]) if c_volchg_1d else np.nan
+    df["Vol Chg 1W"] = to_float_pct_series(df_raw[c_volchg_1w]) if c_volchg_1w else np.nan
+    df["Vol Chg 1M"] = to_float_pct_series(df_raw[c_volchg_1m]) if c_volchg_1m else np.nan
+
+    df["Rel Vol 1D"] = pd.to_numeric(df_raw[c_rvol1d], errors="coerce") if c_rvol1d else np.nan
+    df["Rel Vol 1W"] = pd.to_numeric(df_raw[c_rvol1w], errors="coerce") if c_rvol1w else np.nan
+    df["Rel Vol 1M"] = pd.to_numeric(df_raw[c_rvol1m], errors="coerce") if c_rvol1m else np.nan
+
+    df["EPS Qtr YoY"] = to_float_pct_series(df_raw[c_eps_q]) if c_eps_q else np.nan
+    df["EPS Ann YoY"] = to_float_pct_series(df_raw[c_eps_a]) if c_eps_a else np.nan
+    df["Rev Qtr YoY"] = to_float_pct_series(df_raw[c_rev_q]) if c_rev_q else np.nan
+    df["Rev Ann YoY"] = to_float_pct_series(df_raw[c_rev_a]) if c_rev_a else np.nan
+    df["ROE TTM"] = to_float_pct_series(df_raw[c_roe]) if c_roe else np.nan
+    df["PreTax Mgn TTM"] = to_float_pct_series(df_raw[c_pretax]) if c_pretax else np.nan
+
+    df["_high52"] = pd.to_numeric(df_raw[c_high52], errors="coerce") if c_high52 else np.nan
+    df["_ath"] = pd.to_numeric(df_raw[c_ath], errors="coerce") if c_ath else np.nan
+
+    df["ADR%"] = to_float_pct_series(df_raw[c_adr]) if c_adr else np.nan
+    df["ATR%"] = to_float_pct_series(df_raw[c_atr]) if c_atr else np.nan
+
+    df["_sma200"] = pd.to_numeric(df_raw[c_sma200], errors="coerce") if c_sma200 else np.nan
+    df["_sma50"] = pd.to_numeric(df_raw[c_sma50], errors="coerce") if c_sma50 else np.nan
+    df["_sma20"] = pd.to_numeric(df_raw[c_sma20], errors="coerce") if c_sma20 else np.nan
+    df["_sma10"] = pd.to_numeric(df_raw[c_sma10], errors="coerce") if c_sma10 else np.nan
+
+    # Display MA values
+    df["SMA200"] = df["_sma200"]
+    df["SMA50"] = df["_sma50"]
+    df["SMA20"] = df["_sma20"]
+    df["SMA10"] = df["_sma10"]
+
+    # Empty CSV cells (no sector metadata for the ticker) read back as NaN
+    df["Sector"] = df_raw[c_sector].fillna("").astype(str) if c_sector else ""
+    df["Industry"] = df_raw[c_industry].fillna("").astype(str) if c_industry else ""
+
+    price_levels(df)
+
+    # ============================================================
+    # BENCHMARK RETURNS
+    # ============================================================
+    spy_raw["__sym__"] = spy_raw[spy_symbol].astype(str).map(normalize_ticker)
+    spy_row = spy_raw[spy_raw["__sym__"] == normalize_ticker(benchmark)]
+    if spy_row.empty:
+        raise ValueError(f"No row found for {benchmark} in the benchmark data. Make sure Symbol={benchmark} exists.")
+    spy_row = spy_row.iloc[0]
+
+    def spy_ret(col):
+        if not col or col not in spy_raw.columns:
+            return np.nan
+        return float(to_float_pct_series(pd.Series([spy_row[col]])).iloc[0])
+
+    b_1w = spy_ret(spy_1w)
+    b_1m = spy_ret(spy_1m)
+    b_3m = spy_ret(spy_3m)
+    b_6m = spy_ret(spy_6m)
+    b_1y = spy_ret(spy_1y)
+
+    df["rr_1w"] = rel_ret(df["r_1w"], b_1w)
+    df["rr_1m"] = rel_ret(df["r_1m"], b_1m)
+    df["rr_3m"] = rel_ret(df["r_3m"], b_3m)
+    df["rr_6m"] = rel_ret(df["r_6m"], b_6m)
+    df["rr_1y"] = rel_ret(df["r_1y"], b_1y)
+
+    df["RS 1W"] = to_rs_1_99(df["rr_1w"])
+    df["RS 1M"] = to_rs_1_99(df["rr_1m"])
+    df["RS 3M"] = to_rs_1_99(df["rr_3m"])
+    df["RS 6M"] = to_rs_1_99(df["rr_6m"])
+    df["RS 1Y"] = to_rs_1_99(df["rr_1y"])
+
+    # Same benchmark for every ticker -> ranking the raw score equals ranking it vs SPY
+    df["RS Composite"] = to_rs_1_99(df_raw[c_composite]) if c_composite else np.nan
+
+    # Display % columns (absolute)
+    df["% 1D"] = df["r_1d"]
+    df["% 1W"] = df["r_1w"]
+    df["% 1M"] = df["r_1m"]
+    df["% 3M"] = df["r_3m"]
+    df["% 6M"] = df["r_6m"]
+    df["% 1Y"] = df["r_1y"]
+
+    missing = []
+    if c_mktcap is None: missing.append("Market Cap")
+    if c_float is None: missing.append("Float")
+    if c_avgvol30 is None: missing.append("Avg Vol 30D")
+    if c_rvol1d is None: missing.append("Rel Vol 1D")
+    if c_eps_q is None: missing.append("EPS Qtr YoY")
+    if c_rev_q is None: missing.append("Rev Qtr YoY")
+    if c_roe is None: missing.append("ROE TTM")
+    if c_pretax is None: missing.append("PreTax Margin TTM")
+    if c_sma200 is None: missing.append("SMA200")
+    if c_sma50 is None: missing.append("SMA50")
+    if c_sector is None: missing.append("Sector")
+
+    return df, missing
@@ -1,113 +1,221 @@
-import yfinance as yf
 import pandas as pd
+import argparse
 import os
 import requests
 import io
 import time
 
-def get_tickers():
+from downloader import Downloader
+from archive import ARCHIVE_DIR, archive_snapshot
+from fundamentals import apply_fundamentals, update_fundamentals
+from history_store import update_history
+from live import REFERENCE_FILE, write_reference_closes
+from metrics import MIN_BARS, SCREENER_COLS, compute_metrics
+from rs_history import RS_HISTORY_DIR, update_rs_history
+from run_report import REPORT_FILE, RunReport
+from snapshot import SNAPSHOT_FILE, write_snapshot
+from symbol_list import cached_universe, read_symbol_file
+from universe import build_universe
+
+# Benchmarks für die relativen Renditen (im selben Download wie die Aktien).
+# SPY ist Pflicht und bleibt die erste Zeile in SPY_Data.csv; die App wählt daraus aus.
+BENCHMARKS = {
+    "SPY": "State Street SPDR S&P 500 ETF",
+    "QQQ": "Invesco QQQ Trust",
+    "IWM": "iShares Russell 2000 ETF",
+    "DIA": "SPDR Dow Jones Industrial Average ETF",
+    "XLK": "Technology Select Sector SPDR Fund",
+    "XLF": "Financial Select Sector SPDR Fund",
+    "XLV": "Health Care Select Sector SPDR Fund",
+    "XLY": "Consumer Discretionary Select Sector SPDR Fund",
+    "XLP": "Consumer Staples Select Sector SPDR Fund",
+    "XLE": "Energy Select Sector SPDR Fund",
+    "XLI": "Industrial Select Sector SPDR Fund",
+    "XLB": "Materials Select Sector SPDR Fund",
+    "XLU": "Utilities Select Sector SPDR Fund",
+    "XLRE": "Real Estate Select Sector SPDR Fund",
+    "XLC": "Communication Services Select Sector SPDR Fund",
+}
+
+# Wikipedia-Tabellen: (URL, Ticker-Spalte); Name und GICS-Sektor/Sub-Industry kommen aus derselben Tabelle
+WIKI_LISTS = [('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 'Symbol'), 
+              ('https://en.wikipedia.org/wiki/Nasdaq-100', 'Ticker')]
+META_COLS = {"Name": ["Security", "Company"], "Sector": ["GICS Sector"], "Industry": ["GICS Sub-Industry"]}
+
+def get_universe(report=None, strict=False):
+    """
+    DataFrame[Symbol, Name, Sector, Industry] aus S&P 500 + Nasdaq-100 (erste Quelle gewinnt).
+    strict: Fehler einer Quelle abbrechen statt mit einer kürzeren Liste weiterzumachen.
+    """
     headers = {"User-Agent": "Mozilla/5.0"}
-    tickers = []
-    for url, match in [('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies', 'Symbol'), 
-                        ('https://en.wikipedia.org/wiki/Nasdaq-100', 'Ticker')]:
+    frames = []
+    for url, match in WIKI_LISTS:
         try:
             resp = requests.get(url, headers=headers, timeout=10)
             df = pd.read_html(io.StringIO(resp.text), match=match)[0]
-            tickers += df[match].tolist()
-        except: continue
-    return sorted(list(set([str(t).strip().replace('.', '-') for t in tickers if str(t) != 'nan'])))
+            out = pd.DataFrame({"Symbol": df[match]})
+            for col, cands in META_COLS.items():
+                c = next((c for c in cands if c in df.columns), None)
+                out[col] = df[c] if c else ""
+            frames.append(out)
+        except Exception as e:
+            if strict:
+                raise
+            if report: report.warn(f"Ticker-Liste {url} nicht geladen: {type(e).__name__}: {e}")
+            continue
+    if not frames:
+        return pd.DataFrame(columns=["Symbol"] + list(META_COLS))
+    df = pd.concat(frames, ignore_index=True)
+    df = df[df["Symbol"].astype(str) != 'nan']
+    df["Symbol"] = df["Symbol"].astype(str).str.strip().str.replace('.', '-', regex=False)
+    return df.drop_duplicates(subset=["Symbol"]).sort_values("Symbol", ignore_index=True)
+
+def get_tickers(report=None, refresh=False):
+    """Ticker aus dem lokalen Universum-Cache (Data/universe.json), Wikipedia nur nach Ablauf der TTL."""
+    return cached_get_universe(report, refresh)["Symbol"].tolist()
+
+def cached_get_universe(report=None, refresh=False):
+    log = report.warn if report else print
+    return cached_universe(lambda: get_universe(report, strict=True), force=refresh, log=log)
 
-def update_data():
+def benchmark_row(df, symbol, name=None):
+    """Eine Zeile für SPY_Data.csv (Exakt 9 Spalten laut Vorlage)."""
+    c = df["Close"].dropna()
+    cur = float(c.iloc[-1])
+    def perf(d): return ((cur / c.iloc[-min(d, len(c))]) - 1) * 100
+
+    return {
+        "Symbol": symbol, 
+        "Description": name or symbol, 
+        "Price": cur, 
+        "Price - Currency": "USD", 
+        "Performance % 1 week": perf(5), 
+        "Performance % 1 month": perf(21), 
+        "Performance % 3 months": perf(63), 
+        "Performance % 6 months": perf(126), 
+        "Performance % 1 year": perf(252)
+    }
+
+def update_data(provider=None, export_csv=True, universe_file=None, benchmarks=None, fundamentals=True,
+                fundamentals_provider=None, refresh_universe=False):
+    # Zeiten, Chunks und ausgefallene Ticker landen in Data/run_report.json (siehe run_report.py),
+    # auch wenn der Lauf abbricht
+    report = RunReport()
+    try:
+        _update_data(report, provider, export_csv, universe_file, benchmarks, fundamentals, fundamentals_provider,
+                     refresh_universe)
+    except Exception as e:
+        report.warn(f"Abbruch: {type(e).__name__}: {e}")
+        raise
+    finally:
+        report.write(REPORT_FILE)
+        print(f"Laufbericht: {REPORT_FILE} ({report.stages})")
+
+def _update_data(report, provider, export_csv, universe_file, benchmarks, fundamentals, fundamentals_provider,
+                 refresh_universe):
     if not os.path.exists('Data'): os.makedirs('Data')
-    symbols = get_tickers()
+    # SPY immer zuerst (RS-Basis und Fallback der App), Reihenfolge sonst wie angegeben
+    benchmarks = list(dict.fromkeys(["SPY"] + [b.upper() for b in (benchmarks or BENCHMARKS)]))
+    with report.stage("get_tickers"):
+        # Großes Universum (z.B. alle NYSE/Nasdaq-Stammaktien) aus lokaler Datei, siehe symbol_list.py
+        # Sonst S&P 500 + Nasdaq-100 aus dem Cache, Wikipedia nur nach Ablauf der TTL
+        universe = read_symbol_file(universe_file) if universe_file else cached_get_universe(report, refresh_universe)
+        symbols = universe["Symbol"].tolist()
+    report.counts["requested"] = len(symbols)
     
-    print(f"Lade Daten für {len(symbols)} Aktien...")
-    # Wir laden 'Close' für die reine Kursperformance
-    data = yf.download(symbols + ["SPY"], period="2y", interval="1d", group_by='ticker', threads=False)
+    print(f"Lade Daten für {len(symbols)} Aktien + {len(benchmarks)} Benchmarks...")
+    # Gespeicherter Verlauf + nur die fehlenden Tage (siehe history_store.py),
+    # geladen in Chunks mit Retries (siehe downloader.py)
+    download = Downloader(provider)
+    with report.stage("download"):
+        data = update_history(list(dict.fromkeys(symbols + benchmarks)), download=download)
+    report.chunks = download.chunks
+    for t, reason in download.errors.items():
+        report.fail(t, reason)
+    if download.missing:
+        report.warn(f"Keine neuen Daten für {len(download.missing)} Aktien: {', '.join(download.missing)}")
     
-    # --- 1. SPY_DATA.CSV (Exakt 9 Spalten laut Vorlage) ---
-    try:
-        spy_df = data["SPY"].dropna()
-        spy_c = spy_df['Close']
-        cur_spy = float(spy_c.iloc[-1])
-        def sp(d): return ((cur_spy / spy_c.iloc[-min(d, len(spy_df))]) - 1) * 100
-        
-        pd.DataFrame([{
-            "Symbol": "SPY", 
-            "Description": "State Street SPDR S&P 500 ETF", 
-            "Price": cur_spy, 
-            "Price - Currency": "USD", 
-            "Performance % 1 week": sp(5), 
-            "Performance % 1 month": sp(21), 
-            "Performance % 3 months": sp(63), 
-            "Performance % 6 months": sp(126), 
-            "Performance % 1 year": sp(252)
-        }]).to_csv("Data/SPY_Data.csv", index=False)
-    except: pass
+    # --- 1. SPY_DATA.CSV (eine Zeile je Benchmark, SPY zuerst) ---
+    with report.stage("benchmark"):
+        bench_rows = []
+        for b in benchmarks:
+            try:
+                bench_rows.append(benchmark_row(data[b], b, BENCHMARKS.get(b)))
+            except Exception as e:
+                report.warn(f"{b}-Daten nicht verfügbar: {type(e).__name__}: {e}")
+        spy_row = bench_rows[0] if bench_rows and bench_rows[0]["Symbol"] == "SPY" else None
+        if bench_rows:
+            pd.DataFrame(bench_rows).to_csv("Data/SPY_Data.csv", index=False)
 
     # --- 2. SCREENER_DATA.CSV (Exakt 39 Spalten, reine Zahlenwerte) ---
-    # Diese Liste ist die "DNA" deiner Website. Jede Spalte muss genau hier sitzen.
-    orig_cols = [
-        "Symbol", "Description", "Price", "Price - Currency", "Gap % 1 day", "Price Change % 1 day", 
-        "Market capitalization", "Market capitalization - Currency", "Volume 1 day", "Volume Change % 1 day", 
-        "Volume Change % 1 week", "Volume Change % 1 month", "Average Volume 30 days", "Relative Volume 1 day", 
-        "Relative Volume 1 week", "Relative Volume 1 month", "Free float", "Performance % 1 week", 
-        "Performance % 1 month", "Performance % 3 months", "Performance % 6 months", "Performance % 1 year", 
-        "Earnings per share diluted growth %, Quarterly YoY", "Earnings per share diluted growth %, Annual YoY", 
-        "Revenue growth %, Quarterly YoY", "Revenue growth %, Annual YoY", "Return on equity %, Trailing 12 months", 
-        "Pretax margin %, Trailing 12 months", "High 52 weeks", "High 52 weeks - Currency", "High All Time", 
-        "High All Time - Currency", "Average Daily Range %", "Average True Range % (14) 1 day", 
-        "Simple Moving Average (200) 1 day", "Simple Moving Average (50) 1 day", "Simple Moving Average (20) 1 day", 
-        "Simple Moving Average (10) 1 day", "Sector"
-    ]
-
-    results = []
-    for i, t in enumerate(symbols):
-        try:
-            if t not in data.columns.levels[0]: continue
-            df = data[t].dropna(subset=['Close'])
-            if len(df) < 5: continue
-            
-            close = df['Close']
-            cur = float(close.iloc[-1])
-            def p(d): return ((cur / close.iloc[-min(d, len(df))]) - 1) * 100
-            
-            # WICHTIG: Keine $ oder % Zeichen! Nur rohe Zahlen (Floats).
-            res = {
-                "Symbol": t, "Description": t, "Price": cur, "Price - Currency": "USD",
-                "Gap % 1 day": ((df['Open'].iloc[-1]/df['Close'].iloc[-2])-1)*100 if len(df)>1 else 0,
-                "Price Change % 1 day": p(2), # Spalte 6 (Index 5): Hier saßen vorher die 106%
-                "Market capitalization": 0.0, "Market capitalization - Currency": "USD",
-                "Volume 1 day": df['Volume'].iloc[-1], "Volume Change % 1 day": 0.0, 
-                "Volume Change % 1 week": 0.0, "Volume Change % 1 month": 0.0, 
-                "Average Volume 30 days": df['Volume'].rolling(30).mean().iloc[-1],
-                "Relative Volume 1 day": df['Volume'].iloc[-1]/df['Volume'].rolling(30).mean().iloc[-1] if len(df)>30 else 1,
-                "Relative Volume 1 week": 0.0, "Relative Volume 1 month": 0.0, "Free float": 0.0,
-                "Performance % 1 week": p(5), "Performance % 1 month": p(21), 
-                "Performance % 3 months": p(63), "Performance % 6 months": p(126), 
-                "Performance % 1 year": p(252), # Hier sitzt die Jahresperformance (Spalte 22)
-                "Earnings per share diluted growth %, Quarterly YoY": 0.0, "Earnings per share diluted growth %, Annual YoY": 0.0,
-                "Revenue growth %, Quarterly YoY": 0.0, "Revenue growth %, Annual YoY": 0.0,
-                "Return on equity %, Trailing 12 months": 0.0, "Pretax margin %, Trailing 12 months": 0.0,
-                "High 52 weeks": df['High'].iloc[-min(252, len(df)):].max(), "High 52 weeks - Currency": "USD",
-                "High All Time": df['High'].max(), "High All Time - Currency": "USD",
-                "Average Daily Range %": (((df['High']/df['Low'])-1)*100).rolling(20).mean().iloc[-1],
-                "Average True Range % (14) 1 day": 0.0,
-                "Simple Moving Average (200) 1 day": close.rolling(200).mean().iloc[-1] if len(df)>=200 else cur,
-                "Simple Moving Average (50) 1 day": close.rolling(50).mean().iloc[-1] if len(df)>=50 else cur,
-                "Simple Moving Average (20) 1 day": close.rolling(20).mean().iloc[-1] if len(df)>=20 else cur,
-                "Simple Moving Average (10) 1 day": close.rolling(10).mean().iloc[-1] if len(df)>=10 else cur,
-                "Sector": "Equity"
+    # Alle Kennzahlen auf einmal über das ganze Panel (siehe metrics.py)
+    with report.stage("metrics"):
+        # Name, Sektor und Industrie aus der Ticker-Liste (leer, wenn die Quelle sie nicht hat)
+        df_out = compute_metrics(data, symbols, universe.set_index("Symbol"))
+    report.counts["computed"] = len(df_out)
+
+    # Fundamentaldaten aus dem Plattencache, neu geladen nur wenn veraltet oder nach Earnings (siehe fundamentals.py)
+    if fundamentals and not df_out.empty:
+        with report.stage("fundamentals"):
+            fund, stats = update_fundamentals(df_out["Symbol"].tolist(), provider=fundamentals_provider)
+            df_out = apply_fundamentals(df_out, fund)
+        report.counts["fundamentals_fetched"] = stats["fetched"]
+        report.counts["fundamentals_deferred"] = stats["deferred"]
+        if stats["errors"]:
+            report.warn(f"Fundamentaldaten für {len(stats['errors'])} Aktien nicht geladen: {', '.join(sorted(stats['errors']))}")
+
+    have = set(data.columns.get_level_values(0)) if not data.empty else set()
+    done = set(df_out["Symbol"])
+    for t in symbols:
+        if t not in done and t not in report.failed:
+            report.skip(t, "keine Kursdaten" if t not in have else f"weniger als {MIN_BARS} Handelstage")
+
+    if not df_out.empty:
+        # --- 3. SNAPSHOT (fertiger Universe-Frame, typisiert; siehe snapshot.py) ---
+        # RS-Ränge, Relativ-Renditen etc. einmal hier statt bei jedem App-Aufruf
+        with report.stage("snapshot"):
+            univ, missing = build_universe(df_out, pd.DataFrame([spy_row or {"Symbol": "SPY"}]))
+            snap_meta = {
+                "as_of": data.index[-1].strftime("%Y-%m-%d"),
+                "benchmark": spy_row,
+                "benchmarks": bench_rows,
+                "derived": True,
+                "missing": missing,
             }
-            results.append(res)
-            if (i+1) % 100 == 0: print(f"{i+1} Aktien verarbeitet...")
-        except: continue
+            write_snapshot(univ, SNAPSHOT_FILE, snap_meta)
+        print(f"ERFOLG: {len(df_out)} Aktien als Snapshot gespeichert ({SNAPSHOT_FILE}).")
 
-    if results:
-        df_out = pd.DataFrame(results).reindex(columns=orig_cols)
-        # quoting=1 sorgt für das saubere Fließtext-Format ohne unnötige Anführungszeichen
-        df_out.to_csv("Data/Screener_Data.csv", index=False, float_format='%.4f')
-        print(f"ERFOLG: {len(results)} Aktien im Original-Format gespeichert.")
+        # Tagesarchiv für "As of" in der App (komprimiert, statische Felder nur einmal; siehe archive.py)
+        with report.stage("archive"):
+            archive_file = archive_snapshot(univ, snap_meta, ARCHIVE_DIR)
+        print(f"ERFOLG: Snapshot archiviert ({archive_file}).")
+
+        # Referenzkurse für den Live-Modus der App (Renditen aus aktuellem Kurs ohne Historie; siehe live.py)
+        with report.stage("reference_closes"):
+            write_reference_closes(data, symbols + [b for b in benchmarks if b not in symbols],
+                                   data.index[-1].strftime("%Y-%m-%d"))
+        print(f"ERFOLG: Referenzkurse gespeichert ({REFERENCE_FILE}).")
+
+        # --- 4. RS-HISTORIE (tägliche Ränge, append-only; siehe rs_history.py) ---
+        with report.stage("rs_history"):
+            close = data.xs("Close", axis=1, level=1)
+            close = close[[t for t in symbols if t in close.columns]]
+            n_new = update_rs_history(close, RS_HISTORY_DIR)
+        print(f"ERFOLG: {n_new} neue Tage in der RS-Historie ({RS_HISTORY_DIR}).")
+
+        if export_csv:
+            # WICHTIG: Keine $ oder % Zeichen! Nur rohe Zahlen (Floats).
+            with report.stage("csv_write"):
+                df_out[SCREENER_COLS].to_csv("Data/Screener_Data.csv", index=False, float_format='%.4f')
+            print(f"ERFOLG: {len(df_out)} Aktien im Original-Format gespeichert.")
 
 if __name__ == "__main__":
-    update_data()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-csv", action="store_true", help="Screener_Data.csv nicht zusätzlich exportieren")
+    parser.add_argument("--universe", metavar="DATEI", help="Ticker-Liste statt S&P 500 + Nasdaq-100 (Liste, CSV oder nasdaqtrader)")
+    parser.add_argument("--benchmarks", nargs="+", metavar="ETF", help=f"Benchmarks statt {' '.join(BENCHMARKS)} (SPY ist immer dabei)")
+    parser.add_argument("--no-fundamentals", action="store_true", help="Fundamentaldaten nicht laden (Spalten bleiben leer)")
+    parser.add_argument("--refresh-universe", action="store_true", help="Wikipedia-Listen trotz gültigem Cache neu laden")
+    args = parser.parse_args()
+    update_data(export_csv=not args.no_csv, universe_file=args.universe, benchmarks=args.benchmarks,
+                fundamentals=not args.no_fundamentals, refresh_universe=args.refresh_universe)